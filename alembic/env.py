@@ -0,0 +1,51 @@
+# Entorno de Alembic: mismo esquema (Base.metadata) y misma URL que la aplicación
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from database.models import Base, get_database_url
+from database.search import incluir_en_autogenerate
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Tipo de base de datos: ``alembic -x db_type=postgresql upgrade head``
+db_type = context.get_x_argument(as_dictionary=True).get("db_type", "sqlite")
+database_url = get_database_url(db_type)
+
+
+def run_migrations_offline() -> None:
+    """Emitir el SQL de las migraciones sin conectarse (``alembic upgrade head --sql``)"""
+    context.configure(
+        url=database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=db_type == "sqlite",
+        include_object=incluir_en_autogenerate,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # SQLite no soporta ALTER/DROP COLUMN completos: render_as_batch recrea la tabla
+    engine = create_engine(database_url, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+            include_object=incluir_en_autogenerate,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
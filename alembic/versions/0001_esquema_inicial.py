@@ -0,0 +1,186 @@
+"""Esquema inicial (tablas anteriores a las migraciones)
+
+Una base creada con ``create_tables`` antes de adoptar Alembic ya tiene este
+esquema: marcarla con ``alembic stamp 0001`` y luego ``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('convocatorias',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nombre', sa.String(length=500), nullable=False),
+        sa.Column('codigo', sa.String(length=50), nullable=True),
+        sa.Column('agno', sa.Integer(), nullable=True),
+        sa.Column('tipo_proceso', sa.String(length=100), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_convocatoria_agno', 'convocatorias', ['agno'], unique=False)
+    op.create_index('idx_convocatoria_codigo', 'convocatorias', ['codigo'], unique=False)
+    op.create_index(op.f('ix_convocatorias_agno'), 'convocatorias', ['agno'], unique=False)
+    op.create_index(op.f('ix_convocatorias_codigo'), 'convocatorias', ['codigo'], unique=False)
+    op.create_index(op.f('ix_convocatorias_id'), 'convocatorias', ['id'], unique=False)
+    op.create_table('departamentos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nombre', sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_departamentos_id'), 'departamentos', ['id'], unique=False)
+    op.create_index(op.f('ix_departamentos_nombre'), 'departamentos', ['nombre'], unique=True)
+    op.create_table('entidades',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nit', sa.String(length=20), nullable=True),
+        sa.Column('nombre', sa.String(length=500), nullable=False),
+        sa.Column('tipo_entidad', sa.String(length=100), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_entidad_nombre', 'entidades', ['nombre'], unique=False)
+    op.create_index('idx_entidad_tipo', 'entidades', ['tipo_entidad'], unique=False)
+    op.create_index(op.f('ix_entidades_id'), 'entidades', ['id'], unique=False)
+    op.create_index(op.f('ix_entidades_nit'), 'entidades', ['nit'], unique=True)
+    op.create_index(op.f('ix_entidades_nombre'), 'entidades', ['nombre'], unique=False)
+    op.create_table('scraping_logs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('fecha_inicio', sa.DateTime(), nullable=True),
+        sa.Column('fecha_fin', sa.DateTime(), nullable=True),
+        sa.Column('empleos_encontrados', sa.Integer(), nullable=True),
+        sa.Column('empleos_nuevos', sa.Integer(), nullable=True),
+        sa.Column('empleos_actualizados', sa.Integer(), nullable=True),
+        sa.Column('paginas_procesadas', sa.Integer(), nullable=True),
+        sa.Column('exitoso', sa.Boolean(), nullable=True),
+        sa.Column('mensaje_error', sa.Text(), nullable=True),
+        sa.Column('tiempo_ejecucion', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_scraping_exitoso', 'scraping_logs', ['exitoso'], unique=False)
+    op.create_index('idx_scraping_fecha', 'scraping_logs', ['fecha_inicio'], unique=False)
+    op.create_index(op.f('ix_scraping_logs_id'), 'scraping_logs', ['id'], unique=False)
+    op.create_table('usuarios_telegram',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('chat_id', sa.String(length=50), nullable=False),
+        sa.Column('username', sa.String(length=100), nullable=True),
+        sa.Column('nombre_completo', sa.String(length=200), nullable=True),
+        sa.Column('niveles_interes', sa.String(length=200), nullable=True),
+        sa.Column('departamentos_interes', sa.String(length=500), nullable=True),
+        sa.Column('palabras_clave', sa.String(length=500), nullable=True),
+        sa.Column('salario_minimo', sa.Float(), nullable=True),
+        sa.Column('activo', sa.Boolean(), nullable=True),
+        sa.Column('frecuencia_notificaciones', sa.String(length=20), nullable=True),
+        sa.Column('ultima_notificacion', sa.DateTime(), nullable=True),
+        sa.Column('fecha_registro', sa.DateTime(), nullable=True),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_telegram_activo', 'usuarios_telegram', ['activo'], unique=False)
+    op.create_index('idx_telegram_frecuencia', 'usuarios_telegram', ['frecuencia_notificaciones'], unique=False)
+    op.create_index(op.f('ix_usuarios_telegram_chat_id'), 'usuarios_telegram', ['chat_id'], unique=True)
+    op.create_index(op.f('ix_usuarios_telegram_id'), 'usuarios_telegram', ['id'], unique=False)
+    op.create_table('municipios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nombre', sa.String(length=100), nullable=False),
+        sa.Column('departamento_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_municipio_departamento', 'municipios', ['departamento_id'], unique=False)
+    op.create_index(op.f('ix_municipios_id'), 'municipios', ['id'], unique=False)
+    op.create_index(op.f('ix_municipios_nombre'), 'municipios', ['nombre'], unique=False)
+    op.create_table('empleos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('simo_id', sa.Integer(), nullable=True),
+        sa.Column('empleo_id', sa.Integer(), nullable=True),
+        sa.Column('codigo_empleo', sa.String(length=20), nullable=True),
+        sa.Column('denominacion', sa.String(length=200), nullable=False),
+        sa.Column('denominacion_id', sa.Integer(), nullable=True),
+        sa.Column('nivel', sa.String(length=50), nullable=False),
+        sa.Column('grado', sa.String(length=10), nullable=True),
+        sa.Column('descripcion', sa.Text(), nullable=True),
+        sa.Column('asignacion_salarial', sa.Float(), nullable=True),
+        sa.Column('vigencia_salarial', sa.Integer(), nullable=True),
+        sa.Column('entidad_id', sa.Integer(), nullable=True),
+        sa.Column('departamento_id', sa.Integer(), nullable=True),
+        sa.Column('municipio_id', sa.Integer(), nullable=True),
+        sa.Column('convocatoria_id', sa.Integer(), nullable=True),
+        sa.Column('convocatoria_nombre', sa.String(length=500), nullable=True),
+        sa.Column('convocatoria_codigo', sa.String(length=50), nullable=True),
+        sa.Column('convocatoria_agno', sa.Integer(), nullable=True),
+        sa.Column('tipo_proceso', sa.String(length=100), nullable=True),
+        sa.Column('departamento', sa.String(length=100), nullable=True),
+        sa.Column('municipio', sa.String(length=100), nullable=True),
+        sa.Column('dependencia', sa.String(length=300), nullable=True),
+        sa.Column('cantidad_vacantes', sa.Integer(), nullable=True),
+        sa.Column('vacantes_disponibles', sa.Integer(), nullable=True),
+        sa.Column('estudio_requerido', sa.Text(), nullable=True),
+        sa.Column('experiencia_requerida', sa.Text(), nullable=True),
+        sa.Column('otros_requisitos', sa.Text(), nullable=True),
+        sa.Column('funciones', sa.Text(), nullable=True),
+        sa.Column('concurso_ascenso', sa.Boolean(), nullable=True),
+        sa.Column('condicion_discapacidad', sa.Boolean(), nullable=True),
+        sa.Column('favorito', sa.Boolean(), nullable=True),
+        sa.Column('fecha_inscripcion', sa.String(length=20), nullable=True),
+        sa.Column('fecha_scraping', sa.DateTime(), nullable=True),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+        sa.Column('activo', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['convocatoria_id'], ['convocatorias.id']),
+        sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id']),
+        sa.ForeignKeyConstraint(['entidad_id'], ['entidades.id']),
+        sa.ForeignKeyConstraint(['municipio_id'], ['municipios.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_empleo_busqueda', 'empleos', ['denominacion', 'nivel', 'departamento', 'activo'], unique=False)
+    op.create_index('idx_empleo_denominacion_nivel', 'empleos', ['denominacion', 'nivel'], unique=False)
+    op.create_index('idx_empleo_fecha_activo', 'empleos', ['fecha_scraping', 'activo'], unique=False)
+    op.create_index('idx_empleo_nivel_departamento', 'empleos', ['nivel', 'departamento'], unique=False)
+    op.create_index('idx_empleo_salario_nivel', 'empleos', ['asignacion_salarial', 'nivel'], unique=False)
+    op.create_index(op.f('ix_empleos_activo'), 'empleos', ['activo'], unique=False)
+    op.create_index(op.f('ix_empleos_asignacion_salarial'), 'empleos', ['asignacion_salarial'], unique=False)
+    op.create_index(op.f('ix_empleos_codigo_empleo'), 'empleos', ['codigo_empleo'], unique=False)
+    op.create_index(op.f('ix_empleos_convocatoria_id'), 'empleos', ['convocatoria_id'], unique=False)
+    op.create_index(op.f('ix_empleos_denominacion'), 'empleos', ['denominacion'], unique=False)
+    op.create_index(op.f('ix_empleos_departamento'), 'empleos', ['departamento'], unique=False)
+    op.create_index(op.f('ix_empleos_departamento_id'), 'empleos', ['departamento_id'], unique=False)
+    op.create_index(op.f('ix_empleos_empleo_id'), 'empleos', ['empleo_id'], unique=False)
+    op.create_index(op.f('ix_empleos_entidad_id'), 'empleos', ['entidad_id'], unique=False)
+    op.create_index(op.f('ix_empleos_fecha_scraping'), 'empleos', ['fecha_scraping'], unique=False)
+    op.create_index(op.f('ix_empleos_grado'), 'empleos', ['grado'], unique=False)
+    op.create_index(op.f('ix_empleos_id'), 'empleos', ['id'], unique=False)
+    op.create_index(op.f('ix_empleos_municipio'), 'empleos', ['municipio'], unique=False)
+    op.create_index(op.f('ix_empleos_municipio_id'), 'empleos', ['municipio_id'], unique=False)
+    op.create_index(op.f('ix_empleos_nivel'), 'empleos', ['nivel'], unique=False)
+    op.create_index(op.f('ix_empleos_simo_id'), 'empleos', ['simo_id'], unique=True)
+    op.create_table('notificaciones_enviadas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_telegram_id', sa.Integer(), nullable=True),
+        sa.Column('empleo_id', sa.Integer(), nullable=True),
+        sa.Column('fecha_envio', sa.DateTime(), nullable=True),
+        sa.Column('exitosa', sa.Boolean(), nullable=True),
+        sa.Column('mensaje_error', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['empleo_id'], ['empleos.id']),
+        sa.ForeignKeyConstraint(['usuario_telegram_id'], ['usuarios_telegram.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_notificacion_empleo', 'notificaciones_enviadas', ['empleo_id'], unique=False)
+    op.create_index('idx_notificacion_usuario_fecha', 'notificaciones_enviadas', ['usuario_telegram_id', 'fecha_envio'], unique=False)
+    op.create_index(op.f('ix_notificaciones_enviadas_id'), 'notificaciones_enviadas', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('notificaciones_enviadas')
+    op.drop_table('empleos')
+    op.drop_table('municipios')
+    op.drop_table('usuarios_telegram')
+    op.drop_table('scraping_logs')
+    op.drop_table('entidades')
+    op.drop_table('departamentos')
+    op.drop_table('convocatorias')
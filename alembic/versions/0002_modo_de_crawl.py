@@ -0,0 +1,28 @@
+"""Modo de crawl (completo, incremental, parcial) en scraping_logs
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scraping_logs', sa.Column('modo', sa.String(length=20), nullable=True))
+    op.create_index('idx_scraping_modo_fecha', 'scraping_logs', ['modo', 'exitoso', 'fecha_inicio'], unique=False)
+
+    # Los logs anteriores son todos de crawls completos (cuentan para ultimo_crawl_completo)
+    op.execute("UPDATE scraping_logs SET modo = 'completo'")
+
+
+def downgrade() -> None:
+    op.drop_index('idx_scraping_modo_fecha', table_name='scraping_logs')
+    with op.batch_alter_table('scraping_logs') as batch_op:
+        batch_op.drop_column('modo')
@@ -0,0 +1,28 @@
+"""Hash de contenido de empleos y conteo de empleos sin cambios por scraping
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Sin hash, la primera escritura de cada empleo existente lo calcula
+    op.add_column('empleos', sa.Column('hash_contenido', sa.String(length=32), nullable=True))
+    op.add_column('scraping_logs', sa.Column('empleos_sin_cambios', sa.Integer(), nullable=True))
+    op.execute("UPDATE scraping_logs SET empleos_sin_cambios = 0")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('scraping_logs') as batch_op:
+        batch_op.drop_column('empleos_sin_cambios')
+    with op.batch_alter_table('empleos') as batch_op:
+        batch_op.drop_column('hash_contenido')
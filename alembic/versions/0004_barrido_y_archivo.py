@@ -0,0 +1,45 @@
+"""Generación de crawl para el barrido de no vistos y tabla de empleos archivados
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('empleos', sa.Column('generacion_crawl', sa.String(length=32), nullable=True))
+    op.create_index(op.f('ix_empleos_generacion_crawl'), 'empleos', ['generacion_crawl'], unique=False)
+
+    op.create_table('empleos_archivados',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('empleo_original_id', sa.Integer(), nullable=True),
+        sa.Column('simo_id', sa.Integer(), nullable=True),
+        sa.Column('denominacion', sa.String(length=200), nullable=True),
+        sa.Column('nivel', sa.String(length=50), nullable=True),
+        sa.Column('departamento', sa.String(length=100), nullable=True),
+        sa.Column('entidad_id', sa.Integer(), nullable=True),
+        sa.Column('fecha_scraping', sa.DateTime(), nullable=True),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+        sa.Column('datos', sa.Text(), nullable=True),
+        sa.Column('fecha_archivado', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_empleos_archivados_fecha_archivado'), 'empleos_archivados', ['fecha_archivado'], unique=False)
+    op.create_index(op.f('ix_empleos_archivados_id'), 'empleos_archivados', ['id'], unique=False)
+    op.create_index(op.f('ix_empleos_archivados_simo_id'), 'empleos_archivados', ['simo_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('empleos_archivados')
+
+    op.drop_index(op.f('ix_empleos_generacion_crawl'), table_name='empleos')
+    with op.batch_alter_table('empleos') as batch_op:
+        batch_op.drop_column('generacion_crawl')
@@ -0,0 +1,98 @@
+"""Índice de texto completo de empleos (SQLite FTS5 / PostgreSQL tsvector) y sus triggers
+
+Los triggers lo mantienen al día con cada INSERT/UPDATE de empleos, incluido
+el INSERT ... ON CONFLICT DO UPDATE de bulk_insert_empleos.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# Columnas indexadas y su peso en PostgreSQL (los pesos de SQLite se dan al consultar)
+_COLUMNAS = ('denominacion', 'descripcion', 'funciones', 'estudio_requerido')
+_PESOS_POSTGRES = ('A', 'B', 'C', 'C')
+
+
+def _upgrade_sqlite() -> None:
+    columnas = ", ".join(_COLUMNAS)
+    nuevas = ", ".join(f"new.{c}" for c in _COLUMNAS)
+    viejas = ", ".join(f"old.{c}" for c in _COLUMNAS)
+
+    # Tabla de contenido externo: el texto vive en empleos, FTS5 solo guarda el índice.
+    # remove_diacritics hace la búsqueda insensible a tildes ("tecnico" = "técnico").
+    op.execute(
+        f"CREATE VIRTUAL TABLE empleos_fts USING fts5({columnas}, "
+        "content='empleos', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER empleos_fts_ai AFTER INSERT ON empleos BEGIN "
+        f"INSERT INTO empleos_fts(rowid, {columnas}) VALUES (new.id, {nuevas}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER empleos_fts_ad AFTER DELETE ON empleos BEGIN "
+        f"INSERT INTO empleos_fts(empleos_fts, rowid, {columnas}) VALUES ('delete', old.id, {viejas}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER empleos_fts_au AFTER UPDATE OF {columnas} ON empleos BEGIN "
+        f"INSERT INTO empleos_fts(empleos_fts, rowid, {columnas}) VALUES ('delete', old.id, {viejas}); "
+        f"INSERT INTO empleos_fts(rowid, {columnas}) VALUES (new.id, {nuevas}); END"
+    )
+    # Indexar los empleos que ya estaban almacenados
+    op.execute("INSERT INTO empleos_fts(empleos_fts) VALUES ('rebuild')")
+
+
+def _upgrade_postgres() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() no es IMMUTABLE; el envoltorio permite usarla en índices y triggers
+    op.execute(
+        "CREATE OR REPLACE FUNCTION empleos_unaccent(text) RETURNS text AS "
+        "$$ SELECT public.unaccent('public.unaccent', $1) $$ "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+    )
+
+    documento = " || ".join(
+        f"setweight(to_tsvector('spanish', empleos_unaccent(coalesce(NEW.{c}, ''))), '{peso}')"
+        for c, peso in zip(_COLUMNAS, _PESOS_POSTGRES)
+    )
+    op.execute("ALTER TABLE empleos ADD COLUMN busqueda tsvector")
+    op.execute("CREATE INDEX idx_empleo_busqueda_fts ON empleos USING GIN (busqueda)")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION empleos_busqueda_actualizar() RETURNS trigger AS "
+        f"$$ BEGIN NEW.busqueda := {documento}; RETURN NEW; END $$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        f"CREATE TRIGGER empleos_busqueda_tg BEFORE INSERT OR UPDATE OF {', '.join(_COLUMNAS)} "
+        "ON empleos FOR EACH ROW EXECUTE FUNCTION empleos_busqueda_actualizar()"
+    )
+    # Indexar los empleos que ya estaban almacenados (el trigger calcula la columna)
+    op.execute("UPDATE empleos SET denominacion = denominacion")
+
+
+def upgrade() -> None:
+    dialecto = op.get_bind().dialect.name
+    if dialecto == "sqlite":
+        _upgrade_sqlite()
+    elif dialecto == "postgresql":
+        _upgrade_postgres()
+    # Otros motores: la búsqueda por texto usa ILIKE
+
+
+def downgrade() -> None:
+    dialecto = op.get_bind().dialect.name
+    if dialecto == "sqlite":
+        for trigger in ('empleos_fts_au', 'empleos_fts_ad', 'empleos_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS empleos_fts")
+    elif dialecto == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS empleos_busqueda_tg ON empleos")
+        op.execute("DROP FUNCTION IF EXISTS empleos_busqueda_actualizar()")
+        op.execute("DROP INDEX IF EXISTS idx_empleo_busqueda_fts")
+        op.execute("ALTER TABLE empleos DROP COLUMN IF EXISTS busqueda")
+        op.execute("DROP FUNCTION IF EXISTS empleos_unaccent(text)")
@@ -0,0 +1,22 @@
+"""Índice de empleos para la paginación por cursor
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_empleo_activo_fecha_id', 'empleos', ['activo', 'fecha_scraping', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_empleo_activo_fecha_id', table_name='empleos')
@@ -0,0 +1,27 @@
+"""Resumen materializado de estadísticas
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('estadisticas_resumen',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('datos', sa.Text(), nullable=False),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('estadisticas_resumen')
@@ -0,0 +1,34 @@
+"""Cola persistente de mensajes de Telegram
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('mensajes_pendientes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_telegram_id', sa.Integer(), nullable=True),
+        sa.Column('chat_id', sa.String(length=50), nullable=False),
+        sa.Column('texto', sa.Text(), nullable=False),
+        sa.Column('empleo_ids', sa.Text(), nullable=True),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+        sa.Column('intentos', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_telegram_id'], ['usuarios_telegram.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_mensaje_pendiente_fecha', 'mensajes_pendientes', ['fecha_creacion'], unique=False)
+    op.create_index(op.f('ix_mensajes_pendientes_id'), 'mensajes_pendientes', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('mensajes_pendientes')
@@ -0,0 +1,29 @@
+"""Tiempos por etapa del pipeline de scraping
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+# Columnas de tiempos del pipeline en scraping_logs (segundos)
+_TIEMPOS_PIPELINE = ('tiempo_descarga', 'tiempo_escritura', 'tiempo_espera_cola')
+
+
+def upgrade() -> None:
+    for columna in _TIEMPOS_PIPELINE:
+        op.add_column('scraping_logs', sa.Column(columna, sa.Float(), nullable=True))
+    op.add_column('scraping_logs', sa.Column('max_profundidad_cola', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('scraping_logs') as batch_op:
+        for columna in ('max_profundidad_cola',) + _TIEMPOS_PIPELINE:
+            batch_op.drop_column(columna)
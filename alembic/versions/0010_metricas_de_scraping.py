@@ -0,0 +1,32 @@
+"""Tiempos por etapa y reintentos del scraping (métricas)
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+# Columnas de tiempos del scraping en scraping_logs (segundos)
+_TIEMPOS_SCRAPING = (
+    'tiempo_http', 'tiempo_decodificacion', 'tiempo_normalizacion',
+    'tiempo_dimensiones', 'tiempo_commit', 'tiempo_consultas_db',
+)
+
+
+def upgrade() -> None:
+    for columna in _TIEMPOS_SCRAPING:
+        op.add_column('scraping_logs', sa.Column(columna, sa.Float(), nullable=True))
+    op.add_column('scraping_logs', sa.Column('reintentos', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('scraping_logs') as batch_op:
+        for columna in ('reintentos',) + _TIEMPOS_SCRAPING:
+            batch_op.drop_column(columna)
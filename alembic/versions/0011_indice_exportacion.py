@@ -0,0 +1,21 @@
+"""Índice de exportación incremental
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_empleo_fecha_actualizacion_id', 'empleos', ['fecha_actualizacion', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_empleo_fecha_actualizacion_id', table_name='empleos')
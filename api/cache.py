@@ -0,0 +1,100 @@
+# Caché de respuestas de la API (TTL + LRU) con ETag
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+
+class RespuestaCacheada(NamedTuple):
+    cuerpo: bytes
+    etag: str
+    expira: float
+
+
+def normalizar_parametros(parametros: Dict[str, Any], exactos: Iterable[str] = ()) -> str:
+    """Clave estable para un dict de filtros
+
+    Se descartan los valores vacíos, a los textos se les quitan los espacios
+    extremos y las claves se ordenan, así ``?nivel=Técnico`` y
+    ``?nivel=Técnico%20`` comparten entrada. Las mayúsculas se conservan: el
+    ILIKE de SQLite solo ignora las de ASCII, así que "TÉCNICO" y "técnico"
+    pueden dar resultados distintos. Los parámetros en ``exactos`` (p. ej. un
+    cursor) se conservan tal cual.
+    """
+    normalizados = {}
+    for clave, valor in parametros.items():
+        if isinstance(valor, str) and clave not in exactos:
+            valor = valor.strip()
+        if valor is None or valor == '':
+            continue
+        normalizados[clave] = valor
+    return json.dumps(normalizados, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def calcular_etag(cuerpo: bytes) -> str:
+    return '"' + hashlib.blake2b(cuerpo, digest_size=16).hexdigest() + '"'
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluar un encabezado If-None-Match (lista de ETags, débiles o no, o *)"""
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(','):
+        candidato = candidato.strip()
+        if candidato == '*' or candidato.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Cuerpos de respuesta serializados por clave, con expiración y desalojo LRU
+
+    ``invalidar`` vacía la caché; main.py la llama cuando la versión de los
+    datos cambió (los scrapings escriben desde otro proceso). ``ttl_segundos``
+    (api_cache_ttl_segundos) queda como respaldo para cambios que no mueven
+    esa versión.
+    """
+
+    def __init__(self, max_entradas: int = 512, ttl_segundos: float = 30):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas: "OrderedDict[str, RespuestaCacheada]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generacion = 0  # Aumenta con cada invalidación
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obtener(self, clave: str) -> Optional[RespuestaCacheada]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada.expira <= time.monotonic():
+                if entrada is not None:
+                    del self._entradas[clave]
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada
+
+    def guardar(self, clave: str, cuerpo: bytes, generacion: int = None) -> RespuestaCacheada:
+        """Guardar un cuerpo; si se pasa la ``generacion`` leída antes de consultar
+        la base de datos y hubo una invalidación entretanto, no se guarda"""
+        entrada = RespuestaCacheada(cuerpo, calcular_etag(cuerpo), time.monotonic() + self.ttl_segundos)
+        with self._lock:
+            if generacion is not None and generacion != self.generacion:
+                return entrada
+            self._entradas[clave] = entrada
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return entrada
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self.generacion += 1
@@ -0,0 +1,145 @@
+# Micro-benchmark: decodificación y normalización de una página de SIMO
+#
+#   python -m benchmarks.bench_job_records [--payload pagina.json] [--size 100] [--repeat 200]
+#
+# Compara el camino anterior (json + dict por empleo con datetime.now() en
+# cada uno) con el actual (orjson + build_job_dict con la fecha calculada una
+# vez por página). ``--payload`` acepta una página grabada de SIMO, p. ej.:
+#   curl -o pagina.json "https://simo.cnsc.gov.co/empleos/ofertaPublica/?page=0&size=100"
+import argparse
+import json
+import pickle
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+from benchmarks.simo_payload import simo_page_bytes
+from scraping.records import build_job_dict, decode_json, orjson
+
+
+def legacy_process_job_data(job_item: Dict) -> Dict:
+    """process_job_data anterior: dict de 35 claves y datetime.now() por empleo"""
+    empleo = job_item.get('empleo', {})
+    convocatoria = empleo.get('convocatoria', {})
+    entidad = convocatoria.get('entidad', {})
+    denominacion = empleo.get('denominacion', {})
+    grado_nivel = empleo.get('gradoNivel', {})
+
+    # Obtener primera vacante (suele haber una)
+    vacantes = empleo.get('vacantes', [])
+    primera_vacante = vacantes[0] if vacantes else {}
+    municipio = primera_vacante.get('municipio', {})
+    departamento = municipio.get('departamento', {})
+
+    # Obtener requisitos
+    requisitos = empleo.get('requisitosMinimos', [])
+    primer_requisito = requisitos[0] if requisitos else {}
+
+    # Obtener funciones (concatenar todas)
+    funciones = empleo.get('funciones', [])
+    funciones_texto = ' | '.join([f['descripcion'] for f in funciones])
+
+    return {
+        "id": job_item.get('id'),
+        "empleo_id": empleo.get('id'),
+        "codigo_empleo": empleo.get('codigoEmpleo', '').strip(),
+        "denominacion": denominacion.get('nombre', '').strip(),
+        "denominacion_id": denominacion.get('id'),
+        "nivel": grado_nivel.get('nivelNombre', '').strip(),
+        "grado": grado_nivel.get('grado', ''),
+        "descripcion": empleo.get('descripcion', '').strip(),
+        "asignacion_salarial": empleo.get('asignacionSalarial'),
+        "vigencia_salarial": empleo.get('vigenciaSalarial'),
+
+        # Entidad
+        "entidad_nombre": entidad.get('nombre', '').strip(),
+        "entidad_nit": entidad.get('nit', ''),
+        "tipo_entidad": entidad.get('tipoEntidad', {}).get('nombre', ''),
+
+        # Convocatoria
+        "convocatoria_nombre": convocatoria.get('nombre', ''),
+        "convocatoria_codigo": convocatoria.get('codigo', ''),
+        "convocatoria_agno": convocatoria.get('agno'),
+        "tipo_proceso": convocatoria.get('tipoProceso', ''),
+
+        # Ubicación
+        "departamento": departamento.get('nombre', ''),
+        "municipio": municipio.get('nombre', ''),
+        "dependencia": primera_vacante.get('dependencia', {}).get('nombre', ''),
+
+        # Vacantes
+        "cantidad_vacantes": primera_vacante.get('cantidad', 0),
+        "vacantes_disponibles": primera_vacante.get('disponible', 0),
+
+        # Requisitos
+        "estudio_requerido": primer_requisito.get('estudio', '').strip(),
+        "experiencia_requerida": primer_requisito.get('experiencia', '').strip(),
+        "otros_requisitos": primer_requisito.get('otros', ''),
+
+        # Funciones (texto concatenado)
+        "funciones": funciones_texto,
+
+        # Banderas
+        "concurso_ascenso": empleo.get('concursoAscenso', False),
+        "condicion_discapacidad": empleo.get('condicionDiscapacidad', False),
+        "favorito": job_item.get('favorito', False),
+        "fecha_inscripcion": job_item.get('fechaInscripcion'),
+
+        # Metadatos
+        "fecha_scraping": datetime.now().isoformat()
+    }
+
+
+def dict_path(raw: bytes) -> list:
+    return [legacy_process_job_data(job_item) for job_item in json.loads(raw)]
+
+
+def fast_path(raw: bytes) -> list:
+    """Lo que entrega hoy el scraper (y lo que vuelve de un proceso normalizador)"""
+    fecha_scraping = datetime.now().isoformat()
+    return [build_job_dict(job_item, fecha_scraping) for job_item in decode_json(raw)]
+
+
+def medir(funcion: Callable[[], object], repeat: int) -> float:
+    """Mejor tiempo de ``repeat`` ejecuciones, en milisegundos"""
+    mejor = float("inf")
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main() -> Dict:
+    parser = argparse.ArgumentParser(description="Micro-benchmark de la normalización de páginas")
+    parser.add_argument("--payload", help="Página de SIMO grabada (JSON)")
+    parser.add_argument("--size", type=int, default=100, help="Empleos de la página sintética")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, "rb") as f:
+            raw = f.read()
+    else:
+        raw = simo_page_bytes(0, args.size, args.size)
+
+    dicts = fast_path(raw)
+    resultados = {
+        'empleos': len(dicts),
+        'bytes': len(raw),
+        'orjson': orjson is not None,
+        'ms_decodificar_json': medir(lambda: json.loads(raw), args.repeat),
+        'ms_decodificar_rapido': medir(lambda: decode_json(raw), args.repeat),
+        'ms_pagina_anterior': medir(lambda: dict_path(raw), args.repeat),
+        'ms_pagina_actual': medir(lambda: fast_path(raw), args.repeat),
+        # Costo de devolver la página desde un proceso de scraper_process_workers
+        'ms_pickle_pagina': medir(lambda: pickle.dumps(dicts, pickle.HIGHEST_PROTOCOL), args.repeat),
+        'bytes_pickle_pagina': len(pickle.dumps(dicts, pickle.HIGHEST_PROTOCOL)),
+    }
+    for clave, valor in resultados.items():
+        print(f"{clave:>26}: {round(valor, 3) if isinstance(valor, float) else valor}")
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Micro-benchmark: filtrado de un crawl con job_matches_filters frente a JobTable
+#
+#   python -m benchmarks.bench_job_table [--empleos 100000] [--conjuntos 100]
+#
+# Genera conjuntos de filtros aleatorios (nivel, departamento, entidad,
+# denominación, salario mínimo) y los evalúa con el bucle por empleo y con
+# las máscaras vectorizadas de JobTable, verificando que coincidan.
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.simo_payload import simo_page
+from scraping.job_table import JobTable
+from scraping.scraper import SimoApiScraper
+
+
+def conjuntos_de_filtros(jobs: List[Dict], cantidad: int, semilla: int = 0) -> List[Dict]:
+    aleatorio = random.Random(semilla)
+    niveles = sorted({job['nivel'] for job in jobs})
+    departamentos = sorted({job['departamento'] for job in jobs})
+    entidades = sorted({job['entidad_nombre'] for job in jobs})
+    conjuntos = []
+    for _ in range(cantidad):
+        filtros = {}
+        if aleatorio.random() < 0.5:
+            filtros['nivel'] = aleatorio.choice(niveles)
+        if aleatorio.random() < 0.5:
+            filtros['departamento'] = aleatorio.choice(departamentos)
+        if aleatorio.random() < 0.3:
+            filtros['entidad'] = aleatorio.choice(entidades)
+        if aleatorio.random() < 0.3:
+            filtros['denominacion'] = aleatorio.choice(["técnico", "profesional", "auxiliar"])
+        if aleatorio.random() < 0.4:
+            filtros['salario_minimo'] = aleatorio.choice([1_500_000, 2_500_000, 4_000_000])
+        conjuntos.append(filtros)
+    return conjuntos
+
+
+def main() -> Dict:
+    parser = argparse.ArgumentParser(description="Micro-benchmark de filtrado con JobTable")
+    parser.add_argument("--empleos", type=int, default=100_000)
+    parser.add_argument("--conjuntos", type=int, default=100)
+    args = parser.parse_args()
+
+    fecha_scraping = datetime.now().isoformat()
+    scraper = SimoApiScraper()
+    jobs = [scraper.process_job_data(item, fecha_scraping) for item in simo_page(0, args.empleos, args.empleos)]
+    conjuntos = conjuntos_de_filtros(jobs, args.conjuntos)
+
+    inicio = time.perf_counter()
+    esperado = [[job for job in jobs if scraper.job_matches_filters(job, filtros)] for filtros in conjuntos]
+    ms_bucle = (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    tabla = JobTable(jobs)
+    ms_tabla = (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    obtenido = tabla.filter_many(conjuntos)
+    ms_mascaras = (time.perf_counter() - inicio) * 1000
+
+    if obtenido != esperado:
+        raise SystemExit("JobTable no coincide con job_matches_filters")
+
+    resultados = {
+        'empleos': len(jobs),
+        'conjuntos': len(conjuntos),
+        'ms_bucle': ms_bucle,
+        'ms_construir_tabla': ms_tabla,
+        'ms_filtrar_tabla': ms_mascaras,
+        'aceleracion': ms_bucle / (ms_tabla + ms_mascaras),
+    }
+    for clave, valor in resultados.items():
+        print(f"{clave:>20}: {round(valor, 3) if isinstance(valor, float) else valor}")
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Servidor local que imita el endpoint ofertaPublica de SIMO para los benchmarks
+#
+#   python -m benchmarks.fake_simo --total 10000 --latencia 0.05 --port 8765
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import socket
+import time
+from functools import lru_cache
+from typing import Iterator
+
+from aiohttp import web
+
+from benchmarks.simo_payload import simo_item, simo_page_bytes
+
+
+def crear_app(total: int, latencia: float = 0.0, recientes_primero: bool = False) -> web.Application:
+    """App aiohttp con ``?page=&size=`` paginado, Content-Range y latencia fija por petición
+
+    Por defecto sirve las ofertas por id ascendente (las nuevas al final);
+    ``recientes_primero`` invierte el orden, como supone el crawl incremental.
+    """
+
+    @lru_cache(maxsize=4096)
+    def pagina(page: int, size: int) -> bytes:
+        if not recientes_primero:
+            return simo_page_bytes(page * size, size, total)
+        items = [simo_item(i) for i in range(total - 1 - page * size, max(total - 1 - (page + 1) * size, -1), -1)]
+        return json.dumps(items, ensure_ascii=False).encode("utf-8")
+
+    async def oferta_publica(request: web.Request) -> web.Response:
+        try:
+            page = int(request.query.get('page', 0))
+            size = int(request.query.get('size', 20))
+        except ValueError:
+            return web.Response(status=400, text="page y size deben ser enteros")
+
+        if latencia > 0:
+            await asyncio.sleep(latencia)
+
+        inicio = page * size
+        fin = min(inicio + size, total) - 1
+        headers = {'Content-Range': f"{inicio}-{max(fin, inicio)}/{total}"}
+        return web.Response(body=pagina(page, size), content_type="application/json", headers=headers)
+
+    app = web.Application()
+    app.router.add_get('/', oferta_publica)
+    return app
+
+
+def _servir(total: int, latencia: float, port: int, recientes_primero: bool = False) -> None:
+    web.run_app(crear_app(total, latencia, recientes_primero), host="127.0.0.1", port=port,
+                print=None, handle_signals=False)
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def servidor_simo(total: int, latencia: float = 0.0, port: int = None,
+                  recientes_primero: bool = False) -> Iterator[str]:
+    """Levantar el servidor en otro proceso (no compite por la CPU del cliente) y dar su URL"""
+    port = port or puerto_libre()
+    proceso = multiprocessing.Process(target=_servir, args=(total, latencia, port, recientes_primero), daemon=True)
+    proceso.start()
+    try:
+        # Esperar a que acepte conexiones
+        limite = time.monotonic() + 10
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                    break
+            except OSError:
+                if time.monotonic() > limite or not proceso.is_alive():
+                    raise RuntimeError("El servidor SIMO de prueba no arrancó")
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}/"
+    finally:
+        proceso.terminate()
+        proceso.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor SIMO de prueba")
+    parser.add_argument("--total", type=int, default=10_000)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos por petición")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recientes-primero", action="store_true", help="Servir por id descendente")
+    args = parser.parse_args()
+    _servir(args.total, args.latencia, args.port, args.recientes_primero)
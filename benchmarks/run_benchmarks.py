@@ -0,0 +1,209 @@
+# Suite de benchmarks de las rutas críticas: scraping, normalización, upsert y consultas
+#
+#   python -m benchmarks.run_benchmarks --sizes 1000,10000,100000 --output resultados.json
+#   python -m benchmarks.run_benchmarks --sizes 1000,10000 --baseline resultados.json
+#
+# Cada tamaño usa un servidor SIMO local (benchmarks/fake_simo.py) y una base
+# SQLite nueva en un directorio temporal. El resultado es un JSON con tiempos
+# en milisegundos; con ``--baseline`` se compara contra una ejecución anterior
+# y el proceso termina con código 1 si alguna métrica empeora más que
+# ``--tolerancia``.
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from benchmarks.fake_simo import servidor_simo
+from benchmarks.simo_payload import simo_page
+from database.db_service import SimoDatabaseService
+from scraping.records import orjson
+from scraping.scraper import SimoApiScraper
+
+# Consultas representativas de la API (/jobs)
+CONSULTAS = {
+    'sin_filtros': {},
+    'texto': {'texto': "técnico administrativo"},
+    'departamento_nivel': {'departamento': "Antioquia", 'nivel': "Técnico"},
+    'rango_salarial': {'salario_minimo': 2_500_000, 'salario_maximo': 4_000_000},
+    'entidad': {'entidad': "Alcaldía Municipal 42"},
+}
+
+
+def medir(funcion: Callable[[], object], repeticiones: int) -> Dict[str, float]:
+    """Primera ejecución y mediana de las repeticiones, en milisegundos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return {'primera_ms': tiempos[0], 'mediana_ms': statistics.median(tiempos)}
+
+
+def cronometrar(funcion: Callable[[], object]) -> tuple:
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+async def bench_scrape(base_url: str, page_size: int, concurrencia: int, procesos: int = 0) -> tuple:
+    async with SimoApiScraper(base_url=base_url, delay_seconds=0, max_concurrent=concurrencia,
+                              process_workers=procesos) as scraper:
+        inicio = time.perf_counter()
+        jobs = await scraper.scrape_all_jobs(page_size=page_size)
+        duracion = (time.perf_counter() - inicio) * 1000
+        conexiones = scraper.connection_stats.as_dict()
+    return jobs, duracion, conexiones
+
+
+def bench_tamano(total: int, args: argparse.Namespace) -> Dict:
+    resultados: Dict = {'empleos': total}
+
+    # scrape_all_jobs contra el servidor local
+    with servidor_simo(total, args.latencia) as base_url:
+        jobs, duracion, conexiones = asyncio.run(bench_scrape(base_url, args.page_size, args.concurrencia, args.procesos))
+    resultados['scrape_all_jobs'] = {
+        'total_ms': duracion,
+        'empleos_por_s': len(jobs) / (duracion / 1000) if duracion else None,
+        'empleos_obtenidos': len(jobs),
+        'conexiones': conexiones,
+    }
+
+    # process_job_data sobre las páginas ya decodificadas
+    scraper = SimoApiScraper()
+    crudos = simo_page(0, total, total)
+    fecha_scraping = datetime.now().isoformat()
+    _, duracion = cronometrar(lambda: [scraper.process_job_data(item, fecha_scraping) for item in crudos])
+    resultados['process_job_data'] = {'total_ms': duracion, 'us_por_empleo': duracion * 1000 / total}
+    del crudos
+
+    # Base SQLite nueva: el servicio usa ./simo_empleos.db del directorio actual
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="simo-bench-") as directorio:
+        os.chdir(directorio)
+        try:
+            db = SimoDatabaseService()
+
+            stats, duracion = cronometrar(lambda: db.bulk_insert_empleos(jobs))
+            resultados['bulk_insert_empleos'] = {
+                'total_ms': duracion,
+                'empleos_por_s': total / (duracion / 1000) if duracion else None,
+                'nuevos': stats['nuevos'],
+            }
+            # Segunda pasada: todo sin cambios (camino del crawl diario)
+            stats, duracion = cronometrar(lambda: db.bulk_insert_empleos(jobs))
+            resultados['bulk_insert_empleos_sin_cambios'] = {
+                'total_ms': duracion,
+                'sin_cambios': stats['sin_cambios'],
+            }
+
+            resultados['buscar_empleos'] = {
+                nombre: medir(lambda filtros=filtros: db.buscar_empleos(filtros=filtros), args.repeticiones)
+                for nombre, filtros in CONSULTAS.items()
+            }
+            # Página profunda: offset frente a cursor
+            paginas = max(1, total // 20)
+            resultados['buscar_empleos']['pagina_profunda_offset'] = medir(
+                lambda: db.buscar_empleos(pagina=paginas, incluir_total=False), args.repeticiones
+            )
+            cursor = db.buscar_empleos(modo_cursor=True, incluir_total=False, por_pagina=min(total - 1, 5000))['next_cursor']
+            resultados['buscar_empleos']['pagina_profunda_cursor'] = medir(
+                lambda: db.buscar_empleos(cursor=cursor, incluir_total=False), args.repeticiones
+            )
+
+            resultados['obtener_estadisticas'] = medir(db.obtener_estadisticas, args.repeticiones)
+            db.engine.dispose()
+        finally:
+            os.chdir(directorio_original)
+
+    return resultados
+
+
+def _metricas(resultados: Dict, prefijo: str = "") -> Dict[str, float]:
+    """Aplanar a {'10000.buscar_empleos.texto.mediana_ms': valor} (solo tiempos)"""
+    planas = {}
+    for clave, valor in resultados.items():
+        ruta = f"{prefijo}{clave}"
+        if isinstance(valor, dict):
+            planas.update(_metricas(valor, ruta + "."))
+        elif clave.endswith("_ms") and clave != "primera_ms" and isinstance(valor, (int, float)):
+            planas[ruta] = valor
+    return planas
+
+
+def comparar(actual: Dict, base: Dict, tolerancia: float, margen_ms: float = 1.0) -> List[str]:
+    """Métricas que empeoraron más que ``tolerancia`` (0.25 = 25 % más lentas)
+
+    Diferencias menores a ``margen_ms`` se ignoran: en tiempos de décimas de
+    milisegundo el ruido supera cualquier tolerancia relativa.
+    """
+    metricas_base = _metricas(base['resultados'])
+    regresiones = []
+    for nombre, valor in _metricas(actual['resultados']).items():
+        anterior = metricas_base.get(nombre)
+        if anterior and valor > anterior * (1 + tolerancia) and valor - anterior > margen_ms:
+            regresiones.append(f"{nombre}: {anterior:.1f} ms -> {valor:.1f} ms (+{valor / anterior - 1:.0%})")
+    return regresiones
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de scraping, upsert y consultas de SIMO")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Cantidades de empleos, separadas por comas")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Latencia por petición del servidor (s)")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--procesos", type=int, default=0, help="Procesos de normalización del scraper (0 = inline)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument("--baseline", help="Resultados anteriores contra los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    tamanos = [int(t) for t in args.sizes.split(",") if t.strip()]
+    salida = {
+        'meta': {
+            'fecha': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'orjson': orjson is not None,
+            'latencia': args.latencia,
+            'page_size': args.page_size,
+            'concurrencia': args.concurrencia,
+            'procesos': args.procesos,
+            'repeticiones': args.repeticiones,
+        },
+        'resultados': {},
+    }
+    for total in tamanos:
+        print(f"Benchmark con {total} empleos...", file=sys.stderr)
+        salida['resultados'][str(total)] = bench_tamano(total, args)
+
+    texto = json.dumps(salida, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regresiones = comparar(salida, json.load(f), args.tolerancia)
+        for regresion in regresiones:
+            print(f"REGRESIÓN {regresion}", file=sys.stderr)
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
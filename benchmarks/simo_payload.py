@@ -0,0 +1,64 @@
+# Páginas sintéticas con la misma forma que la API pública de SIMO
+import json
+from typing import Dict, List
+
+_NIVELES = ("Asistencial", "Técnico", "Profesional", "Asesor", "Directivo")
+_DEPARTAMENTOS = ("Antioquia", "Bogotá D.C.", "Valle del Cauca", "Santander", "Nariño", "Boyacá")
+
+
+def simo_item(i: int) -> Dict:
+    """Elemento de ``ofertaPublica`` para la oferta ``i`` (determinista)"""
+    departamento = _DEPARTAMENTOS[i % len(_DEPARTAMENTOS)]
+    entidad = i % 97
+    return {
+        "id": 1_000_000 + i,
+        "favorito": False,
+        "fechaInscripcion": None,
+        "empleo": {
+            "id": 500_000 + i,
+            "codigoEmpleo": f" {219 + i % 40}-{i % 12:02d} ",
+            "denominacion": {"id": 3000 + i % 150, "nombre": f" Técnico Administrativo {i % 150} "},
+            "gradoNivel": {"nivelNombre": _NIVELES[i % len(_NIVELES)], "grado": str(i % 24)},
+            "descripcion": " Apoyar la gestión administrativa y documental de la dependencia. " * 3,
+            "asignacionSalarial": 1_800_000 + (i % 60) * 75_000,
+            "vigenciaSalarial": 2024,
+            "convocatoria": {
+                "nombre": f"Proceso de Selección Entidades del Orden Territorial {i % 8}",
+                "codigo": str(2500 + i % 8),
+                "agno": 2024,
+                "tipoProceso": "ABIERTO" if i % 3 else "ASCENSO",
+                "entidad": {
+                    "nombre": f" Alcaldía Municipal {entidad} ",
+                    "nit": str(890_000_000 + entidad),
+                    "tipoEntidad": {"nombre": "Territorial"},
+                },
+            },
+            "vacantes": [{
+                "municipio": {"nombre": f"Municipio {i % 300}", "departamento": {"nombre": departamento}},
+                "dependencia": {"nombre": "Secretaría de Gobierno"},
+                "cantidad": 1 + i % 3,
+                "disponible": 1 + i % 3,
+            }],
+            "requisitosMinimos": [{
+                "estudio": " Título de formación tecnológica en áreas administrativas. ",
+                "experiencia": " Doce (12) meses de experiencia relacionada. ",
+                "otros": "",
+            }],
+            "funciones": [
+                {"descripcion": "Proyectar los documentos y actos administrativos requeridos."},
+                {"descripcion": "Organizar el archivo de gestión de acuerdo con las TRD."},
+                {"descripcion": "Atender a los usuarios internos y externos."},
+            ],
+            "concursoAscenso": i % 3 == 0,
+            "condicionDiscapacidad": False,
+        },
+    }
+
+
+def simo_page(start: int, size: int, total: int) -> List[Dict]:
+    return [simo_item(i) for i in range(start, min(start + size, total))]
+
+
+def simo_page_bytes(start: int, size: int, total: int) -> bytes:
+    """Cuerpo de respuesta tal como lo envía SIMO (JSON UTF-8)"""
+    return json.dumps(simo_page(start, size, total), ensure_ascii=False).encode("utf-8")
@@ -3,7 +3,10 @@ Configuración de la aplicación SIMO Scraper Backend.
 """
 import os
 from typing import Optional
-from pydantic import BaseSettings
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:  # pydantic < 2
+    from pydantic import BaseSettings
 
 
 class Settings(BaseSettings):
@@ -18,13 +21,36 @@ class Settings(BaseSettings):
     database_url: str = "sqlite:///./data/simo_empleos.db"
     database_pool_size: int = 10
     database_max_overflow: int = 20
+    database_pool_timeout: int = 30
+    database_pool_pre_ping: bool = True  # Descarta conexiones caídas antes de usarlas
+    database_pool_recycle: int = 1800  # Segundos; renueva conexiones antes del timeout del servidor
+    sqlite_cache_size_kb: int = 65536  # PRAGMA cache_size por conexión
+    sqlite_mmap_size_mb: int = 256  # PRAGMA mmap_size
+    sqlite_busy_timeout_ms: int = 5000  # Espera de un escritor mientras otro tiene el lock
+    busqueda_total_cache_segundos: int = 60  # Cache del total en buscar_empleos
+    busqueda_total_cache_max_entradas: int = 1024  # Combinaciones de filtros con total cacheado
     
     # Configuración del scraper
     simo_api_url: str = "https://simo.cnsc.gov.co/empleos/ofertaPublica/"
     scraper_max_concurrent: int = 5
-    scraper_delay_seconds: float = 1.0
+    scraper_delay_seconds: float = 1.0  # Espera mínima entre el inicio de dos peticiones (0 = sin límite)
     scraper_timeout_seconds: int = 30
     scraper_retry_attempts: int = 3
+    scraper_retry_base_seconds: float = 1.0  # Espera inicial del backoff exponencial
+    scraper_circuit_failure_threshold: int = 10  # Fallos seguidos que abren el circuito
+    scraper_circuit_reset_seconds: float = 60.0  # Tiempo abierto antes de una petición de prueba
+    scraper_checkpoint_path: str = "./crawl_checkpoint.json"
+    scraper_checkpoint_max_age_hours: float = 6.0  # Más viejo, SIMO pudo correr demasiado las páginas
+    scraper_connect_timeout_seconds: float = 10.0  # Establecer conexión (incluye TLS)
+    scraper_dns_cache_seconds: int = 300  # TTL de la caché DNS del connector
+    scraper_keepalive_seconds: float = 30.0  # Conexiones ociosas reutilizables
+    scraper_process_workers: int = 0  # Procesos que normalizan las páginas (0 = en el event loop)
+    
+    # Crawl incremental: se detiene al encontrar páginas con ofertas ya conocidas
+    scraper_delta_enabled: bool = True
+    scraper_delta_stop_pages: int = 1
+    scraper_full_crawl_interval_hours: int = 168  # Crawl completo semanal
+    pipeline_max_paginas_en_cola: int = 8  # Páginas descargadas esperando escritura (contrapresión)
     
     # Configuración del scheduler
     scheduler_enabled: bool = True
@@ -35,16 +61,31 @@ class Settings(BaseSettings):
     telegram_bot_token: Optional[str] = None
     telegram_admin_chat_id: Optional[str] = None
     telegram_enabled: bool = False
+    telegram_api_url: str = "https://api.telegram.org"
+    telegram_mensajes_por_segundo: float = 25.0  # Límite global de la Bot API (~30/s)
+    telegram_intervalo_por_chat: float = 1.0  # Segundos entre mensajes a un mismo chat
+    telegram_max_intentos: int = 5
+    telegram_max_retry_after: float = 60.0  # Tope de la espera que pide un 429 (segundos)
+    telegram_max_corridas: int = 3  # Corridas de la cola que puede fallar un mensaje antes de descartarlo
     
     # Configuración de API
     api_prefix: str = "/api/v1"
     api_title: str = "SIMO Scraper API"
     api_description: str = "API para consultar ofertas de empleo de SIMO"
+    api_cache_ttl_segundos: int = 30  # Vida de /jobs y /stats cacheadas (se invalidan antes si cambian los empleos)
+    api_cache_max_entradas: int = 512
     
     # Configuración de logs
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
+    # Exportación a Parquet (/export y snapshots)
+    export_directorio: str = "./exports"
+    export_tamano_chunk: int = 10000  # Filas por bloque del cursor y por RecordBatch
+    
+    # Métricas (/metrics)
+    metricas_consultas_db: bool = True  # Medir cada sentencia SQL con eventos de SQLAlchemy
+    
     # Configuración de seguridad
     secret_key: str = "your-secret-key-change-in-production"
     access_token_expire_minutes: int = 30
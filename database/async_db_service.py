@@ -0,0 +1,242 @@
+# Servicio de base de datos asíncrono para SIMO (lecturas de la API y preferencias de usuarios)
+from sqlalchemy import delete, event, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from database.models import (
+    Base, Empleo, MensajePendiente, ScrapingLog, UsuarioTelegram,
+    aplicar_pragmas_sqlite, aplicar_preferencias_usuario, get_database_url
+)
+from database.search import (
+    CacheTotales, aplicar_filtros_empleos, busqueda_texto_disponible, codificar_cursor, decodificar_cursor
+)
+from database.stats import calcular_resumen, formatear_estadisticas, guardar_resumen, leer_resumen
+from typing import Dict, Optional
+import logging
+
+from config import settings
+from metrics import instrumentar_engine
+
+# Drivers asíncronos por tipo de base de datos
+_DRIVERS_ASYNC = {
+    "sqlite": ("sqlite://", "sqlite+aiosqlite://"),
+    "postgresql": ("postgresql://", "postgresql+asyncpg://"),
+}
+
+def get_async_database_url(db_type: str = "sqlite") -> str:
+    """URL de conexión con el driver asíncrono (aiosqlite en desarrollo, asyncpg en producción)"""
+    if db_type not in _DRIVERS_ASYNC:
+        raise ValueError(f"Tipo de base de datos no soportado: {db_type}")
+
+    prefijo, prefijo_async = _DRIVERS_ASYNC[db_type]
+    database_url = get_database_url(db_type)
+    if database_url.startswith(prefijo):
+        database_url = prefijo_async + database_url[len(prefijo):]
+    return database_url
+
+def create_async_database_engine(db_type: str = "sqlite") -> AsyncEngine:
+    """Crear engine asíncrono con el mismo pool (y PRAGMAs de SQLite) que el síncrono"""
+    engine = create_async_engine(
+        get_async_database_url(db_type),
+        echo=False,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_pre_ping=settings.database_pool_pre_ping,
+        pool_recycle=settings.database_pool_recycle
+    )
+    if db_type == "sqlite":
+        event.listen(engine.sync_engine, "connect", aplicar_pragmas_sqlite)
+    if settings.metricas_consultas_db:
+        instrumentar_engine(engine.sync_engine)
+    return engine
+
+class AsyncSimoDatabaseService:
+    """Variante asíncrona de SimoDatabaseService para los endpoints de FastAPI
+
+    Cubre las lecturas (buscar_empleos, obtener_estadisticas) y las operaciones
+    de preferencias de usuarios con la misma semántica que el servicio síncrono,
+    que sigue a cargo de las escrituras masivas del scraping. Llamar a
+    ``iniciar()`` antes de usarlo y a ``cerrar()`` al terminar.
+    """
+
+    def __init__(self, db_type: str = "sqlite"):
+        self.engine = create_async_database_engine(db_type)
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False, autoflush=False)
+        self.logger = logging.getLogger("simo_async_db_service")
+        self.busqueda_texto = False
+
+        # Totales de búsqueda cacheados por filtros (TTL + LRU acotado). Los
+        # scrapings escriben desde otro proceso: comprobar_cambios los descarta
+        self._cache_totales = CacheTotales()
+        self._version_datos = None
+
+    async def iniciar(self) -> None:
+        """Crear las tablas que falten y detectar el índice de texto completo"""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            self.busqueda_texto = await conn.run_sync(busqueda_texto_disponible)
+
+    async def cerrar(self) -> None:
+        await self.engine.dispose()
+
+    def get_session(self) -> AsyncSession:
+        """Obtener nueva sesión asíncrona (usar con ``async with``)"""
+        return self.session_factory()
+
+    def invalidar_cache_busqueda(self) -> None:
+        """Descartar los totales cacheados (los datos de empleos cambiaron)"""
+        self._cache_totales.limpiar()
+
+    async def comprobar_cambios(self) -> bool:
+        """Detectar escrituras de otros procesos; si las hubo, descartar los totales y retornar True
+
+        La versión es la mayor fecha_actualizacion de empleos, que cambia con
+        cada alta, actualización o desactivación y se lee del índice
+        idx_empleo_fecha_actualizacion_id sin recorrer la tabla.
+        """
+        async with self.get_session() as session:
+            version = await session.scalar(select(func.max(Empleo.fecha_actualizacion)))
+
+        if version == self._version_datos:
+            return False
+        self._version_datos = version
+        self.invalidar_cache_busqueda()
+        return True
+
+    async def _contar_empleos(self, session: AsyncSession, consulta, filtros: Optional[Dict]) -> int:
+        """Total de resultados, cacheado por filtros durante busqueda_total_cache_segundos"""
+        total = self._cache_totales.obtener(filtros)
+        if total is None:
+            total = await session.scalar(select(func.count()).select_from(consulta.order_by(None).subquery()))
+            self._cache_totales.guardar(filtros, total)
+        return total
+
+    async def buscar_empleos(self, filtros: Dict = None, pagina: int = 1, por_pagina: int = 20,
+                             cursor: Optional[str] = None, modo_cursor: bool = False,
+                             incluir_total: bool = True) -> Dict:
+        """Buscar empleos con filtros y paginación (ver SimoDatabaseService.buscar_empleos)"""
+        modo_cursor = modo_cursor or cursor is not None
+        async with self.get_session() as session:
+            consulta = select(Empleo).filter(Empleo.activo == True)
+            consulta, orden = aplicar_filtros_empleos(
+                consulta, filtros, self.engine.dialect.name, self.busqueda_texto
+            )
+
+            # Total de registros
+            total = await self._contar_empleos(session, consulta, filtros) if incluir_total else None
+            total_paginas = (total + por_pagina - 1) // por_pagina if total is not None else None
+
+            if modo_cursor:
+                if cursor:
+                    fecha, empleo_id = decodificar_cursor(cursor)
+                    consulta = consulta.filter(tuple_(Empleo.fecha_scraping, Empleo.id) < tuple_(fecha, empleo_id))
+
+                # Un registro extra indica si hay página siguiente
+                empleos = list(await session.scalars(
+                    consulta.order_by(Empleo.fecha_scraping.desc(), Empleo.id.desc()).limit(por_pagina + 1)
+                ))
+                siguiente = None
+                if len(empleos) > por_pagina:
+                    empleos = empleos[:por_pagina]
+                    siguiente = codificar_cursor(empleos[-1])
+
+                return {
+                    'empleos': empleos,
+                    'total': total,
+                    'pagina': None,
+                    'por_pagina': por_pagina,
+                    'total_paginas': total_paginas,
+                    'next_cursor': siguiente
+                }
+
+            # Paginación
+            offset = (pagina - 1) * por_pagina
+            empleos = list(await session.scalars(
+                consulta.order_by(*orden, Empleo.fecha_scraping.desc()).offset(offset).limit(por_pagina)
+            ))
+
+            return {
+                'empleos': empleos,
+                'total': total,
+                'pagina': pagina,
+                'por_pagina': por_pagina,
+                'total_paginas': total_paginas
+            }
+
+    async def obtener_estadisticas(self) -> Dict:
+        """Obtener estadísticas generales desde el resumen materializado"""
+        async with self.get_session() as session:
+            resumen = await session.run_sync(leer_resumen)
+            if resumen is None:
+                resumen = await session.run_sync(calcular_resumen)
+                await session.run_sync(guardar_resumen, resumen)
+                await session.commit()
+
+            stats = formatear_estadisticas(resumen)
+
+            # Últimos scraping logs
+            logs = await session.scalars(
+                select(ScrapingLog).order_by(ScrapingLog.fecha_inicio.desc()).limit(5)
+            )
+            stats['ultimos_scrapings'] = [
+                {
+                    'fecha': log.fecha_inicio.isoformat(),
+                    'exitoso': log.exitoso,
+                    'empleos_encontrados': log.empleos_encontrados,
+                    'empleos_nuevos': log.empleos_nuevos,
+                    'empleos_sin_cambios': log.empleos_sin_cambios
+                }
+                for log in logs
+            ]
+
+            return stats
+
+    async def obtener_usuario_telegram(self, chat_id: str) -> Optional[UsuarioTelegram]:
+        async with self.get_session() as session:
+            return await session.scalar(select(UsuarioTelegram).filter(UsuarioTelegram.chat_id == chat_id))
+
+    async def registrar_usuario_telegram(self, chat_id: str, username: str = None,
+                                         nombre_completo: str = None) -> UsuarioTelegram:
+        """Registrar nuevo usuario de Telegram"""
+        async with self.get_session() as session:
+            # Verificar si ya existe
+            usuario = await session.scalar(select(UsuarioTelegram).filter(UsuarioTelegram.chat_id == chat_id))
+
+            if not usuario:
+                usuario = UsuarioTelegram(
+                    chat_id=chat_id,
+                    username=username,
+                    nombre_completo=nombre_completo
+                )
+                session.add(usuario)
+                await session.commit()
+
+            return usuario
+
+    async def actualizar_preferencias_usuario(self, chat_id: str, preferencias: Dict) -> bool:
+        """Actualizar preferencias de notificación del usuario"""
+        async with self.get_session() as session:
+            usuario = await session.scalar(select(UsuarioTelegram).filter(UsuarioTelegram.chat_id == chat_id))
+
+            if usuario:
+                aplicar_preferencias_usuario(usuario, preferencias)
+                await session.commit()
+                return True
+
+            return False
+
+    async def desactivar_usuario_telegram(self, chat_id: str) -> bool:
+        """Dejar de notificar a un usuario (p. ej. si bloqueó el bot) y descartar sus mensajes en cola"""
+        async with self.get_session() as session:
+            usuario = await session.scalar(select(UsuarioTelegram).filter(UsuarioTelegram.chat_id == chat_id))
+
+            if usuario:
+                usuario.activo = False
+                await session.execute(
+                    delete(MensajePendiente)
+                    .where(MensajePendiente.usuario_telegram_id == usuario.id)
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+                return True
+
+            return False
@@ -1,15 +1,31 @@
 # Servicio de base de datos para SIMO
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy import and_, or_, bindparam, delete, func, insert, update, exists, tuple_
 from database.models import (
-    Empleo, Entidad, Departamento, Municipio, Convocatoria, 
-    ScrapingLog, UsuarioTelegram, NotificacionEnviada,
-    create_database_engine, create_tables, get_session
+    Empleo, EmpleoArchivado, Entidad, Departamento, Municipio, Convocatoria, 
+    EstadisticaResumen, ScrapingLog, UsuarioTelegram, NotificacionEnviada, MensajePendiente,
+    aplicar_preferencias_usuario, create_database_engine, create_tables, get_session
 )
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+from database.dimension_cache import DimensionCache, clave_entidad, clave_convocatoria
+from database.search import (
+    CacheTotales, aplicar_filtros_empleos, busqueda_texto_disponible, codificar_cursor, decodificar_cursor
+)
+from database.stats import (
+    DeltaEstadisticas, aplicar_delta, calcular_resumen, formatear_estadisticas,
+    guardar_resumen, leer_resumen
+)
+from notifications.dispatcher import PERIODOS, IndiceEnviados, NotificationDispatcher, ResultadoEnvio
+from notifications.matcher import SubscriberMatcher
+from scraping.records import job_content_hash
+from metrics import ERRORES, ETAPA, UPSERT_LOTE
+from typing import Any, Callable, Iterable, List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from itertools import islice
 import logging
 import json
+import uuid
+
+from config import settings
 
 class SimoDatabaseService:
     """Servicio para manejar operaciones de base de datos de SIMO"""
@@ -18,13 +34,79 @@ class SimoDatabaseService:
         self.engine = create_database_engine(db_type)
         create_tables(self.engine)
         self.logger = logging.getLogger("simo_db_service")
+        self.busqueda_texto = busqueda_texto_disponible(self.engine)
+        
+        # INSERT ... ON CONFLICT solo en SQLite y PostgreSQL; los demás usan INSERT + UPDATE
+        self.upsert_nativo = self.engine.dialect.name in ("sqlite", "postgresql")
+        if not self.upsert_nativo:
+            self.logger.warning(
+                f"Sin upsert nativo para {self.engine.dialect.name}: los lotes se escriben con INSERT + UPDATE"
+            )
+        
+        # Totales de búsqueda cacheados por filtros (TTL + LRU acotado)
+        self._cache_totales = CacheTotales()
+        
+        # Caché de dimensiones precargada al iniciar
+        self.dimensiones = DimensionCache()
+        self.recargar_dimensiones()
+        
+        # Pares (usuario, empleo) ya notificados, para no repetir envíos
+        self.notificaciones_enviadas = IndiceEnviados()
+        self.recargar_notificaciones_enviadas()
     
     def get_session(self) -> Session:
         """Obtener nueva sesión de base de datos"""
         return get_session(self.engine)
     
+    def recargar_dimensiones(self) -> None:
+        """Recargar la caché de dimensiones desde la base de datos"""
+        session = self.get_session()
+        try:
+            self.dimensiones.cargar(session)
+            self.logger.info(f"Caché de dimensiones cargada: {self.dimensiones.tamano()}")
+        finally:
+            session.close()
+    
+    def recargar_notificaciones_enviadas(self) -> None:
+        """Recargar el índice de notificaciones enviadas desde la base de datos"""
+        session = self.get_session()
+        try:
+            self.notificaciones_enviadas.cargar(session)
+            # Lo que sigue en cola también cuenta como enviado
+            self.notificaciones_enviadas.agregar(
+                (usuario_id, empleo_id)
+                for usuario_id, empleo_ids in session.query(
+                    MensajePendiente.usuario_telegram_id, MensajePendiente.empleo_ids
+                )
+                for empleo_id in json.loads(empleo_ids or '[]')
+            )
+            self.logger.info(f"Índice de notificaciones cargado: {len(self.notificaciones_enviadas)} envíos")
+        finally:
+            session.close()
+    
+    @staticmethod
+    def _referencia(session: Session, modelo, fila_id: int, **campos):
+        """Instancia persistente de una fila cuyo id viene de la caché de dimensiones, sin consultarla
+        
+        Si la sesión ya la tiene se reutiliza; si no, se adjunta una instancia con
+        el id y los ``campos`` conocidos (la clave natural). El resto de columnas
+        se cargan solo si se leen.
+        """
+        existente = session.identity_map.get(session.identity_key(modelo, fila_id))
+        if existente is not None:
+            return existente
+        
+        instancia = modelo(id=fila_id, **campos)
+        make_transient_to_detached(instancia)
+        session.add(instancia)
+        return instancia
+    
     def get_or_create_entidad(self, session: Session, nit: str, nombre: str, tipo_entidad: str = None) -> Entidad:
         """Obtener o crear entidad"""
+        entidad_id = self.dimensiones.obtener(session, 'entidades', clave_entidad(nit, nombre))
+        if entidad_id is not None:
+            return self._referencia(session, Entidad, entidad_id, **({'nit': nit} if nit else {'nombre': nombre}))
+        
         if not nit:
             # Si no hay NIT, buscar por nombre
             entidad = session.query(Entidad).filter(Entidad.nombre == nombre).first()
@@ -33,20 +115,25 @@ class SimoDatabaseService:
         
         if not entidad:
             entidad = Entidad(
-                nit=nit,
+                nit=nit or None,
                 nombre=nombre,
                 tipo_entidad=tipo_entidad
             )
             session.add(entidad)
             session.flush()  # Para obtener el ID
         
+        self.dimensiones.registrar_entidad(session, entidad)
         return entidad
     
     def get_or_create_departamento(self, session: Session, nombre: str) -> Departamento:
         """Obtener o crear departamento"""
         if not nombre:
             return None
-            
+        
+        departamento_id = self.dimensiones.obtener(session, 'departamentos', nombre)
+        if departamento_id is not None:
+            return self._referencia(session, Departamento, departamento_id, nombre=nombre)
+        
         departamento = session.query(Departamento).filter(Departamento.nombre == nombre).first()
         
         if not departamento:
@@ -54,13 +141,18 @@ class SimoDatabaseService:
             session.add(departamento)
             session.flush()
         
+        self.dimensiones.registrar_departamento(session, departamento)
         return departamento
     
     def get_or_create_municipio(self, session: Session, nombre: str, departamento: Departamento) -> Municipio:
         """Obtener o crear municipio"""
         if not nombre or not departamento:
             return None
-            
+        
+        municipio_id = self.dimensiones.obtener(session, 'municipios', (nombre, departamento.id))
+        if municipio_id is not None:
+            return self._referencia(session, Municipio, municipio_id, nombre=nombre, departamento_id=departamento.id)
+        
         municipio = session.query(Municipio).filter(
             and_(Municipio.nombre == nombre, Municipio.departamento_id == departamento.id)
         ).first()
@@ -73,6 +165,7 @@ class SimoDatabaseService:
             session.add(municipio)
             session.flush()
         
+        self.dimensiones.registrar_municipio(session, municipio)
         return municipio
     
     def get_or_create_convocatoria(self, session: Session, nombre: str, codigo: str = None, agno: int = None, tipo_proceso: str = None) -> Convocatoria:
@@ -80,6 +173,12 @@ class SimoDatabaseService:
         if not nombre:
             return None
         
+        convocatoria_id = self.dimensiones.obtener(session, 'convocatorias', clave_convocatoria(nombre, codigo))
+        if convocatoria_id is not None:
+            # Sin código la clave coincide con cualquier convocatoria del nombre: el código queda sin cargar
+            return self._referencia(session, Convocatoria, convocatoria_id, nombre=nombre,
+                                    **({'codigo': codigo} if codigo else {}))
+        
         # Buscar por nombre y código si existe
         query = session.query(Convocatoria).filter(Convocatoria.nombre == nombre)
         if codigo:
@@ -97,47 +196,14 @@ class SimoDatabaseService:
             session.add(convocatoria)
             session.flush()
         
+        self.dimensiones.registrar_convocatoria(session, convocatoria)
         return convocatoria
     
-    def create_or_update_empleo(self, session: Session, empleo_data: Dict) -> Tuple[Empleo, bool]:
-        """Crear o actualizar empleo. Retorna (empleo, es_nuevo)"""
-        simo_id = empleo_data.get('id')
-        
-        # Buscar empleo existente
-        empleo_existente = session.query(Empleo).filter(Empleo.simo_id == simo_id).first()
-        es_nuevo = empleo_existente is None
-        
-        # Crear relaciones
-        entidad = None
-        if empleo_data.get('entidad_nombre'):
-            entidad = self.get_or_create_entidad(
-                session,
-                empleo_data.get('entidad_nit', ''),
-                empleo_data.get('entidad_nombre'),
-                empleo_data.get('tipo_entidad')
-            )
-        
-        departamento = None
-        if empleo_data.get('departamento'):
-            departamento = self.get_or_create_departamento(session, empleo_data.get('departamento'))
-        
-        municipio = None
-        if empleo_data.get('municipio') and departamento:
-            municipio = self.get_or_create_municipio(session, empleo_data.get('municipio'), departamento)
-        
-        convocatoria = None
-        if empleo_data.get('convocatoria_nombre'):
-            convocatoria = self.get_or_create_convocatoria(
-                session,
-                empleo_data.get('convocatoria_nombre'),
-                empleo_data.get('convocatoria_codigo'),
-                empleo_data.get('convocatoria_agno'),
-                empleo_data.get('tipo_proceso')
-            )
-        
-        # Datos del empleo
-        empleo_fields = {
-            'simo_id': simo_id,
+    @staticmethod
+    def _campos_empleo(empleo_data: Dict) -> Dict:
+        """Columnas propias de Empleo a partir de un empleo procesado por el scraper"""
+        return {
+            'simo_id': empleo_data.get('id'),
             'empleo_id': empleo_data.get('empleo_id'),
             'codigo_empleo': empleo_data.get('codigo_empleo', '').strip(),
             'denominacion': empleo_data.get('denominacion', '').strip(),
@@ -165,12 +231,40 @@ class SimoDatabaseService:
             'favorito': empleo_data.get('favorito', False),
             'fecha_inscripcion': empleo_data.get('fecha_inscripcion'),
             'activo': True,
-            # Relaciones
-            'entidad_id': entidad.id if entidad else None,
-            'departamento_id': departamento.id if departamento else None,
-            'municipio_id': municipio.id if municipio else None,
-            'convocatoria_id': convocatoria.id if convocatoria else None,
         }
+    
+    def create_or_update_empleo(self, session: Session, empleo_data: Dict,
+                                generacion: str = None) -> Tuple[Empleo, bool]:
+        """Crear o actualizar empleo. Retorna (empleo, es_nuevo)
+        
+        Si el empleo existe, está activo y su hash de contenido no cambió, solo se
+        marca con la generación de crawl (si se indica).
+        """
+        simo_id = empleo_data.get('id')
+        hash_contenido = job_content_hash(empleo_data)
+        
+        # Buscar empleo existente
+        empleo_existente = session.query(Empleo).filter(Empleo.simo_id == simo_id).first()
+        es_nuevo = empleo_existente is None
+        
+        if not es_nuevo and empleo_existente.activo and empleo_existente.hash_contenido == hash_contenido:
+            if generacion and empleo_existente.generacion_crawl != generacion:
+                empleo_existente.generacion_crawl = generacion
+                session.flush()
+            return empleo_existente, False
+        
+        # Relaciones resueltas con la caché de dimensiones
+        dimensiones = self._resolver_dimensiones(session, [empleo_data])
+        
+        # Datos del empleo
+        empleo_fields = self._campos_empleo(empleo_data)
+        empleo_fields.update(self._ids_dimensiones(empleo_data, dimensiones))
+        empleo_fields['hash_contenido'] = hash_contenido
+        if generacion:
+            empleo_fields['generacion_crawl'] = generacion
+        # Hora local también al crear (el default del modelo es UTC): la exportación
+        # incremental compara fecha_actualizacion entre filas nuevas y actualizadas
+        empleo_fields['fecha_actualizacion'] = datetime.now()
         
         if es_nuevo:
             # Crear nuevo empleo
@@ -179,7 +273,6 @@ class SimoDatabaseService:
             session.add(empleo)
         else:
             # Actualizar empleo existente
-            empleo_fields['fecha_actualizacion'] = datetime.now()
             for field, value in empleo_fields.items():
                 setattr(empleo_existente, field, value)
             empleo = empleo_existente
@@ -187,40 +280,405 @@ class SimoDatabaseService:
         session.flush()
         return empleo, es_nuevo
     
-    def bulk_insert_empleos(self, empleos_data: List[Dict]) -> Dict[str, int]:
-        """Inserción masiva de empleos"""
+    def _resolver_dimensiones(self, session: Session, lote: List[Dict]) -> Dict[str, Dict]:
+        """Resolver en bloque entidades, departamentos, municipios y convocatorias de un lote
+        
+        Primero se consulta la caché de dimensiones; para las claves que falten se
+        hace una consulta por tabla y las filas inexistentes se crean con un solo
+        flush. Retorna mapas clave natural -> id.
+        """
+        cache = self.dimensiones
+        
+        # Claves naturales presentes en el lote (primera aparición, para crear faltantes)
+        entidades = {}
+        departamentos = set()
+        convocatorias = {}
+        for empleo_data in lote:
+            if empleo_data.get('entidad_nombre'):
+                clave = clave_entidad(empleo_data.get('entidad_nit'), empleo_data['entidad_nombre'])
+                entidades.setdefault(clave, empleo_data)
+            if empleo_data.get('departamento'):
+                departamentos.add(empleo_data['departamento'])
+            if empleo_data.get('convocatoria_nombre'):
+                clave = clave_convocatoria(empleo_data['convocatoria_nombre'], empleo_data.get('convocatoria_codigo'))
+                convocatorias.setdefault(clave, empleo_data)
+        
+        def faltantes(tabla, claves):
+            return [clave for clave in claves if cache.obtener(session, tabla, clave) is None]
+        
+        # Consultar en la base de datos solo lo que no está en caché
+        entidades_faltantes = faltantes('entidades', entidades)
+        if entidades_faltantes:
+            nits = [valor for tipo, valor in entidades_faltantes if tipo == 'nit']
+            nombres = [valor for tipo, valor in entidades_faltantes if tipo == 'nombre']
+            for entidad in session.query(Entidad).filter(or_(Entidad.nit.in_(nits), Entidad.nombre.in_(nombres))):
+                cache.registrar_entidad(session, entidad)
+        
+        departamentos_faltantes = faltantes('departamentos', departamentos)
+        if departamentos_faltantes:
+            for departamento in session.query(Departamento).filter(Departamento.nombre.in_(departamentos_faltantes)):
+                cache.registrar_departamento(session, departamento)
+        
+        convocatorias_faltantes = faltantes('convocatorias', convocatorias)
+        if convocatorias_faltantes:
+            nombres = {nombre for nombre, _ in convocatorias_faltantes}
+            for convocatoria in session.query(Convocatoria).filter(Convocatoria.nombre.in_(nombres)).order_by(Convocatoria.id):
+                cache.registrar_convocatoria(session, convocatoria)
+        
+        # Crear las filas inexistentes (excepto municipios, que dependen del departamento).
+        # Las claves con NIT/código van primero para que las que solo tienen nombre
+        # reutilicen lo creado en el mismo lote, como en el camino fila por fila.
+        nuevas_entidades = {}
+        for clave in sorted(faltantes('entidades', entidades), key=lambda c: c[0] != 'nit'):
+            empleo_data = entidades[clave]
+            nombre = empleo_data['entidad_nombre']
+            if clave[0] == 'nombre' and nombre in nuevas_entidades:
+                continue
+            nuevas_entidades.setdefault(nombre, []).append(Entidad(
+                nit=empleo_data.get('entidad_nit') or None,
+                nombre=nombre,
+                tipo_entidad=empleo_data.get('tipo_entidad')
+            ))
+        
+        nuevos_departamentos = [Departamento(nombre=nombre) for nombre in faltantes('departamentos', departamentos)]
+        
+        nuevas_convocatorias = {}
+        for clave in sorted(faltantes('convocatorias', convocatorias), key=lambda c: c[1] is None):
+            empleo_data = convocatorias[clave]
+            nombre, codigo = clave
+            if codigo is None and nombre in nuevas_convocatorias:
+                continue
+            nuevas_convocatorias.setdefault(nombre, []).append(Convocatoria(
+                nombre=nombre,
+                codigo=codigo,
+                agno=empleo_data.get('convocatoria_agno'),
+                tipo_proceso=empleo_data.get('tipo_proceso')
+            ))
+        
+        nuevos = (
+            [e for grupo in nuevas_entidades.values() for e in grupo]
+            + nuevos_departamentos
+            + [c for grupo in nuevas_convocatorias.values() for c in grupo]
+        )
+        if nuevos:
+            session.add_all(nuevos)
+            session.flush()
+            for objeto in nuevos:
+                if isinstance(objeto, Entidad):
+                    cache.registrar_entidad(session, objeto)
+                elif isinstance(objeto, Departamento):
+                    cache.registrar_departamento(session, objeto)
+                else:
+                    cache.registrar_convocatoria(session, objeto)
+        
+        ids = {
+            'entidades': {clave: cache.obtener(session, 'entidades', clave) for clave in entidades},
+            'departamentos': {nombre: cache.obtener(session, 'departamentos', nombre) for nombre in departamentos},
+            'convocatorias': {clave: cache.obtener(session, 'convocatorias', clave) for clave in convocatorias},
+        }
+        
+        # Municipios por (nombre, departamento_id)
+        municipios = {
+            (e['municipio'], ids['departamentos'][e['departamento']])
+            for e in lote if e.get('municipio') and e.get('departamento')
+        }
+        municipios_faltantes = faltantes('municipios', municipios)
+        if municipios_faltantes:
+            for municipio in session.query(Municipio).filter(
+                Municipio.departamento_id.in_({departamento_id for _, departamento_id in municipios_faltantes}),
+                Municipio.nombre.in_({nombre for nombre, _ in municipios_faltantes})
+            ).order_by(Municipio.id):
+                cache.registrar_municipio(session, municipio)
+            
+            nuevos_municipios = [
+                Municipio(nombre=nombre, departamento_id=departamento_id)
+                for nombre, departamento_id in faltantes('municipios', municipios)
+            ]
+            if nuevos_municipios:
+                session.add_all(nuevos_municipios)
+                session.flush()
+                for municipio in nuevos_municipios:
+                    cache.registrar_municipio(session, municipio)
+        
+        ids['municipios'] = {clave: cache.obtener(session, 'municipios', clave) for clave in municipios}
+        return ids
+    
+    def _ids_dimensiones(self, empleo_data: Dict, dimensiones: Dict[str, Dict]) -> Dict[str, Optional[int]]:
+        """Ids de las relaciones de un empleo a partir de las dimensiones resueltas"""
+        entidad_id = None
+        if empleo_data.get('entidad_nombre'):
+            clave = clave_entidad(empleo_data.get('entidad_nit'), empleo_data['entidad_nombre'])
+            entidad_id = dimensiones['entidades'][clave]
+        
+        departamento_id = dimensiones['departamentos'].get(empleo_data.get('departamento'))
+        municipio_id = None
+        if empleo_data.get('municipio') and departamento_id:
+            municipio_id = dimensiones['municipios'][(empleo_data['municipio'], departamento_id)]
+        
+        convocatoria_id = None
+        if empleo_data.get('convocatoria_nombre'):
+            clave = clave_convocatoria(empleo_data['convocatoria_nombre'], empleo_data.get('convocatoria_codigo'))
+            convocatoria_id = dimensiones['convocatorias'][clave]
+        
+        return {
+            'entidad_id': entidad_id,
+            'departamento_id': departamento_id,
+            'municipio_id': municipio_id,
+            'convocatoria_id': convocatoria_id,
+        }
+    
+    def _sentencia_upsert_empleos(self, columnas: List[str]):
+        """INSERT ... ON CONFLICT (simo_id) DO UPDATE según el dialecto del engine (SQLite o PostgreSQL)"""
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        
+        stmt = insert(Empleo)
+        # fecha_scraping conserva la fecha en que se vio la oferta por primera vez
+        set_ = {
+            columna: stmt.excluded[columna]
+            for columna in columnas
+            if columna not in ('simo_id', 'fecha_scraping')
+        }
+        set_['fecha_actualizacion'] = datetime.now()
+        return stmt.on_conflict_do_update(index_elements=[Empleo.simo_id], set_=set_)
+    
+    def _escribir_filas(self, session: Session, filas: List[Dict], existentes: Dict[int, Any]) -> None:
+        """Escribir las filas de un lote: upsert nativo, o INSERT de las nuevas y UPDATE por simo_id
+        de las existentes en los demás dialectos (``existentes`` viene de _empleos_existentes)"""
+        if self.upsert_nativo:
+            # executemany: con psycopg2 SQLAlchemy lo envía como INSERT multi-fila
+            # (insertmanyvalues) y con sqlite3 reutiliza una sola sentencia preparada
+            session.execute(self._sentencia_upsert_empleos(list(filas[0])), filas)
+            return
+        
+        nuevas = [fila for fila in filas if fila['simo_id'] not in existentes]
+        actualizadas = [fila for fila in filas if fila['simo_id'] in existentes]
+        if nuevas:
+            session.execute(insert(Empleo), nuevas)
+        if actualizadas:
+            tabla = Empleo.__table__
+            # fecha_scraping conserva la fecha en que se vio la oferta por primera vez
+            columnas = [c for c in actualizadas[0] if c not in ('simo_id', 'fecha_scraping')]
+            session.execute(
+                update(tabla)
+                .where(tabla.c.simo_id == bindparam('b_simo_id'))
+                .values({columna: bindparam(f'b_{columna}') for columna in columnas}),
+                [{f'b_{columna}': valor for columna, valor in fila.items()} for fila in actualizadas]
+            )
+    
+    @staticmethod
+    def _empleos_existentes(session: Session, simo_ids: Iterable[int]) -> Dict[int, Any]:
+        """simo_id -> (hash, activo y columnas de estadísticas) de los empleos existentes"""
+        simo_ids = list(simo_ids)
+        if not simo_ids:
+            return {}
+        
+        return {
+            fila.simo_id: fila
+            for fila in session.query(
+                Empleo.simo_id, Empleo.hash_contenido, Empleo.activo,
+                Empleo.nivel, Empleo.departamento, Empleo.asignacion_salarial
+            ).filter(Empleo.simo_id.in_(simo_ids))
+        }
+    
+    @staticmethod
+    def _hash_vigente(existente) -> Optional[str]:
+        """Hash de un empleo existente; None si no existe o está inactivo (hay que escribirlo)"""
+        return existente.hash_contenido if existente is not None and existente.activo else None
+    
+    @staticmethod
+    def _registrar_cambio(delta: DeltaEstadisticas, existente, nivel: str,
+                          departamento: Optional[str], salario: Optional[float]) -> None:
+        """Registrar en el delta de estadísticas la escritura de un empleo activo"""
+        if existente is not None and existente.activo:
+            delta.quitar(existente.nivel, existente.departamento, existente.asignacion_salarial)
+        delta.agregar(nivel, departamento, salario)
+    
+    @staticmethod
+    def _marcar_generacion(session: Session, simo_ids: List[int], generacion: str) -> None:
+        """Marcar empleos como vistos en una generación de crawl con un solo UPDATE"""
+        if not simo_ids:
+            return
+        
+        session.execute(
+            update(Empleo)
+            .where(Empleo.simo_id.in_(simo_ids))
+            .where(or_(Empleo.generacion_crawl.is_(None), Empleo.generacion_crawl != generacion))
+            # Sin cambios de contenido: conservar fecha_actualizacion (el onupdate la pisaría)
+            .values(generacion_crawl=generacion, fecha_actualizacion=Empleo.fecha_actualizacion)
+            .execution_options(synchronize_session=False)
+        )
+    
+    def _upsert_lote(self, session: Session, lote: List[Dict], generacion: str = None,
+                     delta: DeltaEstadisticas = None) -> Dict[str, int]:
+        """Upsert set-based de un lote de empleos"""
+        # Deduplicar por simo_id (gana la última aparición), un mismo id no
+        # puede afectar dos veces la misma fila en un INSERT ... ON CONFLICT
+        por_id = {}
+        sin_id = []
+        for empleo_data in lote:
+            if empleo_data.get('id') is None:
+                sin_id.append(empleo_data)
+            else:
+                por_id[empleo_data['id']] = empleo_data
+        lote = list(por_id.values()) + sin_id
+        
+        existentes = self._empleos_existentes(session, por_id)
+        
+        # Descartar los empleos activos cuyo contenido no cambió
+        hashes = {id(empleo_data): job_content_hash(empleo_data) for empleo_data in lote}
+        cambiados = [
+            empleo_data for empleo_data in lote
+            if self._hash_vigente(existentes.get(empleo_data.get('id'))) != hashes[id(empleo_data)]
+        ]
+        sin_cambios = len(lote) - len(cambiados)
+        
+        if generacion and sin_cambios:
+            ids_cambiados = {id(empleo_data) for empleo_data in cambiados}
+            self._marcar_generacion(
+                session,
+                [e['id'] for e in lote if id(e) not in ids_cambiados and e.get('id') is not None],
+                generacion
+            )
+        
+        filas = []
+        if cambiados:
+            with ETAPA.time(etapa="dimensiones"):
+                dimensiones = self._resolver_dimensiones(session, cambiados)
+            ahora = datetime.now()
+            
+            for empleo_data in cambiados:
+                fila = self._campos_empleo(empleo_data)
+                fila.update(self._ids_dimensiones(empleo_data, dimensiones))
+                fila['hash_contenido'] = hashes[id(empleo_data)]
+                fila['fecha_scraping'] = datetime.fromisoformat(empleo_data.get('fecha_scraping', ahora.isoformat()))
+                fila['fecha_actualizacion'] = ahora  # Hora local, como en las actualizaciones
+                if generacion:
+                    fila['generacion_crawl'] = generacion
+                filas.append(fila)
+            
+            self._escribir_filas(session, filas, existentes)
+            
+            if delta is not None:
+                for fila in filas:
+                    self._registrar_cambio(delta, existentes.get(fila['simo_id']), fila['nivel'],
+                                           fila['departamento'], fila['asignacion_salarial'])
+        
+        nuevos = sum(1 for fila in filas if fila['simo_id'] not in existentes)
+        return {
+            'procesados': len(lote),
+            'nuevos': nuevos,
+            'actualizados': len(filas) - nuevos,
+            'sin_cambios': sin_cambios,
+            'errores': 0
+        }
+    
+    def _upsert_fila_por_fila(self, session: Session, lote: List[Dict], generacion: str = None,
+                              delta: DeltaEstadisticas = None) -> Dict[str, int]:
+        """Procesar un lote empleo por empleo, aislando los errores con savepoints
+        
+        Con ``generacion`` todos los empleos recibidos quedan marcados como vistos,
+        también los que fallaron: siguen publicados en SIMO y desactivar_no_vistos
+        no debe darlos de baja.
+        """
+        stats = {'procesados': 0, 'nuevos': 0, 'actualizados': 0, 'sin_cambios': 0, 'errores': 0}
+        existentes = self._empleos_existentes(
+            session, {e.get('id') for e in lote if e.get('id') is not None}
+        )
+        
+        for empleo_data in lote:
+            try:
+                existente = existentes.get(empleo_data.get('id'))
+                if self._hash_vigente(existente) == job_content_hash(empleo_data):
+                    stats['procesados'] += 1
+                    stats['sin_cambios'] += 1
+                    continue
+                
+                with session.begin_nested():
+                    empleo, es_nuevo = self.create_or_update_empleo(session, empleo_data, generacion)
+                
+                if delta is not None:
+                    self._registrar_cambio(delta, existente, empleo.nivel, empleo.departamento,
+                                           empleo.asignacion_salarial)
+                    # Un simo_id repetido en el lote ya no está en su estado anterior
+                    existentes[empleo.simo_id] = empleo
+                
+                stats['procesados'] += 1
+                if es_nuevo:
+                    stats['nuevos'] += 1
+                else:
+                    stats['actualizados'] += 1
+            
+            except Exception as e:
+                stats['errores'] += 1
+                ERRORES.inc(etapa="escritura")
+                self.logger.error(f"Error procesando empleo {empleo_data.get('id', 'N/A')}: {e}")
+                continue
+        
+        if generacion:
+            self._marcar_generacion(
+                session, [e['id'] for e in lote if e.get('id') is not None], generacion
+            )
+        
+        return stats
+    
+    def bulk_insert_empleos(self, empleos_data: Iterable[Dict], tamano_lote: int = 500,
+                            generacion: str = None) -> Dict[str, int]:
+        """Inserción masiva de empleos
+        
+        Cada lote se escribe con un upsert set-based (una consulta de ids
+        existentes, dimensiones resueltas en bloque y un INSERT ... ON CONFLICT).
+        Los empleos cuyo hash de contenido no cambió no se reescriben y se cuentan
+        en ``sin_cambios``. Si el lote falla se reintenta fila por fila para
+        aislar los errores.
+        
+        Con ``generacion`` todos los empleos recibidos quedan marcados como vistos
+        en ese crawl, para luego llamar a ``desactivar_no_vistos``. El delta de
+        estadísticas de cada lote se aplica al resumen en la misma transacción.
+        """
         stats = {
             'procesados': 0,
             'nuevos': 0,
             'actualizados': 0,
+            'sin_cambios': 0,
             'errores': 0
         }
         
+        empleos_data = iter(empleos_data)
         session = self.get_session()
         try:
-            for empleo_data in empleos_data:
+            while True:
+                lote = list(islice(empleos_data, tamano_lote))
+                if not lote:
+                    break
+                
+                # El delta de estadísticas se confirma junto con el lote
+                delta_lote = DeltaEstadisticas()
                 try:
-                    empleo, es_nuevo = self.create_or_update_empleo(session, empleo_data)
-                    
-                    stats['procesados'] += 1
-                    if es_nuevo:
-                        stats['nuevos'] += 1
-                    else:
-                        stats['actualizados'] += 1
-                    
-                    # Commit cada 100 registros
-                    if stats['procesados'] % 100 == 0:
+                    with UPSERT_LOTE.time():
+                        stats_lote = self._upsert_lote(session, lote, generacion, delta_lote)
+                    self._actualizar_resumen_transaccion(session, delta_lote)
+                    with ETAPA.time(etapa="commit"):
                         session.commit()
-                        self.logger.info(f"Procesados {stats['procesados']} empleos...")
-                
                 except Exception as e:
-                    stats['errores'] += 1
-                    self.logger.error(f"Error procesando empleo {empleo_data.get('id', 'N/A')}: {e}")
                     session.rollback()
-                    continue
+                    ERRORES.inc(etapa="escritura")
+                    self.logger.warning(f"Error en upsert por lote, reintentando fila por fila: {e}")
+                    delta_lote = DeltaEstadisticas()
+                    with UPSERT_LOTE.time():
+                        stats_lote = self._upsert_fila_por_fila(session, lote, generacion, delta_lote)
+                    self._actualizar_resumen_transaccion(session, delta_lote)
+                    with ETAPA.time(etapa="commit"):
+                        session.commit()
+                
+                for clave, valor in stats_lote.items():
+                    stats[clave] += valor
+                
+                self.logger.info(f"Procesados {stats['procesados']} empleos...")
             
-            # Commit final
-            session.commit()
+            self.invalidar_cache_busqueda()
             self.logger.info(f"Inserción completada: {stats}")
             
         except Exception as e:
@@ -232,23 +690,184 @@ class SimoDatabaseService:
         
         return stats
     
+    @staticmethod
+    def nueva_generacion_crawl() -> str:
+        """Identificador único para una ejecución de crawl completo"""
+        return uuid.uuid4().hex
+    
+    def desactivar_no_vistos(self, generacion: str) -> int:
+        """Marcar como inactivos los empleos que no aparecieron en un crawl completo
+        
+        Solo debe llamarse después de un crawl completo exitoso: un crawl
+        incremental no recorre todo el catálogo. Se ejecuta como un único UPDATE.
+        """
+        session = self.get_session()
+        try:
+            vistos = session.query(Empleo.id).filter(Empleo.generacion_crawl == generacion).first()
+            if not vistos:
+                self.logger.warning(f"Generación {generacion} sin empleos, se omite la desactivación")
+                return 0
+            
+            resultado = session.execute(
+                update(Empleo)
+                .where(Empleo.activo == True)
+                .where(or_(Empleo.generacion_crawl.is_(None), Empleo.generacion_crawl != generacion))
+                .values(activo=False, fecha_actualizacion=datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+            self._actualizar_resumen_transaccion(session)
+            session.commit()
+            self.invalidar_cache_busqueda()
+            
+            self.logger.info(f"Empleos desactivados (no vistos en {generacion}): {resultado.rowcount}")
+            return resultado.rowcount
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error desactivando empleos no vistos: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def archivar_inactivos(self, dias: int = 90, tamano_lote: int = 1000) -> int:
+        """Mover a empleos_archivados los empleos inactivos sin cambios hace más de ``dias``
+        
+        Los empleos con notificaciones enviadas se conservan en la tabla principal
+        para no romper la referencia de notificaciones_enviadas.
+        """
+        limite = datetime.now() - timedelta(days=dias)
+        columnas = [columna.name for columna in Empleo.__table__.columns]
+        archivados = 0
+        
+        session = self.get_session()
+        try:
+            while True:
+                empleos = (
+                    session.query(Empleo)
+                    .filter(Empleo.activo == False, Empleo.fecha_actualizacion < limite)
+                    .filter(~exists().where(NotificacionEnviada.empleo_id == Empleo.id))
+                    .order_by(Empleo.id)
+                    .limit(tamano_lote)
+                    .all()
+                )
+                if not empleos:
+                    break
+                
+                ahora = datetime.now()
+                session.bulk_insert_mappings(EmpleoArchivado, [
+                    {
+                        'empleo_original_id': empleo.id,
+                        'simo_id': empleo.simo_id,
+                        'denominacion': empleo.denominacion,
+                        'nivel': empleo.nivel,
+                        'departamento': empleo.departamento,
+                        'entidad_id': empleo.entidad_id,
+                        'fecha_scraping': empleo.fecha_scraping,
+                        'fecha_actualizacion': empleo.fecha_actualizacion,
+                        'datos': json.dumps(
+                            {columna: getattr(empleo, columna) for columna in columnas},
+                            ensure_ascii=False, default=str
+                        ),
+                        'fecha_archivado': ahora,
+                    }
+                    for empleo in empleos
+                ])
+                session.query(Empleo).filter(Empleo.id.in_([e.id for e in empleos])).delete(synchronize_session=False)
+                session.commit()
+                session.expunge_all()
+                
+                archivados += len(empleos)
+            
+            self.logger.info(f"Empleos archivados: {archivados}")
+            return archivados
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error archivando empleos inactivos: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def obtener_ids_conocidos(self) -> Dict[int, Optional[str]]:
+        """Obtener simo_id -> hash de contenido de las ofertas activas ya almacenadas"""
+        session = self.get_session()
+        try:
+            rows = session.query(Empleo.simo_id, Empleo.hash_contenido).filter(Empleo.activo == True).all()
+            return {simo_id: hash_contenido for simo_id, hash_contenido in rows}
+        finally:
+            session.close()
+    
+    def ultimo_crawl_completo(self) -> Optional[datetime]:
+        """Fecha de inicio del último crawl completo exitoso"""
+        session = self.get_session()
+        try:
+            log = (
+                session.query(ScrapingLog)
+                .filter(ScrapingLog.modo == "completo", ScrapingLog.exitoso == True)
+                .order_by(ScrapingLog.fecha_inicio.desc())
+                .first()
+            )
+            return log.fecha_inicio if log else None
+        finally:
+            session.close()
+    
+    def obtener_ids_para_crawl_incremental(self, intervalo_horas: int = None) -> Optional[Dict[int, Optional[str]]]:
+        """Ids (y hashes) conocidos para un crawl incremental, o None si corresponde un crawl completo
+        
+        Se fuerza un crawl completo si el modo incremental está desactivado, si no
+        hay ofertas almacenadas o si el último crawl completo es más antiguo que
+        ``intervalo_horas`` (por defecto ``settings.scraper_full_crawl_interval_hours``).
+        """
+        if not settings.scraper_delta_enabled:
+            return None
+        
+        if intervalo_horas is None:
+            intervalo_horas = settings.scraper_full_crawl_interval_hours
+        
+        ultimo_completo = self.ultimo_crawl_completo()
+        if not ultimo_completo or datetime.now() - ultimo_completo >= timedelta(hours=intervalo_horas):
+            self.logger.info("Corresponde crawl completo")
+            return None
+        
+        ids_conocidos = self.obtener_ids_conocidos()
+        if not ids_conocidos:
+            return None
+        
+        self.logger.info(f"Crawl incremental con {len(ids_conocidos)} ofertas conocidas")
+        return ids_conocidos
+    
     def crear_log_scraping(self, fecha_inicio: datetime, empleos_encontrados: int = 0, 
                           empleos_nuevos: int = 0, empleos_actualizados: int = 0,
+                          empleos_sin_cambios: int = 0,
                           paginas_procesadas: int = 0, exitoso: bool = False,
-                          mensaje_error: str = None, tiempo_ejecucion: float = None) -> int:
-        """Crear registro de log de scraping"""
+                          mensaje_error: str = None, tiempo_ejecucion: float = None,
+                          modo: str = "completo", tiempo_descarga: float = None,
+                          tiempo_escritura: float = None, tiempo_espera_cola: float = None,
+                          max_profundidad_cola: int = None, desglose_etapas: Dict[str, float] = None) -> int:
+        """Crear registro de log de scraping
+        
+        ``desglose_etapas`` (ver metrics.diferencia_etapas) completa las columnas
+        de tiempo por etapa; las claves que no son columnas se ignoran.
+        """
+        columnas = ScrapingLog.__table__.columns
+        desglose = {clave: valor for clave, valor in (desglose_etapas or {}).items() if clave in columnas}
         session = self.get_session()
         try:
             log = ScrapingLog(
+                **desglose,
                 fecha_inicio=fecha_inicio,
                 fecha_fin=datetime.now(),
                 empleos_encontrados=empleos_encontrados,
                 empleos_nuevos=empleos_nuevos,
                 empleos_actualizados=empleos_actualizados,
+                empleos_sin_cambios=empleos_sin_cambios,
                 paginas_procesadas=paginas_procesadas,
+                modo=modo,
                 exitoso=exitoso,
                 mensaje_error=mensaje_error,
-                tiempo_ejecucion=tiempo_ejecucion
+                tiempo_ejecucion=tiempo_ejecucion,
+                tiempo_descarga=tiempo_descarga,
+                tiempo_escritura=tiempo_escritura,
+                tiempo_espera_cola=tiempo_espera_cola,
+                max_profundidad_cola=max_profundidad_cola
             )
             session.add(log)
             session.commit()
@@ -260,98 +879,132 @@ class SimoDatabaseService:
         finally:
             session.close()
     
-    def buscar_empleos(self, filtros: Dict = None, pagina: int = 1, por_pagina: int = 20) -> Dict:
-        """Buscar empleos con filtros y paginación"""
+    def _contar_empleos(self, query, filtros: Optional[Dict]) -> int:
+        """Total de resultados, cacheado por filtros durante busqueda_total_cache_segundos"""
+        total = self._cache_totales.obtener(filtros)
+        if total is None:
+            total = query.order_by(None).count()
+            self._cache_totales.guardar(filtros, total)
+        return total
+    
+    def _actualizar_resumen_transaccion(self, session: Session, delta: DeltaEstadisticas = None) -> None:
+        """Actualizar el resumen materializado dentro de la transacción de ``session`` (sin commit)
+        
+        Con un delta se aplica de forma incremental; sin delta (o si el resumen no
+        existe todavía) se recalcula completo. Como se confirma junto con los
+        cambios de empleos, el resumen no puede quedar desfasado de los datos.
+        Si falla, se descarta en la misma transacción y la próxima lectura lo
+        recalcula: un error del resumen no hace perder la escritura.
+        """
+        if delta is not None and not delta:
+            return
+        
+        try:
+            with session.begin_nested():
+                resumen = leer_resumen(session, bloquear=True) if delta is not None else None
+                if resumen is None:
+                    resumen = calcular_resumen(session)
+                else:
+                    resumen = aplicar_delta(session, resumen, delta)
+                guardar_resumen(session, resumen)
+        except Exception as e:
+            self.logger.error(f"Error actualizando resumen de estadísticas, se recalculará al leerlo: {e}")
+            session.query(EstadisticaResumen).delete(synchronize_session=False)
+    
+    def actualizar_resumen_estadisticas(self, delta: DeltaEstadisticas = None) -> None:
+        """Actualizar el resumen materializado de estadísticas en una transacción propia
+        
+        Las escrituras de empleos ya lo mantienen al día; esto sirve para
+        recalcularlo a pedido. Los errores se registran y no se propagan.
+        """
+        session = self.get_session()
+        try:
+            self._actualizar_resumen_transaccion(session, delta)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error actualizando resumen de estadísticas: {e}")
+        finally:
+            session.close()
+    
+    def invalidar_cache_busqueda(self) -> None:
+        """Descartar los totales cacheados (los datos de empleos cambiaron)"""
+        self._cache_totales.limpiar()
+    
+    def buscar_empleos(self, filtros: Dict = None, pagina: int = 1, por_pagina: int = 20,
+                       cursor: Optional[str] = None, modo_cursor: bool = False,
+                       incluir_total: bool = True) -> Dict:
+        """Buscar empleos con filtros y paginación
+        
+        El filtro ``texto`` busca en denominación, descripción, funciones y estudio
+        requerido con el índice de texto completo (sin distinguir tildes) y ordena
+        los resultados por relevancia.
+        
+        Con ``modo_cursor`` (o si se pasa ``cursor``) la paginación es por keyset
+        sobre (fecha_scraping DESC, id DESC): cada página es un rango del índice y
+        la respuesta incluye ``next_cursor`` para pedir la siguiente. En este modo
+        el orden es siempre por fecha, también con ``texto``. El total es opcional
+        (``incluir_total``) y se cachea por filtros.
+        """
+        modo_cursor = modo_cursor or cursor is not None
         session = self.get_session()
         try:
             query = session.query(Empleo).filter(Empleo.activo == True)
+            query, orden = aplicar_filtros_empleos(
+                query, filtros, self.engine.dialect.name, self.busqueda_texto
+            )
             
-            # Aplicar filtros
-            if filtros:
-                if filtros.get('denominacion'):
-                    query = query.filter(Empleo.denominacion.ilike(f"%{filtros['denominacion']}%"))
-                
-                if filtros.get('nivel'):
-                    query = query.filter(Empleo.nivel.ilike(f"%{filtros['nivel']}%"))
-                
-                if filtros.get('departamento'):
-                    query = query.filter(Empleo.departamento.ilike(f"%{filtros['departamento']}%"))
-                
-                if filtros.get('municipio'):
-                    query = query.filter(Empleo.municipio.ilike(f"%{filtros['municipio']}%"))
-                
-                if filtros.get('salario_minimo'):
-                    query = query.filter(Empleo.asignacion_salarial >= filtros['salario_minimo'])
+            # Total de registros
+            total = self._contar_empleos(query, filtros) if incluir_total else None
+            total_paginas = (total + por_pagina - 1) // por_pagina if total is not None else None
+            
+            if modo_cursor:
+                if cursor:
+                    fecha, empleo_id = decodificar_cursor(cursor)
+                    query = query.filter(tuple_(Empleo.fecha_scraping, Empleo.id) < tuple_(fecha, empleo_id))
                 
-                if filtros.get('salario_maximo'):
-                    query = query.filter(Empleo.asignacion_salarial <= filtros['salario_maximo'])
+                # Un registro extra indica si hay página siguiente
+                empleos = query.order_by(Empleo.fecha_scraping.desc(), Empleo.id.desc()).limit(por_pagina + 1).all()
+                siguiente = None
+                if len(empleos) > por_pagina:
+                    empleos = empleos[:por_pagina]
+                    siguiente = codificar_cursor(empleos[-1])
                 
-                if filtros.get('entidad'):
-                    query = query.join(Entidad).filter(Entidad.nombre.ilike(f"%{filtros['entidad']}%"))
-            
-            # Total de registros
-            total = query.count()
+                return {
+                    'empleos': empleos,
+                    'total': total,
+                    'pagina': None,
+                    'por_pagina': por_pagina,
+                    'total_paginas': total_paginas,
+                    'next_cursor': siguiente
+                }
             
             # Paginación
             offset = (pagina - 1) * por_pagina
-            empleos = query.order_by(Empleo.fecha_scraping.desc()).offset(offset).limit(por_pagina).all()
+            empleos = query.order_by(*orden, Empleo.fecha_scraping.desc()).offset(offset).limit(por_pagina).all()
             
             return {
                 'empleos': empleos,
                 'total': total,
                 'pagina': pagina,
                 'por_pagina': por_pagina,
-                'total_paginas': (total + por_pagina - 1) // por_pagina
+                'total_paginas': total_paginas
             }
             
         finally:
             session.close()
     
     def obtener_estadisticas(self) -> Dict:
-        """Obtener estadísticas generales"""
+        """Obtener estadísticas generales desde el resumen materializado"""
         session = self.get_session()
         try:
-            from sqlalchemy import func
-            
-            stats = {}
-            
-            # Total empleos activos
-            stats['total_empleos'] = session.query(Empleo).filter(Empleo.activo == True).count()
+            resumen = leer_resumen(session)
+            if resumen is None:
+                resumen = calcular_resumen(session)
+                guardar_resumen(session, resumen)
+                session.commit()
             
-            # Por nivel
-            stats['por_nivel'] = dict(
-                session.query(Empleo.nivel, func.count(Empleo.id))
-                .filter(Empleo.activo == True)
-                .group_by(Empleo.nivel)
-                .all()
-            )
-            
-            # Por departamento (top 10)
-            stats['top_departamentos'] = dict(
-                session.query(Empleo.departamento, func.count(Empleo.id))
-                .filter(Empleo.activo == True, Empleo.departamento.isnot(None))
-                .group_by(Empleo.departamento)
-                .order_by(func.count(Empleo.id).desc())
-                .limit(10)
-                .all()
-            )
-            
-            # Rango salarial
-            salarios = session.query(
-                func.min(Empleo.asignacion_salarial),
-                func.max(Empleo.asignacion_salarial),
-                func.avg(Empleo.asignacion_salarial)
-            ).filter(
-                Empleo.activo == True,
-                Empleo.asignacion_salarial.isnot(None)
-            ).first()
-            
-            if salarios[0]:
-                stats['salarios'] = {
-                    'minimo': float(salarios[0]),
-                    'maximo': float(salarios[1]),
-                    'promedio': float(salarios[2])
-                }
+            stats = formatear_estadisticas(resumen)
             
             # Últimos scraping logs
             logs = session.query(ScrapingLog).order_by(ScrapingLog.fecha_inicio.desc()).limit(5).all()
@@ -360,7 +1013,8 @@ class SimoDatabaseService:
                     'fecha': log.fecha_inicio.isoformat(),
                     'exitoso': log.exitoso,
                     'empleos_encontrados': log.empleos_encontrados,
-                    'empleos_nuevos': log.empleos_nuevos
+                    'empleos_nuevos': log.empleos_nuevos,
+                    'empleos_sin_cambios': log.empleos_sin_cambios
                 }
                 for log in logs
             ]
@@ -398,23 +1052,30 @@ class SimoDatabaseService:
             usuario = session.query(UsuarioTelegram).filter(UsuarioTelegram.chat_id == chat_id).first()
             
             if usuario:
-                if 'niveles_interes' in preferencias:
-                    usuario.niveles_interes = json.dumps(preferencias['niveles_interes'])
-                
-                if 'departamentos_interes' in preferencias:
-                    usuario.departamentos_interes = json.dumps(preferencias['departamentos_interes'])
-                
-                if 'palabras_clave' in preferencias:
-                    usuario.palabras_clave = json.dumps(preferencias['palabras_clave'])
-                
-                if 'salario_minimo' in preferencias:
-                    usuario.salario_minimo = preferencias['salario_minimo']
-                
-                if 'frecuencia_notificaciones' in preferencias:
-                    usuario.frecuencia_notificaciones = preferencias['frecuencia_notificaciones']
-                
-                usuario.fecha_actualizacion = datetime.now()
+                aplicar_preferencias_usuario(usuario, preferencias)
+                session.commit()
+                return True
+            
+            return False
+            
+        finally:
+            session.close()
+    
+    def desactivar_usuario_telegram(self, chat_id: str) -> bool:
+        """Dejar de notificar a un usuario (p. ej. si bloqueó el bot) y descartar sus mensajes en cola"""
+        session = self.get_session()
+        try:
+            usuario = session.query(UsuarioTelegram).filter(UsuarioTelegram.chat_id == chat_id).first()
+            
+            if usuario:
+                usuario.activo = False
+                session.execute(
+                    delete(MensajePendiente)
+                    .where(MensajePendiente.usuario_telegram_id == usuario.id)
+                    .execution_options(synchronize_session=False)
+                )
                 session.commit()
+                self.logger.info(f"Usuario de Telegram {chat_id} desactivado")
                 return True
             
             return False
@@ -422,6 +1083,210 @@ class SimoDatabaseService:
         finally:
             session.close()
     
+    def construir_motor_coincidencias(self) -> SubscriberMatcher:
+        """Compilar las preferencias de todos los usuarios activos en índices invertidos"""
+        session = self.get_session()
+        try:
+            usuarios = session.query(UsuarioTelegram).filter(UsuarioTelegram.activo == True).all()
+            return SubscriberMatcher(usuarios)
+        finally:
+            session.close()
+    
+    def emparejar_empleos(self, empleos: List[Empleo], motor: SubscriberMatcher = None) -> Dict[int, List[Empleo]]:
+        """Agrupar empleos por id de usuario interesado, evaluando a todos en una pasada"""
+        motor = motor or self.construir_motor_coincidencias()
+        return motor.emparejar(empleos)
+    
+    def _planificar_notificaciones(self, session: Session, despachador: NotificationDispatcher,
+                                   desde: datetime, ahora: datetime) -> Tuple[List, int]:
+        """Emparejar los empleos recientes con los suscriptores activos y armar los envíos"""
+        usuarios = session.query(UsuarioTelegram).filter(UsuarioTelegram.activo == True).all()
+        if not usuarios:
+            return [], 0
+        motor = SubscriberMatcher(usuarios)
+        
+        empleos = session.query(Empleo).filter(
+            Empleo.activo == True,
+            Empleo.fecha_scraping >= desde
+        ).order_by(Empleo.fecha_scraping.desc()).yield_per(1000)
+        coincidencias = motor.emparejar(empleos)
+        
+        return despachador.planificar(coincidencias, {u.id: u for u in usuarios}, ahora)
+    
+    def despachar_notificaciones(self, enviar: Callable[[UsuarioTelegram, List[Empleo]], bool],
+                                 desde: datetime = None, tamano_lote: int = 500) -> Dict[str, int]:
+        """Notificar a todos los suscriptores los empleos recientes que les interesan
+        
+        ``enviar(usuario, empleos)`` entrega un mensaje y retorna si tuvo éxito.
+        Los empleos ya notificados a un usuario se descartan con el índice en
+        memoria; los envíos se registran en notificaciones_enviadas por lotes.
+        Por defecto se consideran los empleos del último periodo más largo
+        (semanal), suficiente para armar cualquier resumen pendiente.
+        """
+        ahora = datetime.now()
+        desde = desde or ahora - max(PERIODOS.values())
+        despachador = NotificationDispatcher(self.notificaciones_enviadas, tamano_lote=tamano_lote)
+        stats = {'mensajes': 0, 'empleos_notificados': 0, 'fallidos': 0, 'duplicados': 0}
+        
+        session = self.get_session()
+        try:
+            envios, stats['duplicados'] = self._planificar_notificaciones(session, despachador, desde, ahora)
+            
+            resultados = []
+            for envio in envios:
+                try:
+                    exitosa, error = bool(enviar(envio.usuario, envio.empleos)), None
+                except Exception as e:
+                    exitosa, error = False, str(e)
+                resultados.append((envio, exitosa, error))
+                
+                stats['mensajes'] += 1
+                if exitosa:
+                    stats['empleos_notificados'] += len(envio.empleos)
+                else:
+                    stats['fallidos'] += 1
+            
+            exitosos = despachador.registrar(session, resultados, ahora)
+            session.commit()
+            self.notificaciones_enviadas.agregar(exitosos)
+            
+            self.logger.info(f"Notificaciones despachadas: {stats}")
+            return stats
+            
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error despachando notificaciones: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def encolar_notificaciones(self, formatear: Callable[[List[Empleo]], str],
+                               desde: datetime = None, tamano_lote: int = 500) -> int:
+        """Persistir en mensajes_pendientes los mensajes a enviar, para la cola de Telegram
+        
+        Los pares encolados entran de una vez al índice de enviados para no
+        encolarlos de nuevo (ver ``registrar_resultados_envio``).
+        ``ultima_notificacion`` se actualiza recién con la entrega.
+        Retorna la cantidad de mensajes encolados.
+        """
+        ahora = datetime.now()
+        desde = desde or ahora - max(PERIODOS.values())
+        despachador = NotificationDispatcher(self.notificaciones_enviadas, tamano_lote=tamano_lote)
+        
+        session = self.get_session()
+        try:
+            envios, _ = self._planificar_notificaciones(session, despachador, desde, ahora)
+            
+            filas = [{
+                'usuario_telegram_id': envio.usuario.id,
+                'chat_id': envio.usuario.chat_id,
+                'texto': formatear(envio.empleos),
+                'empleo_ids': json.dumps([empleo.id for empleo in envio.empleos]),
+                'fecha_creacion': ahora,
+            } for envio in envios]
+            for inicio in range(0, len(filas), tamano_lote):
+                session.execute(insert(MensajePendiente), filas[inicio:inicio + tamano_lote])
+            session.commit()
+            
+            self.notificaciones_enviadas.agregar(
+                (envio.usuario.id, empleo.id) for envio in envios for empleo in envio.empleos
+            )
+            self.logger.info(f"Mensajes encolados: {len(filas)}")
+            return len(filas)
+            
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error encolando notificaciones: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def obtener_mensajes_pendientes(self, limite: int = None) -> List[MensajePendiente]:
+        """Mensajes en cola, los más antiguos primero"""
+        session = self.get_session()
+        try:
+            query = session.query(MensajePendiente).order_by(MensajePendiente.fecha_creacion, MensajePendiente.id)
+            if limite:
+                query = query.limit(limite)
+            return query.all()
+        finally:
+            session.close()
+    
+    def registrar_resultados_envio(self, resultados: List[ResultadoEnvio], max_corridas: int = None) -> None:
+        """Registrar el resultado de mensajes de la cola
+        
+        Un mensaje entregado, o con un fallo no reintentable, sale de
+        mensajes_pendientes con una fila de notificaciones_enviadas por empleo.
+        Un fallo reintentable suma un intento y el mensaje queda en cola, hasta
+        ``max_corridas`` (``settings.telegram_max_corridas``); luego se descarta.
+        Los descartados no vuelven a encolarse. Se actualiza
+        ``ultima_notificacion`` de los usuarios con alguna entrega exitosa.
+        """
+        if not resultados:
+            return
+        
+        max_corridas = max_corridas or settings.telegram_max_corridas
+        por_id = {resultado.mensaje_id: resultado for resultado in resultados}
+        ahora = datetime.now()
+        session = self.get_session()
+        try:
+            mensajes = session.query(
+                MensajePendiente.id, MensajePendiente.usuario_telegram_id,
+                MensajePendiente.empleo_ids, MensajePendiente.intentos
+            ).filter(MensajePendiente.id.in_(por_id)).all()
+            
+            filas = []
+            terminados = []
+            reintentar = []
+            usuarios_notificados = set()
+            for mensaje_id, usuario_id, empleo_ids, intentos in mensajes:
+                resultado = por_id[mensaje_id]
+                if not resultado.exitosa and resultado.reintentable and (intentos or 0) + 1 < max_corridas:
+                    reintentar.append(mensaje_id)
+                    continue
+                
+                terminados.append(mensaje_id)
+                if resultado.exitosa:
+                    usuarios_notificados.add(usuario_id)
+                for empleo_id in json.loads(empleo_ids or '[]'):
+                    filas.append({
+                        'usuario_telegram_id': usuario_id,
+                        'empleo_id': empleo_id,
+                        'fecha_envio': ahora,
+                        'exitosa': resultado.exitosa,
+                        'mensaje_error': resultado.error,
+                    })
+            
+            if filas:
+                session.execute(insert(NotificacionEnviada), filas)
+            if usuarios_notificados:
+                session.execute(
+                    update(UsuarioTelegram)
+                    .where(UsuarioTelegram.id.in_(usuarios_notificados))
+                    .values(ultima_notificacion=ahora)
+                    .execution_options(synchronize_session=False)
+                )
+            if reintentar:
+                session.execute(
+                    update(MensajePendiente)
+                    .where(MensajePendiente.id.in_(reintentar))
+                    .values(intentos=func.coalesce(MensajePendiente.intentos, 0) + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            session.execute(
+                delete(MensajePendiente)
+                .where(MensajePendiente.id.in_(terminados))
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error registrando resultados de envío: {e}")
+            raise
+        finally:
+            session.close()
+    
     def obtener_empleos_para_notificar(self, usuario: UsuarioTelegram, desde: datetime = None) -> List[Empleo]:
         """Obtener empleos que coinciden con las preferencias del usuario"""
         session = self.get_session()
@@ -0,0 +1,127 @@
+# Caché en proceso de las tablas de dimensiones de SIMO
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database.models import Entidad, Departamento, Municipio, Convocatoria
+
+# Clave en session.info para las entradas aún no confirmadas de cada caché
+_PENDIENTES = "dimension_cache_pendientes"
+
+
+def clave_entidad(nit: Optional[str], nombre: str) -> Tuple[str, str]:
+    """Clave natural de una entidad: el NIT si existe, si no el nombre"""
+    return ('nit', nit) if nit else ('nombre', nombre)
+
+
+def clave_convocatoria(nombre: str, codigo: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Clave natural de una convocatoria; sin código coincide con cualquiera del mismo nombre"""
+    return (nombre, codigo or None)
+
+
+class DimensionCache:
+    """Caché id por clave natural de Entidad, Departamento, Municipio y Convocatoria
+
+    Se precarga completa al iniciar (son pocas filas). Las filas creadas o leídas
+    dentro de una sesión quedan pendientes en ``session.info`` y solo pasan a la
+    caché compartida cuando la sesión hace commit; un rollback las descarta, así
+    nunca queda en caché un id que no existe en la base de datos.
+    """
+
+    TABLAS = ('entidades', 'departamentos', 'municipios', 'convocatorias')
+
+    def __init__(self):
+        self._datos = {tabla: {} for tabla in self.TABLAS}
+        self._lock = threading.Lock()
+
+    def cargar(self, session: Session) -> None:
+        """Precargar la caché con todas las filas de las tablas de dimensiones"""
+        datos = {tabla: {} for tabla in self.TABLAS}
+
+        for entidad_id, nit, nombre in session.query(Entidad.id, Entidad.nit, Entidad.nombre).order_by(Entidad.id):
+            if nit:
+                datos['entidades'][clave_entidad(nit, nombre)] = entidad_id
+            datos['entidades'].setdefault(clave_entidad(None, nombre), entidad_id)
+
+        for departamento_id, nombre in session.query(Departamento.id, Departamento.nombre):
+            datos['departamentos'][nombre] = departamento_id
+
+        for municipio_id, nombre, departamento_id in session.query(
+                Municipio.id, Municipio.nombre, Municipio.departamento_id).order_by(Municipio.id):
+            datos['municipios'].setdefault((nombre, departamento_id), municipio_id)
+
+        for convocatoria_id, nombre, codigo in session.query(
+                Convocatoria.id, Convocatoria.nombre, Convocatoria.codigo).order_by(Convocatoria.id):
+            datos['convocatorias'].setdefault(clave_convocatoria(nombre, codigo), convocatoria_id)
+            datos['convocatorias'].setdefault(clave_convocatoria(nombre, None), convocatoria_id)
+
+        with self._lock:
+            self._datos = datos
+
+    def limpiar(self) -> None:
+        """Vaciar la caché compartida"""
+        with self._lock:
+            self._datos = {tabla: {} for tabla in self.TABLAS}
+
+    def tamano(self) -> Dict[str, int]:
+        """Cantidad de claves por tabla"""
+        return {tabla: len(claves) for tabla, claves in self._datos.items()}
+
+    def obtener(self, session: Session, tabla: str, clave: Hashable) -> Optional[int]:
+        """Id para una clave natural, consultando también lo pendiente de la sesión"""
+        valor = self._datos[tabla].get(clave)
+        if valor is None:
+            pendientes = session.info.get(_PENDIENTES, {}).get(self)
+            if pendientes:
+                valor = pendientes[tabla].get(clave)
+        return valor
+
+    def _registrar(self, session: Session, tabla: str, clave: Hashable, valor: int, reemplazar: bool = True) -> None:
+        pendientes = session.info.setdefault(_PENDIENTES, {}).setdefault(
+            self, {t: {} for t in self.TABLAS}
+        )
+        if reemplazar:
+            pendientes[tabla][clave] = valor
+        else:
+            pendientes[tabla].setdefault(clave, valor)
+
+    def registrar_entidad(self, session: Session, entidad: Entidad) -> None:
+        if entidad.nit:
+            self._registrar(session, 'entidades', clave_entidad(entidad.nit, entidad.nombre), entidad.id)
+        self._registrar(session, 'entidades', clave_entidad(None, entidad.nombre), entidad.id, reemplazar=False)
+
+    def registrar_departamento(self, session: Session, departamento: Departamento) -> None:
+        self._registrar(session, 'departamentos', departamento.nombre, departamento.id)
+
+    def registrar_municipio(self, session: Session, municipio: Municipio) -> None:
+        self._registrar(session, 'municipios', (municipio.nombre, municipio.departamento_id), municipio.id,
+                        reemplazar=False)
+
+    def registrar_convocatoria(self, session: Session, convocatoria: Convocatoria) -> None:
+        self._registrar(session, 'convocatorias', clave_convocatoria(convocatoria.nombre, convocatoria.codigo),
+                        convocatoria.id, reemplazar=False)
+        self._registrar(session, 'convocatorias', clave_convocatoria(convocatoria.nombre, None),
+                        convocatoria.id, reemplazar=False)
+
+    def _fusionar(self, pendientes: Dict[str, Dict]) -> None:
+        with self._lock:
+            for tabla, claves in pendientes.items():
+                for clave, valor in claves.items():
+                    self._datos[tabla].setdefault(clave, valor)
+
+
+@event.listens_for(Session, "after_commit")
+def _confirmar_pendientes(session: Session) -> None:
+    """Pasar a la caché compartida lo registrado durante la transacción"""
+    pendientes = session.info.pop(_PENDIENTES, None)
+    if pendientes:
+        for cache, datos in pendientes.items():
+            cache._fusionar(datos)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_pendientes(session: Session, previous_transaction) -> None:
+    """Descartar lo registrado si la transacción (o un savepoint) se revierte"""
+    session.info.pop(_PENDIENTES, None)
@@ -0,0 +1,248 @@
+# Exportación columnar de empleos a Parquet (Arrow), completa o incremental
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Engine
+
+from config import settings
+from database.models import Empleo, Entidad
+
+logger = logging.getLogger("simo_export")
+
+# Columnas de baja cardinalidad: categóricas en Arrow y codificadas por diccionario en Parquet
+COLUMNAS_DICCIONARIO = ('departamento', 'municipio', 'nivel', 'entidad', 'tipo_proceso')
+
+_COLUMNAS_PRIVADAS = {'hash_contenido', 'generacion_crawl', 'busqueda'}
+_TIPOS_ARROW = {
+    'Integer': pa.int64(),
+    'Float': pa.float64(),
+    'Boolean': pa.bool_(),
+    'DateTime': pa.timestamp('us'),
+}
+
+
+def _columnas_exportadas():
+    columnas = [c for c in Empleo.__table__.columns if c.name not in _COLUMNAS_PRIVADAS]
+    return columnas + [Entidad.nombre.label('entidad'), Entidad.nit.label('entidad_nit')]
+
+
+def esquema_arrow() -> pa.Schema:
+    """Esquema Arrow de la exportación, derivado del modelo Empleo"""
+    campos = []
+    for columna in _columnas_exportadas():
+        if columna.name in COLUMNAS_DICCIONARIO:
+            tipo = pa.dictionary(pa.int32(), pa.string())
+        else:
+            tipo = _TIPOS_ARROW.get(type(columna.type).__name__, pa.string())
+        campos.append(pa.field(columna.name, tipo))
+    return pa.schema(campos)
+
+
+class _SalidaEnMemoria(io.RawIOBase):
+    """Destino del ParquetWriter que se vacía después de cada lote escrito"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._posicion = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        self._buffer += datos
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def extraer(self) -> bytes:
+        datos = bytes(self._buffer)
+        self._buffer.clear()
+        return datos
+
+
+class ExportacionParquet:
+    """Archivo Parquet de empleos generado por partes
+
+    Recorre ``empleos`` con un cursor del lado del servidor en bloques de
+    ``tamano_chunk`` filas, convierte cada bloque en un RecordBatch y entrega
+    los bytes escritos: la memoria queda acotada a un bloque sea cual sea el
+    tamaño de la tabla, y el archivo puede enviarse mientras se genera.
+
+    Con ``desde`` solo incluye los empleos con ``fecha_actualizacion >= desde``
+    (creados, modificados o desactivados). ``despues_de`` es la marca
+    (fecha_actualizacion, id) de un snapshot anterior: como en la paginación
+    por cursor, el id desempata las filas de un mismo lote, que comparten
+    fecha, así que nada se repite ni se pierde entre snapshots. Al terminar
+    de iterar, ``filas`` y ``ultima_marca`` describen lo exportado.
+    """
+
+    def __init__(self, engine: Engine, desde: Optional[datetime] = None,
+                 despues_de: Optional[Tuple[datetime, int]] = None, solo_activos: bool = False,
+                 tamano_chunk: int = None):
+        self.engine = engine
+        self.desde = desde
+        self.despues_de = despues_de
+        self.solo_activos = solo_activos
+        self.tamano_chunk = tamano_chunk or settings.export_tamano_chunk
+        self.esquema = esquema_arrow()
+        self.filas = 0
+        self.ultima_marca: Optional[Tuple[datetime, int]] = None
+
+    def _consulta(self):
+        consulta = (
+            select(*_columnas_exportadas())
+            .outerjoin(Entidad, Empleo.entidad_id == Entidad.id)
+            .order_by(Empleo.id)
+        )
+        if self.desde is not None:
+            consulta = consulta.where(Empleo.fecha_actualizacion >= self.desde)
+        if self.despues_de is not None:
+            consulta = consulta.where(
+                tuple_(Empleo.fecha_actualizacion, Empleo.id) > tuple_(*self.despues_de)
+            )
+        if self.solo_activos:
+            consulta = consulta.where(Empleo.activo == True)
+        return consulta
+
+    def _lote(self, filas) -> pa.RecordBatch:
+        columnas = list(zip(*filas))
+        arreglos = []
+        for campo, valores in zip(self.esquema, columnas):
+            if pa.types.is_dictionary(campo.type):
+                arreglos.append(pa.array(valores, type=pa.string()).dictionary_encode())
+            else:
+                arreglos.append(pa.array(valores, type=campo.type))
+        return pa.RecordBatch.from_arrays(arreglos, schema=self.esquema)
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.filas = 0
+        self.ultima_marca = None
+        indice_fecha = self.esquema.get_field_index('fecha_actualizacion')
+        indice_id = self.esquema.get_field_index('id')
+
+        salida = _SalidaEnMemoria()
+        writer = pq.ParquetWriter(
+            salida, self.esquema, compression='zstd', use_dictionary=list(COLUMNAS_DICCIONARIO)
+        )
+        with self.engine.connect() as conn:
+            resultado = conn.execution_options(stream_results=True, yield_per=self.tamano_chunk).execute(
+                self._consulta()
+            )
+            for filas in resultado.partitions():
+                writer.write_batch(self._lote(filas))
+                self.filas += len(filas)
+
+                marcas = [(fila[indice_fecha], fila[indice_id]) for fila in filas if fila[indice_fecha] is not None]
+                if marcas:
+                    maxima = max(marcas)
+                    if self.ultima_marca is None or maxima > self.ultima_marca:
+                        self.ultima_marca = maxima
+
+                datos = salida.extraer()
+                if datos:
+                    yield datos
+
+        # Pie del archivo (metadatos); sin filas queda un Parquet vacío válido
+        writer.close()
+        yield salida.extraer()
+
+    def escribir(self, ruta: str, omitir_vacio: bool = False) -> int:
+        """Escribir el archivo en ``ruta`` de forma atómica; retorna las filas exportadas
+
+        Con ``omitir_vacio`` no se crea el archivo si no hubo filas.
+        """
+        temporal = f"{ruta}.tmp"
+        try:
+            with open(temporal, "wb") as f:
+                for datos in self:
+                    f.write(datos)
+            if omitir_vacio and not self.filas:
+                os.remove(temporal)
+            else:
+                os.replace(temporal, ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        return self.filas
+
+
+class ExportadorSnapshots:
+    """Snapshots Parquet incrementales de ``empleos`` en un directorio
+
+    La primera exportación (o ``completo=True``) incluye toda la tabla; las
+    siguientes, solo lo que cambió después de la última marca
+    (fecha_actualizacion, id) exportada, guardada en ``estado.json``. Cada
+    snapshot es un archivo ``empleos_<fecha con microsegundos>[_completo].parquet``;
+    un incremental sin cambios no genera archivo.
+
+    Un lote que el scraping aún no confirmó cuando se toma el snapshot puede
+    quedar con una fecha anterior a la marca; conviene programar los
+    snapshots después del scraping.
+    """
+
+    def __init__(self, directorio: str = None):
+        self.directorio = directorio or settings.export_directorio
+        self.ruta_estado = os.path.join(self.directorio, "estado.json")
+
+    def _leer_marca(self) -> Optional[Tuple[datetime, int]]:
+        try:
+            with open(self.ruta_estado, encoding="utf-8") as f:
+                estado = json.load(f)
+            return datetime.fromisoformat(estado['fecha_actualizacion']), int(estado['id'])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Estado de exportación inválido en {self.ruta_estado}, se exporta completo: {e}")
+            return None
+
+    def _guardar_marca(self, marca: Tuple[datetime, int], archivo: str) -> None:
+        temporal = f"{self.ruta_estado}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({'fecha_actualizacion': marca[0].isoformat(), 'id': marca[1], 'ultimo_archivo': archivo}, f)
+        os.replace(temporal, self.ruta_estado)
+
+    def _ruta_snapshot(self, completo: bool) -> str:
+        """Ruta de un snapshot nuevo; un número de secuencia evita pisar uno existente"""
+        base = f"empleos_{datetime.now():%Y%m%dT%H%M%S%f}{'_completo' if completo else ''}"
+        ruta = os.path.join(self.directorio, f"{base}.parquet")
+        secuencia = 1
+        while os.path.exists(ruta):
+            ruta = os.path.join(self.directorio, f"{base}_{secuencia}.parquet")
+            secuencia += 1
+        return ruta
+
+    def exportar(self, engine: Engine, completo: bool = False) -> Dict:
+        """Escribir un nuevo snapshot; retorna archivo (None si no hubo cambios), filas y rango de fechas"""
+        os.makedirs(self.directorio, exist_ok=True)
+        marca = None if completo else self._leer_marca()
+
+        ruta = self._ruta_snapshot(completo=marca is None)
+        nombre = os.path.basename(ruta)
+        exportacion = ExportacionParquet(engine, despues_de=marca)
+        filas = exportacion.escribir(ruta, omitir_vacio=marca is not None)
+
+        if exportacion.ultima_marca is not None:
+            self._guardar_marca(exportacion.ultima_marca, nombre)
+
+        desde = marca[0] if marca else None
+        if not filas and marca is not None:
+            logger.info(f"Sin cambios desde {desde}, no se genera snapshot")
+            ruta = None
+        else:
+            logger.info(f"Snapshot {nombre}: {filas} empleos (desde {desde or 'el inicio'})")
+        return {
+            'archivo': ruta,
+            'filas': filas,
+            'desde': desde,
+            'hasta': exportacion.ultima_marca[0] if exportacion.ultima_marca else desde,
+        }
@@ -1,10 +1,16 @@
 # Modelos de base de datos para SIMO
 from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, Session
-from sqlalchemy import create_engine
+from sqlalchemy.orm import relationship, Session, sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from datetime import datetime
 from typing import Optional
+import json
+from weakref import WeakKeyDictionary
+
+from config import settings
+from metrics import instrumentar_engine
 
 Base = declarative_base()
 
@@ -135,6 +141,8 @@ class Empleo(Base):
     
     # Estado del registro
     activo = Column(Boolean, default=True, index=True)
+    hash_contenido = Column(String(32))  # Hash del empleo normalizado, para detectar cambios
+    generacion_crawl = Column(String(32), index=True)  # Último crawl completo en que se vio
     
     # Relaciones
     entidad = relationship("Entidad", back_populates="empleos")
@@ -149,8 +157,34 @@ class Empleo(Base):
         Index('idx_empleo_salario_nivel', 'asignacion_salarial', 'nivel'),
         Index('idx_empleo_fecha_activo', 'fecha_scraping', 'activo'),
         Index('idx_empleo_busqueda', 'denominacion', 'nivel', 'departamento', 'activo'),
+        Index('idx_empleo_activo_fecha_id', 'activo', 'fecha_scraping', 'id'),  # Paginación por cursor
+        Index('idx_empleo_fecha_actualizacion_id', 'fecha_actualizacion', 'id'),  # Exportación incremental
     )
 
+class EmpleoArchivado(Base):
+    """Tabla fría con empleos inactivos movidos fuera de la tabla principal"""
+    __tablename__ = "empleos_archivados"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    empleo_original_id = Column(Integer)  # id que tenía en la tabla empleos
+    simo_id = Column(Integer, index=True)
+    denominacion = Column(String(200))
+    nivel = Column(String(50))
+    departamento = Column(String(100))
+    entidad_id = Column(Integer)
+    fecha_scraping = Column(DateTime)
+    fecha_actualizacion = Column(DateTime)
+    datos = Column(Text)  # JSON con todas las columnas del empleo
+    fecha_archivado = Column(DateTime, default=datetime.utcnow, index=True)
+
+class EstadisticaResumen(Base):
+    """Resumen materializado de estadísticas de empleos activos (una sola fila)"""
+    __tablename__ = "estadisticas_resumen"
+    
+    id = Column(Integer, primary_key=True)
+    datos = Column(Text, nullable=False)  # JSON con conteos por nivel/departamento y agregados salariales
+    fecha_actualizacion = Column(DateTime, default=datetime.utcnow)
+
 class ScrapingLog(Base):
     """Log de ejecuciones de scraping"""
     __tablename__ = "scraping_logs"
@@ -161,15 +195,33 @@ class ScrapingLog(Base):
     empleos_encontrados = Column(Integer, default=0)
     empleos_nuevos = Column(Integer, default=0)
     empleos_actualizados = Column(Integer, default=0)
+    empleos_sin_cambios = Column(Integer, default=0)
     paginas_procesadas = Column(Integer, default=0)
+    modo = Column(String(20), default="completo")  # completo, incremental, parcial (max_pages)
     exitoso = Column(Boolean, default=False)
     mensaje_error = Column(Text)
     tiempo_ejecucion = Column(Float)  # En segundos
     
+    # Etapas del pipeline scraping -> base de datos (segundos)
+    tiempo_descarga = Column(Float)  # Descarga y procesamiento de páginas
+    tiempo_escritura = Column(Float)  # Upserts en la base de datos
+    tiempo_espera_cola = Column(Float)  # Descarga detenida por cola llena (contrapresión)
+    max_profundidad_cola = Column(Integer)  # Páginas en cola en el peor momento
+    
+    # Desglose por etapa (segundos acumulados; con concurrencia pueden superar el total)
+    tiempo_http = Column(Float)  # Latencia de las peticiones a SIMO
+    tiempo_decodificacion = Column(Float)  # JSON -> objetos
+    tiempo_normalizacion = Column(Float)  # process_job_data
+    tiempo_dimensiones = Column(Float)  # Resolución de entidades, departamentos...
+    tiempo_commit = Column(Float)
+    tiempo_consultas_db = Column(Float)  # Todas las sentencias SQL
+    reintentos = Column(Integer)
+    
     # Índices
     __table_args__ = (
         Index('idx_scraping_fecha', 'fecha_inicio'),
         Index('idx_scraping_exitoso', 'exitoso'),
+        Index('idx_scraping_modo_fecha', 'modo', 'exitoso', 'fecha_inicio'),
     )
 
 class UsuarioTelegram(Base):
@@ -209,7 +261,7 @@ class NotificacionEnviada(Base):
     id = Column(Integer, primary_key=True, index=True)
     usuario_telegram_id = Column(Integer, ForeignKey("usuarios_telegram.id"))
     empleo_id = Column(Integer, ForeignKey("empleos.id"))
-    fecha_envio = Column(DateTime, default=datetime.utcnow)
+    fecha_envio = Column(DateTime, default=datetime.now)  # Hora local, como fecha_scraping y ultima_notificacion
     exitosa = Column(Boolean, default=True)
     mensaje_error = Column(Text)
     
@@ -223,6 +275,26 @@ class NotificacionEnviada(Base):
         Index('idx_notificacion_empleo', 'empleo_id'),
     )
 
+class MensajePendiente(Base):
+    """Mensajes de Telegram en cola, persistidos hasta que se entregan o fallan"""
+    __tablename__ = "mensajes_pendientes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    usuario_telegram_id = Column(Integer, ForeignKey("usuarios_telegram.id"))
+    chat_id = Column(String(50), nullable=False)
+    texto = Column(Text, nullable=False)
+    empleo_ids = Column(Text)  # JSON con los ids de empleos incluidos en el mensaje
+    fecha_creacion = Column(DateTime, default=datetime.now)  # Hora local, como fecha_envio
+    intentos = Column(Integer, default=0)  # Corridas de la cola en que falló la entrega
+    
+    # Relaciones
+    usuario = relationship("UsuarioTelegram")
+    
+    # Índices
+    __table_args__ = (
+        Index('idx_mensaje_pendiente_fecha', 'fecha_creacion'),
+    )
+
 # Configuración de base de datos
 def get_database_url(db_type: str = "sqlite") -> str:
     """Obtener URL de conexión según el tipo de base de datos"""
@@ -239,30 +311,69 @@ def get_database_url(db_type: str = "sqlite") -> str:
     else:
         raise ValueError(f"Tipo de base de datos no soportado: {db_type}")
 
+def aplicar_pragmas_sqlite(dbapi_connection, connection_record=None) -> None:
+    """PRAGMAs de cada conexión SQLite nueva
+    
+    WAL permite que las lecturas de la API corran mientras el scraper escribe;
+    con WAL, synchronous=NORMAL es seguro ante caídas del proceso y evita un
+    fsync por commit. busy_timeout hace que un segundo escritor espere en vez
+    de fallar con "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")  # Negativo = KiB
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
 def create_database_engine(db_type: str = "sqlite"):
-    """Crear engine de base de datos"""
+    """Crear engine de base de datos con el pool configurado en Settings"""
     database_url = get_database_url(db_type)
+    opciones_pool = {
+        'pool_size': settings.database_pool_size,
+        'max_overflow': settings.database_max_overflow,
+        'pool_timeout': settings.database_pool_timeout,
+        'pool_pre_ping': settings.database_pool_pre_ping,
+        'pool_recycle': settings.database_pool_recycle,
+    }
     
     if db_type == "sqlite":
         engine = create_engine(
             database_url, 
             connect_args={"check_same_thread": False},
-            echo=False  # Cambiar a True para debug SQL
+            echo=False,  # Cambiar a True para debug SQL
+            **opciones_pool
         )
+        event.listen(engine, "connect", aplicar_pragmas_sqlite)
     else:
-        engine = create_engine(database_url, echo=False)
+        engine = create_engine(database_url, echo=False, **opciones_pool)
     
+    if settings.metricas_consultas_db:
+        instrumentar_engine(engine)
     return engine
 
 def create_tables(engine):
     """Crear todas las tablas"""
     Base.metadata.create_all(bind=engine)
 
+# Una fábrica de sesiones por engine, creada la primera vez que se pide
+_fabricas_sesion: "WeakKeyDictionary[Engine, sessionmaker]" = WeakKeyDictionary()
+
+def get_session_factory(engine) -> sessionmaker:
+    """Fábrica de sesiones (cacheada) del engine"""
+    fabrica = _fabricas_sesion.get(engine)
+    if fabrica is None:
+        fabrica = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _fabricas_sesion[engine] = fabrica
+    return fabrica
+
 def get_session(engine) -> Session:
     """Obtener sesión de base de datos"""
-    from sqlalchemy.orm import sessionmaker
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return SessionLocal()
+    return get_session_factory(engine)()
 
 # Funciones de utilidad para consultas comunes
 def buscar_empleos_por_criterios(
@@ -273,10 +384,19 @@ def buscar_empleos_por_criterios(
     salario_minimo: Optional[float] = None,
     activo: bool = True,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    texto: Optional[str] = None
 ):
-    """Buscar empleos con criterios específicos"""
+    """Buscar empleos con criterios específicos (``texto`` usa el índice de texto completo)"""
     query = session.query(Empleo).filter(Empleo.activo == activo)
+    orden = []
+    
+    if texto:
+        from database.search import subconsulta_texto
+        fts = subconsulta_texto(session.get_bind().dialect.name, texto)
+        if fts is not None:
+            query = query.join(fts, fts.c.empleo_id == Empleo.id)
+            orden.append(fts.c.relevancia.desc())
     
     if denominacion:
         query = query.filter(Empleo.denominacion.ilike(f"%{denominacion}%"))
@@ -290,50 +410,25 @@ def buscar_empleos_por_criterios(
     if salario_minimo:
         query = query.filter(Empleo.asignacion_salarial >= salario_minimo)
     
-    return query.order_by(Empleo.fecha_scraping.desc()).offset(offset).limit(limit).all()
+    return query.order_by(*orden, Empleo.fecha_scraping.desc()).offset(offset).limit(limit).all()
 
-def obtener_estadisticas_empleos(session: Session):
-    """Obtener estadísticas generales de empleos"""
-    from sqlalchemy import func
+def aplicar_preferencias_usuario(usuario: UsuarioTelegram, preferencias: dict) -> None:
+    """Copiar al usuario las preferencias de notificación presentes en el dict"""
+    for campo in ('niveles_interes', 'departamentos_interes', 'palabras_clave'):
+        if campo in preferencias:
+            setattr(usuario, campo, json.dumps(preferencias[campo]))
     
-    stats = {}
+    if 'salario_minimo' in preferencias:
+        usuario.salario_minimo = preferencias['salario_minimo']
     
-    # Total empleos activos
-    stats['total_empleos'] = session.query(Empleo).filter(Empleo.activo == True).count()
-    
-    # Por nivel
-    stats['por_nivel'] = dict(
-        session.query(Empleo.nivel, func.count(Empleo.id))
-        .filter(Empleo.activo == True)
-        .group_by(Empleo.nivel)
-        .all()
-    )
+    if 'frecuencia_notificaciones' in preferencias:
+        usuario.frecuencia_notificaciones = preferencias['frecuencia_notificaciones']
     
-    # Por departamento (top 10)
-    stats['top_departamentos'] = dict(
-        session.query(Empleo.departamento, func.count(Empleo.id))
-        .filter(Empleo.activo == True)
-        .group_by(Empleo.departamento)
-        .order_by(func.count(Empleo.id).desc())
-        .limit(10)
-        .all()
-    )
+    usuario.fecha_actualizacion = datetime.now()
+
+def obtener_estadisticas_empleos(session: Session):
+    """Obtener estadísticas generales de empleos desde el resumen materializado"""
+    from database.stats import calcular_resumen, formatear_estadisticas, leer_resumen
     
-    # Rango salarial
-    salarios = session.query(
-        func.min(Empleo.asignacion_salarial),
-        func.max(Empleo.asignacion_salarial),
-        func.avg(Empleo.asignacion_salarial)
-    ).filter(
-        Empleo.activo == True,
-        Empleo.asignacion_salarial.isnot(None)
-    ).first()
-    
-    if salarios[0]:
-        stats['salarios'] = {
-            'minimo': salarios[0],
-            'maximo': salarios[1],
-            'promedio': salarios[2]
-        }
-    
-    return stats
+    resumen = leer_resumen(session) or calcular_resumen(session)
+    return formatear_estadisticas(resumen)
@@ -0,0 +1,227 @@
+# Búsqueda de empleos: texto completo (SQLite FTS5 / PostgreSQL tsvector), filtros y cursores
+import base64
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import Float, Integer, or_, text
+from sqlalchemy.engine import Connection, Engine
+
+from config import settings
+from database.models import Empleo, Entidad
+
+logger = logging.getLogger("simo_search")
+
+# Columnas indexadas (migración 0005, que fija también los pesos de PostgreSQL)
+# y su peso en el ranking de SQLite (de mayor a menor relevancia)
+COLUMNAS_FTS = ('denominacion', 'descripcion', 'funciones', 'estudio_requerido')
+_PESOS_SQLITE = (10.0, 2.0, 1.0, 1.0)
+
+_TERMINO = re.compile(r"\w+", re.UNICODE)
+
+
+def _sqlite_disponible(conn) -> bool:
+    return bool(conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'empleos_fts'"
+    )).first())
+
+
+def _postgres_disponible(conn) -> bool:
+    return bool(conn.execute(text(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'empleos' AND column_name = 'busqueda'"
+    )).first())
+
+
+def busqueda_texto_disponible(engine: Union[Engine, Connection]) -> bool:
+    """Verificar si el índice de texto completo está instalado
+
+    Lo crea la migración 0005 (``alembic upgrade head``) junto con los
+    triggers que lo sincronizan; al iniciar solo se consulta. Sin índice la
+    búsqueda por texto usa ILIKE. Acepta un engine o una conexión ya abierta
+    (p. ej. la de ``AsyncConnection.run_sync``).
+    """
+    def consultar(conn) -> bool:
+        if conn.dialect.name == "sqlite":
+            return _sqlite_disponible(conn)
+        if conn.dialect.name == "postgresql":
+            return _postgres_disponible(conn)
+        return False
+
+    if isinstance(engine, Engine):
+        with engine.connect() as conn:
+            disponible = consultar(conn)
+    else:
+        disponible = consultar(engine)
+    if not disponible:
+        logger.warning("Índice de texto completo no instalado (alembic upgrade head), la búsqueda usa ILIKE")
+    return disponible
+
+
+def incluir_en_autogenerate(objeto, nombre: Optional[str], tipo: str, reflejado: bool, comparar_con) -> bool:
+    """Filtro ``include_object`` de Alembic: el índice de texto completo no está en los modelos"""
+    if tipo == "table" and nombre and nombre.startswith("empleos_fts"):
+        return False
+    if tipo == "column" and nombre == "busqueda" and objeto.table.name == "empleos":
+        return False
+    if tipo == "index" and nombre == "idx_empleo_busqueda_fts":
+        return False
+    return True
+
+
+def terminos_busqueda(consulta: str) -> List[str]:
+    """Separar la consulta del usuario en términos seguros para MATCH/tsquery"""
+    return _TERMINO.findall(consulta or "")
+
+
+def subconsulta_texto(dialecto: str, consulta: str):
+    """Subconsulta (empleo_id, relevancia) con los empleos que coinciden con la consulta (CTE en SQLite)
+
+    Todos los términos deben aparecer (AND), cada uno como prefijo. Mayor
+    relevancia es mejor en ambos motores. Retorna None si no hay términos.
+    """
+    terminos = terminos_busqueda(consulta)
+    if not terminos:
+        return None
+
+    if dialecto == "sqlite":
+        expresion = " ".join(f'"{termino}"*' for termino in terminos)
+        pesos = ", ".join(str(p) for p in _PESOS_SQLITE)
+        sentencia = text(
+            f"SELECT rowid AS empleo_id, -bm25(empleos_fts, {pesos}) AS relevancia "
+            "FROM empleos_fts WHERE empleos_fts MATCH :consulta_fts"
+        ).bindparams(consulta_fts=expresion)
+    elif dialecto == "postgresql":
+        expresion = " & ".join(f"{termino}:*" for termino in terminos)
+        sentencia = text(
+            "SELECT e.id AS empleo_id, ts_rank_cd(e.busqueda, q.consulta) AS relevancia "
+            "FROM empleos e, to_tsquery('spanish', empleos_unaccent(:consulta_fts)) AS q(consulta) "
+            "WHERE e.busqueda @@ q.consulta"
+        ).bindparams(consulta_fts=expresion)
+    else:
+        raise NotImplementedError(f"Búsqueda de texto completo no soportada para {dialecto}")
+
+    sentencia = sentencia.columns(empleo_id=Integer, relevancia=Float)
+    if dialecto == "sqlite":
+        # Como subconsulta, SQLite puede recorrer empleos por el índice de activo y
+        # repetir el MATCH por cada fila (segundos con decenas de miles de
+        # empleos); materializada, el MATCH corre una vez y se busca por id
+        fts = sentencia.cte("fts")
+        return fts.prefix_with("MATERIALIZED") if sqlite3.sqlite_version_info >= (3, 35) else fts
+    return sentencia.subquery("fts")
+
+
+def filtrar_texto(consulta, texto: str, dialecto: str, busqueda_texto: bool = True):
+    """Filtrar una Query o Select de empleos por texto. Retorna (consulta, columnas de orden por relevancia)"""
+    if busqueda_texto:
+        fts = subconsulta_texto(dialecto, texto)
+        if fts is None:
+            return consulta, []
+        return consulta.join(fts, fts.c.empleo_id == Empleo.id), [fts.c.relevancia.desc()]
+
+    # Sin índice de texto completo: búsqueda por subcadena en las mismas columnas
+    condiciones = [getattr(Empleo, columna).ilike(f"%{texto}%") for columna in COLUMNAS_FTS]
+    return consulta.filter(or_(*condiciones)), []
+
+
+def aplicar_filtros_empleos(consulta, filtros: Optional[Dict], dialecto: str, busqueda_texto: bool = True):
+    """Aplicar los filtros de buscar_empleos a una Query (sesión síncrona) o a un Select (AsyncSession)
+
+    Ambos exponen ``filter`` y ``join``, así los dos servicios comparten la
+    misma semántica de filtros. Retorna (consulta, columnas de orden por relevancia).
+    """
+    orden = []
+    if not filtros:
+        return consulta, orden
+
+    if filtros.get('texto'):
+        consulta, orden = filtrar_texto(consulta, filtros['texto'], dialecto, busqueda_texto)
+
+    if filtros.get('denominacion'):
+        consulta = consulta.filter(Empleo.denominacion.ilike(f"%{filtros['denominacion']}%"))
+
+    if filtros.get('nivel'):
+        consulta = consulta.filter(Empleo.nivel.ilike(f"%{filtros['nivel']}%"))
+
+    if filtros.get('departamento'):
+        consulta = consulta.filter(Empleo.departamento.ilike(f"%{filtros['departamento']}%"))
+
+    if filtros.get('municipio'):
+        consulta = consulta.filter(Empleo.municipio.ilike(f"%{filtros['municipio']}%"))
+
+    if filtros.get('salario_minimo'):
+        consulta = consulta.filter(Empleo.asignacion_salarial >= filtros['salario_minimo'])
+
+    if filtros.get('salario_maximo'):
+        consulta = consulta.filter(Empleo.asignacion_salarial <= filtros['salario_maximo'])
+
+    if filtros.get('entidad'):
+        consulta = consulta.join(Entidad).filter(Entidad.nombre.ilike(f"%{filtros['entidad']}%"))
+
+    return consulta, orden
+
+
+def codificar_cursor(empleo) -> str:
+    """Cursor opaco con la posición (fecha_scraping, id) del último empleo de la página"""
+    posicion = [empleo.fecha_scraping.isoformat(), empleo.id]
+    return base64.urlsafe_b64encode(json.dumps(posicion).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, empleo_id = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return datetime.fromisoformat(fecha), int(empleo_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+
+class CacheTotales:
+    """Totales de búsqueda por combinación de filtros, con expiración y desalojo LRU
+
+    Acotada a ``max_entradas``: las claves las eligen los usuarios de la API,
+    así que sin límite crecería con cada consulta distinta.
+    """
+
+    def __init__(self, max_entradas: int = None, ttl_segundos: float = None):
+        self.max_entradas = max_entradas or settings.busqueda_total_cache_max_entradas
+        self.ttl_segundos = settings.busqueda_total_cache_segundos if ttl_segundos is None else ttl_segundos
+        self._entradas: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    @staticmethod
+    def clave(filtros: Optional[Dict]) -> str:
+        return json.dumps(filtros or {}, sort_keys=True, default=str)
+
+    def obtener(self, filtros: Optional[Dict]) -> Optional[int]:
+        clave = self.clave(filtros)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            if time.monotonic() - entrada[0] >= self.ttl_segundos:
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return entrada[1]
+
+    def guardar(self, filtros: Optional[Dict], total: int) -> None:
+        clave = self.clave(filtros)
+        with self._lock:
+            self._entradas[clave] = (time.monotonic(), total)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
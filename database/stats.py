@@ -0,0 +1,161 @@
+# Resumen materializado de estadísticas de empleos
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.models import Empleo, EstadisticaResumen
+
+# Fila única de estadisticas_resumen
+RESUMEN_ID = 1
+
+
+class DeltaEstadisticas:
+    """Cambios acumulados sobre los empleos activos durante una inserción masiva"""
+
+    def __init__(self):
+        self.total = 0
+        self.por_nivel = Counter()
+        self.por_departamento = Counter()
+        self.salario_cantidad = 0
+        self.salario_suma = 0.0
+        self.salario_minimo = None
+        self.salario_maximo = None
+        self.salarios_quitados = set()  # Para detectar si min/max dejan de ser válidos
+
+    def __bool__(self) -> bool:
+        return bool(self.total or self.por_nivel or self.por_departamento
+                    or self.salario_cantidad or self.salarios_quitados)
+
+    def agregar(self, nivel: str, departamento: Optional[str], salario: Optional[float]) -> None:
+        """Contar un empleo activo nuevo (o reactivado)"""
+        self.total += 1
+        self.por_nivel[nivel] += 1
+        if departamento is not None:
+            self.por_departamento[departamento] += 1
+        if salario is not None:
+            salario = float(salario)
+            self.salario_cantidad += 1
+            self.salario_suma += salario
+            self.salario_minimo = salario if self.salario_minimo is None else min(self.salario_minimo, salario)
+            self.salario_maximo = salario if self.salario_maximo is None else max(self.salario_maximo, salario)
+
+    def quitar(self, nivel: str, departamento: Optional[str], salario: Optional[float]) -> None:
+        """Descontar el estado anterior de un empleo activo que cambió"""
+        self.total -= 1
+        self.por_nivel[nivel] -= 1
+        if departamento is not None:
+            self.por_departamento[departamento] -= 1
+        if salario is not None:
+            salario = float(salario)
+            self.salario_cantidad -= 1
+            self.salario_suma -= salario
+            self.salarios_quitados.add(salario)
+
+
+def _salarios(session: Session) -> Dict:
+    cantidad, suma, minimo, maximo = session.query(
+        func.count(Empleo.asignacion_salarial),
+        func.sum(Empleo.asignacion_salarial),
+        func.min(Empleo.asignacion_salarial),
+        func.max(Empleo.asignacion_salarial)
+    ).filter(
+        Empleo.activo == True,
+        Empleo.asignacion_salarial.isnot(None)
+    ).one()
+    return {
+        'cantidad': cantidad or 0,
+        'suma': float(suma or 0),
+        'minimo': float(minimo) if minimo is not None else None,
+        'maximo': float(maximo) if maximo is not None else None,
+    }
+
+
+def calcular_resumen(session: Session) -> Dict:
+    """Calcular el resumen completo recorriendo la tabla de empleos"""
+    por_nivel = dict(
+        session.query(Empleo.nivel, func.count(Empleo.id))
+        .filter(Empleo.activo == True)
+        .group_by(Empleo.nivel)
+        .all()
+    )
+    por_departamento = dict(
+        session.query(Empleo.departamento, func.count(Empleo.id))
+        .filter(Empleo.activo == True, Empleo.departamento.isnot(None))
+        .group_by(Empleo.departamento)
+        .all()
+    )
+    return {
+        'total_empleos': sum(por_nivel.values()),
+        'por_nivel': por_nivel,
+        'por_departamento': por_departamento,
+        'salarios': _salarios(session),
+    }
+
+
+def aplicar_delta(session: Session, resumen: Dict, delta: DeltaEstadisticas) -> Dict:
+    """Aplicar un delta al resumen; min/max se recalculan solo si dejaron de ser válidos"""
+    resumen['total_empleos'] += delta.total
+
+    for clave, dimension in (('por_nivel', delta.por_nivel), ('por_departamento', delta.por_departamento)):
+        conteos = resumen[clave]
+        for valor, cambio in dimension.items():
+            conteos[valor] = conteos.get(valor, 0) + cambio
+            if conteos[valor] <= 0:
+                del conteos[valor]
+
+    salarios = resumen['salarios']
+    if {salarios['minimo'], salarios['maximo']} & delta.salarios_quitados:
+        resumen['salarios'] = _salarios(session)
+    else:
+        salarios['cantidad'] += delta.salario_cantidad
+        salarios['suma'] += delta.salario_suma
+        if delta.salario_minimo is not None:
+            salarios['minimo'] = delta.salario_minimo if salarios['minimo'] is None else min(salarios['minimo'], delta.salario_minimo)
+            salarios['maximo'] = delta.salario_maximo if salarios['maximo'] is None else max(salarios['maximo'], delta.salario_maximo)
+
+    return resumen
+
+
+def leer_resumen(session: Session, bloquear: bool = False) -> Optional[Dict]:
+    """Leer el resumen materializado (None si aún no existe)
+
+    ``bloquear`` toma la fila con FOR UPDATE (PostgreSQL) para aplicar un
+    delta sin pisar el de otra transacción; SQLite ya serializa las escrituras.
+    """
+    fila = session.get(EstadisticaResumen, RESUMEN_ID, with_for_update=bloquear or None)
+    return json.loads(fila.datos) if fila else None
+
+
+def guardar_resumen(session: Session, resumen: Dict) -> None:
+    """Guardar el resumen materializado (sin hacer commit)"""
+    fila = session.get(EstadisticaResumen, RESUMEN_ID)
+    if not fila:
+        fila = EstadisticaResumen(id=RESUMEN_ID)
+        session.add(fila)
+    fila.datos = json.dumps(resumen, ensure_ascii=False)
+    fila.fecha_actualizacion = datetime.now()
+
+
+def formatear_estadisticas(resumen: Dict, top_departamentos: int = 10) -> Dict:
+    """Estadísticas públicas (formato de obtener_estadisticas) a partir del resumen"""
+    stats = {
+        'total_empleos': resumen['total_empleos'],
+        'por_nivel': dict(resumen['por_nivel']),
+        'top_departamentos': dict(
+            sorted(resumen['por_departamento'].items(), key=lambda item: item[1], reverse=True)[:top_departamentos]
+        ),
+    }
+
+    salarios = resumen['salarios']
+    if salarios['minimo'] and salarios['cantidad']:
+        stats['salarios'] = {
+            'minimo': salarios['minimo'],
+            'maximo': salarios['maximo'],
+            'promedio': salarios['suma'] / salarios['cantidad']
+        }
+
+    return stats
@@ -1,6 +1,162 @@
 # FastAPI entrypoint for SIMO scraping backend
-from fastapi import FastAPI
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional
 
-app = FastAPI(title="SIMO Scraping Backend")
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-# ...endpoints will be added here...
+import metrics
+from api.cache import ResponseCache, etag_coincide, normalizar_parametros
+from config import settings
+from database.async_db_service import AsyncSimoDatabaseService
+from database.db_service import SimoDatabaseService
+from database.export import ExportacionParquet
+from database.models import Empleo
+
+# Lecturas de la API: servicio asíncrono, no bloquea el event loop
+servicio_async = AsyncSimoDatabaseService()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await servicio_async.iniciar()
+    yield
+    await servicio_async.cerrar()
+
+
+app = FastAPI(title="SIMO Scraping Backend", lifespan=lifespan)
+
+cache_respuestas = ResponseCache(
+    max_entradas=settings.api_cache_max_entradas,
+    ttl_segundos=settings.api_cache_ttl_segundos
+)
+
+metrics.REGISTRO.registrar(metrics.GaugeFunction(
+    "simo_api_cache_aciertos_total", "Respuestas servidas desde la caché de la API",
+    lambda: cache_respuestas.aciertos, tipo="counter"))
+metrics.REGISTRO.registrar(metrics.GaugeFunction(
+    "simo_api_cache_fallos_total", "Respuestas construidas consultando la base de datos",
+    lambda: cache_respuestas.fallos, tipo="counter"))
+
+# Columnas internas que no se exponen en la API
+_COLUMNAS_PRIVADAS = {'hash_contenido', 'generacion_crawl', 'busqueda'}
+_COLUMNAS_EMPLEO = [c.name for c in Empleo.__table__.columns if c.name not in _COLUMNAS_PRIVADAS]
+
+
+@lru_cache(maxsize=1)
+def obtener_servicio() -> SimoDatabaseService:
+    """Servicio síncrono del proceso de la API (exportación)"""
+    return SimoDatabaseService()
+
+
+def serializar_empleo(empleo: Empleo) -> Dict[str, Any]:
+    datos = {}
+    for columna in _COLUMNAS_EMPLEO:
+        valor = getattr(empleo, columna)
+        datos[columna] = valor.isoformat() if isinstance(valor, datetime) else valor
+    return datos
+
+
+async def _respuesta_cacheada(ruta: str, parametros: Dict[str, Any], if_none_match: Optional[str],
+                              construir: Callable[[], Awaitable[Any]]) -> Response:
+    """Servir desde la caché (o 304 si el cliente ya tiene la versión) o construir y cachear
+
+    Los scrapings escriben desde otro proceso: antes de responder se compara la
+    versión de los datos (una consulta por índice) y si cambió se vacía la caché.
+    """
+    if await servicio_async.comprobar_cambios():
+        cache_respuestas.invalidar()
+
+    clave = f"{ruta}?{normalizar_parametros(parametros, exactos=('cursor',))}"
+    entrada = cache_respuestas.obtener(clave)
+
+    if entrada is None:
+        generacion = cache_respuestas.generacion
+        contenido = await construir()
+        cuerpo = json.dumps(contenido, ensure_ascii=False, default=str).encode("utf-8")
+        entrada = cache_respuestas.guardar(clave, cuerpo, generacion)
+
+    headers = {'ETag': entrada.etag, 'Cache-Control': 'no-cache'}
+    if etag_coincide(if_none_match, entrada.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entrada.cuerpo, media_type="application/json", headers=headers)
+
+
+@app.get("/jobs")
+async def listar_empleos(
+    texto: Optional[str] = None,
+    denominacion: Optional[str] = None,
+    nivel: Optional[str] = None,
+    departamento: Optional[str] = None,
+    municipio: Optional[str] = None,
+    entidad: Optional[str] = None,
+    salario_minimo: Optional[float] = None,
+    salario_maximo: Optional[float] = None,
+    pagina: int = Query(1, ge=1),
+    por_pagina: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    modo_cursor: bool = False,
+    incluir_total: bool = True,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Empleos activos con filtros y paginación (ver SimoDatabaseService.buscar_empleos)"""
+    filtros = {
+        'texto': texto,
+        'denominacion': denominacion,
+        'nivel': nivel,
+        'departamento': departamento,
+        'municipio': municipio,
+        'entidad': entidad,
+        'salario_minimo': salario_minimo,
+        'salario_maximo': salario_maximo,
+    }
+    parametros = dict(filtros, pagina=pagina, por_pagina=por_pagina, cursor=cursor,
+                      modo_cursor=modo_cursor, incluir_total=incluir_total)
+
+    async def construir():
+        resultado = await servicio_async.buscar_empleos(
+            filtros={k: v for k, v in filtros.items() if v is not None},
+            pagina=pagina,
+            por_pagina=por_pagina,
+            cursor=cursor,
+            modo_cursor=modo_cursor,
+            incluir_total=incluir_total
+        )
+        resultado['empleos'] = [serializar_empleo(e) for e in resultado['empleos']]
+        return resultado
+
+    try:
+        return await _respuesta_cacheada("/jobs", parametros, if_none_match, construir)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/stats")
+async def estadisticas(if_none_match: Optional[str] = Header(None)):
+    """Estadísticas del resumen materializado"""
+    return await _respuesta_cacheada("/stats", {}, if_none_match, servicio_async.obtener_estadisticas)
+
+
+@app.get("/export")
+def exportar_empleos(desde: Optional[datetime] = None, solo_activos: bool = False):
+    """Empleos en Parquet, enviados a medida que se generan (``desde`` filtra por fecha_actualizacion)
+
+    Memoria acotada a un bloque de export_tamano_chunk filas; el iterador es
+    síncrono y Starlette lo consume en su pool de hilos.
+    """
+    exportacion = ExportacionParquet(obtener_servicio().engine, desde=desde, solo_activos=solo_activos)
+    nombre = f"empleos_{datetime.now():%Y%m%dT%H%M%S}.parquet"
+    return StreamingResponse(
+        iter(exportacion),
+        media_type="application/vnd.apache.parquet",
+        headers={'Content-Disposition': f'attachment; filename="{nombre}"'}
+    )
+
+
+@app.get("/metrics")
+async def metricas():
+    """Métricas de scraping, base de datos y caché en formato de texto de Prometheus"""
+    return Response(content=metrics.REGISTRO.exponer(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,258 @@
+"""
+Métricas de rendimiento del scraping y la base de datos (formato de texto de Prometheus).
+
+Contadores e histogramas en memoria del proceso, sin dependencias externas;
+``/metrics`` en main.py los expone con ``exponer()``.
+"""
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+# Límites de los histogramas de latencia (segundos)
+BUCKETS_LATENCIA = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_PRIMERA_PALABRA = re.compile(r"\s*(\w+)")
+_OPERACIONES_SQL = {'select', 'insert', 'update', 'delete', 'with'}
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _formatear_etiquetas(nombres: Tuple[str, ...], valores: Tuple[str, ...], extra: str = "") -> str:
+    pares = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatear_numero(valor: float) -> str:
+    if valor == float('inf'):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas: Dict[str, str]) -> Tuple[str, ...]:
+        if set(etiquetas) != set(self.etiquetas):
+            raise ValueError(f"{self.nombre} espera las etiquetas {self.etiquetas}, recibió {tuple(etiquetas)}")
+        return tuple(str(etiquetas[nombre]) for nombre in self.etiquetas)
+
+    def _lineas(self) -> List[str]:
+        raise NotImplementedError
+
+    def exponer(self) -> str:
+        encabezado = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        return "\n".join(encabezado + self._lineas())
+
+
+class Counter(_Metrica):
+    """Contador monótono, opcionalmente con etiquetas"""
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, valor: float = 1, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def valor(self, **etiquetas) -> float:
+        """Valor de una serie; sin etiquetas, la suma de todas"""
+        with self._lock:
+            if not etiquetas:
+                return sum(self._valores.values())
+            return self._valores.get(self._clave(etiquetas), 0)
+
+    def _lineas(self) -> List[str]:
+        with self._lock:
+            valores = sorted(self._valores.items())
+        if not valores and not self.etiquetas:
+            valores = [((), 0)]
+        return [
+            f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_numero(valor)}"
+            for clave, valor in valores
+        ]
+
+
+class Histogram(_Metrica):
+    """Histograma acumulado (buckets, suma y cantidad) por combinación de etiquetas"""
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = BUCKETS_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # clave -> [conteos por bucket (no acumulados), suma, cantidad]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, valor: float, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        indice = next(i for i, limite in enumerate(self.buckets) if valor <= limite)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * len(self.buckets), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    @contextmanager
+    def time(self, **etiquetas) -> Iterator[None]:
+        """Observar la duración del bloque (también si lanza una excepción)"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **etiquetas)
+
+    def suma(self, **etiquetas) -> float:
+        """Segundos acumulados de una serie; sin etiquetas, de todas"""
+        with self._lock:
+            if not etiquetas:
+                return sum(serie[1] for serie in self._series.values())
+            serie = self._series.get(self._clave(etiquetas))
+            return serie[1] if serie else 0.0
+
+    def cantidad(self, **etiquetas) -> int:
+        with self._lock:
+            if not etiquetas:
+                return sum(serie[2] for serie in self._series.values())
+            serie = self._series.get(self._clave(etiquetas))
+            return serie[2] if serie else 0
+
+    def _lineas(self) -> List[str]:
+        with self._lock:
+            series = sorted((clave, [list(s[0]), s[1], s[2]]) for clave, s in self._series.items())
+        lineas = []
+        for clave, (conteos, suma, cantidad) in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, conteos):
+                acumulado += conteo
+                etiquetas = _formatear_etiquetas(self.etiquetas, clave, f'le="{_formatear_numero(limite)}"')
+                lineas.append(f"{self.nombre}_bucket{etiquetas} {acumulado}")
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave)
+            lineas.append(f"{self.nombre}_sum{etiquetas} {_formatear_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{etiquetas} {cantidad}")
+        return lineas
+
+
+class GaugeFunction(_Metrica):
+    """Valor leído al exponer (p. ej. aciertos de una caché que ya lleva su cuenta)"""
+
+    def __init__(self, nombre: str, ayuda: str, funcion: Callable[[], float], tipo: str = "gauge"):
+        super().__init__(nombre, ayuda)
+        self.funcion = funcion
+        self.tipo = tipo
+
+    def _lineas(self) -> List[str]:
+        return [f"{self.nombre} {_formatear_numero(self.funcion())}"]
+
+
+class Registro:
+    """Conjunto de métricas expuestas juntas"""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        with self._lock:
+            self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    def exponer(self) -> str:
+        with self._lock:
+            metricas = list(self._metricas.values())
+        return "\n".join(metrica.exponer() for metrica in metricas) + "\n"
+
+
+REGISTRO = Registro()
+
+# Scraping
+PAGINAS = REGISTRO.registrar(Counter(
+    "simo_paginas_descargadas_total", "Páginas de SIMO descargadas y procesadas"))
+EMPLEOS = REGISTRO.registrar(Counter(
+    "simo_empleos_procesados_total", "Empleos normalizados desde SIMO"))
+REINTENTOS = REGISTRO.registrar(Counter(
+    "simo_reintentos_total", "Reintentos de peticiones a SIMO"))
+ERRORES = REGISTRO.registrar(Counter(
+    "simo_errores_total", "Errores por etapa (descarga, procesamiento, escritura)", ("etapa",)))
+DESCARGA_PAGINA = REGISTRO.registrar(Histogram(
+    "simo_descarga_pagina_segundos", "Latencia HTTP de cada petición de página (incluye leer el cuerpo)"))
+
+# Base de datos
+UPSERT_LOTE = REGISTRO.registrar(Histogram(
+    "simo_upsert_lote_segundos", "Duración de cada lote de bulk_insert_empleos (sin el commit)"))
+CONSULTA_DB = REGISTRO.registrar(Histogram(
+    "simo_db_consulta_segundos", "Duración de las sentencias SQL por operación", ("operacion",)))
+
+# Etapas internas del scraping -> base de datos
+ETAPA = REGISTRO.registrar(Histogram(
+    "simo_etapa_segundos",
+    "Duración por etapa: decodificacion_json, normalizacion (por página), dimensiones, commit (por lote), filtrado",
+    ("etapa",)))
+
+
+def operacion_sql(sentencia: str) -> str:
+    """Operación de una sentencia para la etiqueta de CONSULTA_DB (cardinalidad acotada)"""
+    coincidencia = _PRIMERA_PALABRA.match(sentencia)
+    operacion = coincidencia.group(1).lower() if coincidencia else ""
+    return operacion if operacion in _OPERACIONES_SQL else "otra"
+
+
+def instrumentar_engine(engine) -> None:
+    """Medir cada sentencia del engine (síncrono, o ``AsyncEngine.sync_engine``) con eventos de SQLAlchemy"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metricas_inicio', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def despues(conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get('_metricas_inicio')
+        if inicios:
+            CONSULTA_DB.observe(time.perf_counter() - inicios.pop(), operacion=operacion_sql(statement))
+
+    @event.listens_for(engine, "handle_error")
+    def error(contexto):
+        inicios = contexto.connection.info.get('_metricas_inicio') if contexto.connection is not None else None
+        if inicios:
+            inicios.pop()
+
+
+def resumen_etapas() -> Dict[str, float]:
+    """Totales acumulados por etapa; la diferencia entre dos resúmenes da el desglose de una ejecución
+
+    Las latencias HTTP se suman por petición: con descargas concurrentes el
+    total puede superar el tiempo real transcurrido.
+    """
+    return {
+        'tiempo_http': DESCARGA_PAGINA.suma(),
+        'tiempo_decodificacion': ETAPA.suma(etapa="decodificacion_json"),
+        'tiempo_normalizacion': ETAPA.suma(etapa="normalizacion"),
+        'tiempo_dimensiones': ETAPA.suma(etapa="dimensiones"),
+        'tiempo_upsert': UPSERT_LOTE.suma(),
+        'tiempo_commit': ETAPA.suma(etapa="commit"),
+        'tiempo_consultas_db': CONSULTA_DB.suma(),
+        'reintentos': REINTENTOS.valor(),
+        'errores': ERRORES.valor(),
+    }
+
+
+def diferencia_etapas(antes: Dict[str, float], despues: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    despues = despues or resumen_etapas()
+    return {clave: despues[clave] - antes.get(clave, 0) for clave in despues}
@@ -0,0 +1,169 @@
+# Despacho de notificaciones: deduplicación, agrupación y registro por lotes
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from database.models import NotificacionEnviada, UsuarioTelegram
+
+# Frecuencias que agrupan los empleos en un resumen periódico
+PERIODOS = {
+    'diario': timedelta(days=1),
+    'semanal': timedelta(days=7),
+}
+
+
+def clave_envio(usuario_id: int, empleo_id: int) -> int:
+    """Par (usuario, empleo) empaquetado en un solo entero"""
+    return (usuario_id << 32) | empleo_id
+
+
+class IndiceEnviados:
+    """Conjunto en memoria de los pares (usuario, empleo) ya notificados con éxito
+
+    Cada par se guarda como un entero (ver ``clave_envio``), así el índice
+    ocupa una fracción de lo que ocuparían tuplas o filas del ORM.
+    """
+
+    def __init__(self):
+        self._claves = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def cargar(self, session: Session) -> None:
+        """Cargar los envíos exitosos registrados en notificaciones_enviadas"""
+        filas = session.query(
+            NotificacionEnviada.usuario_telegram_id, NotificacionEnviada.empleo_id
+        ).filter(
+            NotificacionEnviada.exitosa == True,
+            NotificacionEnviada.usuario_telegram_id.isnot(None),
+            NotificacionEnviada.empleo_id.isnot(None)
+        ).yield_per(10000)
+        claves = {clave_envio(usuario_id, empleo_id) for usuario_id, empleo_id in filas}
+
+        with self._lock:
+            self._claves = claves
+
+    def contiene(self, usuario_id: int, empleo_id: int) -> bool:
+        return clave_envio(usuario_id, empleo_id) in self._claves
+
+    def agregar(self, pares: Iterable[Tuple[int, int]]) -> None:
+        with self._lock:
+            self._claves.update(clave_envio(usuario_id, empleo_id) for usuario_id, empleo_id in pares)
+
+
+class Envio(NamedTuple):
+    """Un mensaje para un usuario con uno o varios empleos"""
+    usuario: UsuarioTelegram
+    empleos: List[Any]
+
+
+class ResultadoEnvio(NamedTuple):
+    """Resultado de entregar un mensaje de la cola
+
+    Un fallo ``reintentable`` deja el mensaje en cola para la próxima corrida;
+    si no, el mensaje se descarta.
+    """
+    mensaje_id: int
+    exitosa: bool
+    error: Optional[str] = None
+    reintentable: bool = True
+
+
+class NotificationDispatcher:
+    """Convierte coincidencias en mensajes y registra los envíos por lotes
+
+    - Descarta los pares (usuario, empleo) que ya están en el índice de enviados.
+    - Frecuencia ``inmediato``: un mensaje por empleo.
+    - Frecuencias ``diario``/``semanal``: un solo resumen con todos los empleos,
+      solo cuando se cumplió el periodo desde ``ultima_notificacion``; si no, los
+      empleos se dejan para el próximo resumen.
+    """
+
+    def __init__(self, indice: IndiceEnviados, tamano_lote: int = 500, max_empleos_por_mensaje: int = 20):
+        self.indice = indice
+        self.tamano_lote = tamano_lote
+        self.max_empleos_por_mensaje = max_empleos_por_mensaje
+
+    def planificar(self, coincidencias: Dict[int, List[Any]], usuarios: Dict[int, UsuarioTelegram],
+                   ahora: datetime = None) -> Tuple[List[Envio], int]:
+        """Armar los mensajes a enviar; retorna (envíos, duplicados descartados)"""
+        ahora = ahora or datetime.now()
+        envios = []
+        duplicados = 0
+
+        for usuario_id, empleos in coincidencias.items():
+            usuario = usuarios[usuario_id]
+
+            nuevos = []
+            vistos = set()
+            for empleo in empleos:
+                if empleo.id in vistos or self.indice.contiene(usuario_id, empleo.id):
+                    duplicados += 1
+                    continue
+                vistos.add(empleo.id)
+                nuevos.append(empleo)
+            if not nuevos:
+                continue
+
+            periodo = PERIODOS.get(usuario.frecuencia_notificaciones)
+            if periodo is None:
+                envios.extend(Envio(usuario, [empleo]) for empleo in nuevos)
+                continue
+
+            if usuario.ultima_notificacion and ahora - usuario.ultima_notificacion < periodo:
+                continue  # Aún no toca el resumen
+
+            for inicio in range(0, len(nuevos), self.max_empleos_por_mensaje):
+                envios.append(Envio(usuario, nuevos[inicio:inicio + self.max_empleos_por_mensaje]))
+
+        return envios, duplicados
+
+    def registrar(self, session: Session, resultados: Iterable[Tuple[Envio, bool, Optional[str]]],
+                  ahora: datetime = None) -> List[Tuple[int, int]]:
+        """Insertar por lotes una fila de notificaciones_enviadas por empleo enviado
+
+        ``resultados`` son tuplas (envío, exitosa, mensaje_error). Actualiza
+        ``ultima_notificacion`` de los usuarios con algún envío exitoso. No hace
+        commit: retorna los pares exitosos para agregarlos al índice una vez
+        confirmada la transacción.
+        """
+        ahora = ahora or datetime.now()
+        filas = []
+        exitosos = []
+        usuarios_notificados = set()
+
+        for envio, exitosa, error in resultados:
+            for empleo in envio.empleos:
+                filas.append({
+                    'usuario_telegram_id': envio.usuario.id,
+                    'empleo_id': empleo.id,
+                    'fecha_envio': ahora,
+                    'exitosa': exitosa,
+                    'mensaje_error': error,
+                })
+                if exitosa:
+                    exitosos.append((envio.usuario.id, empleo.id))
+            if exitosa:
+                usuarios_notificados.add(envio.usuario.id)
+
+            if len(filas) >= self.tamano_lote:
+                session.execute(insert(NotificacionEnviada), filas)
+                filas = []
+
+        if filas:
+            session.execute(insert(NotificacionEnviada), filas)
+
+        if usuarios_notificados:
+            session.execute(
+                update(UsuarioTelegram)
+                .where(UsuarioTelegram.id.in_(usuarios_notificados))
+                .values(ultima_notificacion=ahora)
+                .execution_options(synchronize_session=False)
+            )
+
+        return exitosos
@@ -0,0 +1,196 @@
+# Motor de coincidencias entre empleos y preferencias de suscriptores
+import json
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Set
+
+from database.models import UsuarioTelegram
+
+
+def _campo(empleo: Any, nombre: str):
+    """Leer un campo de un empleo, sea un Empleo del ORM o un dict del scraper"""
+    if isinstance(empleo, dict):
+        return empleo.get(nombre)
+    return getattr(empleo, nombre, None)
+
+
+def _lista_json(valor: str) -> List:
+    """Decodificar una preferencia guardada como JSON (vacía si no hay)"""
+    if not valor:
+        return []
+    return json.loads(valor) or []
+
+
+def _bits(mascara: int) -> Iterable[int]:
+    """Posiciones de los bits encendidos de una máscara"""
+    while mascara:
+        bajo = mascara & -mascara
+        yield bajo.bit_length() - 1
+        mascara ^= bajo
+
+
+class KeywordAutomaton:
+    """Autómata Aho-Corasick: encuentra todas las palabras clave de un texto en una pasada
+
+    Cada palabra clave lleva una máscara de bits con los suscriptores que la
+    usan; buscar en un texto retorna el OR de las máscaras encontradas.
+    """
+
+    def __init__(self):
+        self._transiciones: List[Dict[str, int]] = [{}]
+        self._fallos: List[int] = [0]
+        self._salidas: List[int] = [0]
+        self._compilado = False
+
+    def agregar(self, palabra: str, mascara: int) -> None:
+        nodo = 0
+        for caracter in palabra:
+            siguiente = self._transiciones[nodo].get(caracter)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones[nodo][caracter] = siguiente
+                self._transiciones.append({})
+                self._fallos.append(0)
+                self._salidas.append(0)
+            nodo = siguiente
+        self._salidas[nodo] |= mascara
+        self._compilado = False
+
+    def compilar(self) -> None:
+        """Calcular los enlaces de fallo (BFS) y propagar las salidas"""
+        cola = list(self._transiciones[0].values())
+        for nodo in cola:
+            self._fallos[nodo] = 0
+        for nodo in cola:
+            for caracter, hijo in self._transiciones[nodo].items():
+                cola.append(hijo)
+                fallo = self._fallos[nodo]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallos[fallo]
+                destino = self._transiciones[fallo].get(caracter, 0)
+                self._fallos[hijo] = destino if destino != hijo else 0
+                self._salidas[hijo] |= self._salidas[self._fallos[hijo]]
+        self._compilado = True
+
+    def buscar(self, texto: str) -> int:
+        """OR de las máscaras de todas las palabras clave presentes en el texto"""
+        if not self._compilado:
+            self.compilar()
+
+        transiciones, fallos, salidas = self._transiciones, self._fallos, self._salidas
+        nodo = 0
+        encontradas = 0
+        for caracter in texto:
+            while nodo and caracter not in transiciones[nodo]:
+                nodo = fallos[nodo]
+            nodo = transiciones[nodo].get(caracter, 0)
+            encontradas |= salidas[nodo]
+        return encontradas
+
+
+class SubscriberMatcher:
+    """Índices invertidos de las preferencias de todos los suscriptores activos
+
+    Replica la semántica de ``obtener_empleos_para_notificar`` (niveles y
+    departamentos exactos, salario mínimo, palabras clave sin distinguir
+    mayúsculas en denominación o descripción; las preferencias vacías no
+    filtran), pero evalúa todos los suscriptores en una sola pasada por empleo:
+    cada suscriptor es un bit y cada criterio produce una máscara.
+    """
+
+    def __init__(self, usuarios: Iterable[UsuarioTelegram]):
+        self.usuarios: List[UsuarioTelegram] = [u for u in usuarios if u.activo is not False]
+
+        self._por_nivel: Dict[str, int] = defaultdict(int)
+        self._nivel_libre = 0
+        self._por_departamento: Dict[str, int] = defaultdict(int)
+        self._departamento_libre = 0
+        self._palabras = KeywordAutomaton()
+        self._palabras_libre = 0
+        self._salario_libre = 0
+        minimos = []
+
+        for bit, usuario in enumerate(self.usuarios):
+            mascara = 1 << bit
+
+            niveles = _lista_json(usuario.niveles_interes)
+            if niveles:
+                for nivel in niveles:
+                    self._por_nivel[nivel] |= mascara
+            else:
+                self._nivel_libre |= mascara
+
+            departamentos = _lista_json(usuario.departamentos_interes)
+            if departamentos:
+                for departamento in departamentos:
+                    self._por_departamento[departamento] |= mascara
+            else:
+                self._departamento_libre |= mascara
+
+            palabras = [str(p).lower() for p in _lista_json(usuario.palabras_clave)]
+            if palabras and all(palabras):
+                for palabra in palabras:
+                    self._palabras.agregar(palabra, mascara)
+            else:
+                # Sin palabras clave (o con una vacía, que en SQL coincide con todo)
+                self._palabras_libre |= mascara
+
+            if usuario.salario_minimo:
+                minimos.append((usuario.salario_minimo, mascara))
+            else:
+                self._salario_libre |= mascara
+
+        self._palabras.compilar()
+
+        # Salarios mínimos ordenados con máscaras acumuladas: los suscriptores
+        # cuyo mínimo es <= salario son un prefijo del arreglo
+        minimos.sort(key=lambda item: item[0])
+        self._salarios_minimos = [minimo for minimo, _ in minimos]
+        self._prefijos_salario = [0]
+        for _, mascara in minimos:
+            self._prefijos_salario.append(self._prefijos_salario[-1] | mascara)
+
+    def __len__(self) -> int:
+        return len(self.usuarios)
+
+    def mascara(self, empleo: Any) -> int:
+        """Máscara de bits de los suscriptores a los que les interesa el empleo"""
+        coincidencias = self._por_nivel.get(_campo(empleo, 'nivel'), 0) | self._nivel_libre
+        if not coincidencias:
+            return 0
+
+        coincidencias &= self._por_departamento.get(_campo(empleo, 'departamento'), 0) | self._departamento_libre
+        if not coincidencias:
+            return 0
+
+        salario = _campo(empleo, 'asignacion_salarial')
+        por_salario = self._salario_libre
+        if salario is not None:
+            por_salario |= self._prefijos_salario[bisect_right(self._salarios_minimos, salario)]
+        coincidencias &= por_salario
+        if not coincidencias:
+            return 0
+
+        if coincidencias & ~self._palabras_libre:
+            texto = f"{_campo(empleo, 'denominacion') or ''}\n{_campo(empleo, 'descripcion') or ''}".lower()
+            coincidencias &= self._palabras.buscar(texto) | self._palabras_libre
+        else:
+            coincidencias &= self._palabras_libre
+
+        return coincidencias
+
+    def usuarios_para(self, empleo: Any) -> List[UsuarioTelegram]:
+        """Suscriptores a los que les interesa un empleo"""
+        return [self.usuarios[bit] for bit in _bits(self.mascara(empleo))]
+
+    def emparejar(self, empleos: Iterable[Any]) -> Dict[int, List[Any]]:
+        """Agrupar empleos por id de suscriptor interesado"""
+        por_usuario: Dict[int, List[Any]] = defaultdict(list)
+        for empleo in empleos:
+            for bit in _bits(self.mascara(empleo)):
+                por_usuario[self.usuarios[bit].id].append(empleo)
+        return dict(por_usuario)
+
+    def ids_usuarios(self, empleo: Any) -> Set[int]:
+        """Ids de los suscriptores a los que les interesa un empleo"""
+        return {self.usuarios[bit].id for bit in _bits(self.mascara(empleo))}
@@ -0,0 +1,246 @@
+# Cola asíncrona de entrega de mensajes por la Bot API de Telegram
+import asyncio
+import html
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import aiohttp
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+from config import settings
+from notifications.dispatcher import ResultadoEnvio
+from rate_limit import TokenBucket
+
+logger = logging.getLogger("simo_telegram")
+
+
+class ErrorTransitorio(Exception):
+    """Fallo que vale la pena reintentar (429, 5xx, red)"""
+
+    def __init__(self, mensaje: str, retry_after: Optional[float] = None):
+        super().__init__(mensaje)
+        self.retry_after = retry_after
+
+
+class ErrorPermanente(Exception):
+    """Fallo definitivo (chat inexistente, bot bloqueado, mensaje inválido)
+
+    ``chat_inaccesible`` indica que ningún mensaje va a llegar a ese chat
+    (bot bloqueado, usuario desactivado, chat inexistente).
+    """
+
+    def __init__(self, mensaje: str, chat_inaccesible: bool = False):
+        super().__init__(mensaje)
+        self.chat_inaccesible = chat_inaccesible
+
+
+def formatear_mensaje(empleos: List[Any]) -> str:
+    """Texto HTML de un mensaje con uno o varios empleos"""
+    lineas = ["<b>Nuevas ofertas en SIMO</b>" if len(empleos) > 1 else "<b>Nueva oferta en SIMO</b>"]
+    for empleo in empleos:
+        lineas.append("")
+        lineas.append(f"<b>{html.escape(empleo.denominacion or '')}</b> ({html.escape(empleo.nivel or '')})")
+        ubicacion = ", ".join(v for v in (empleo.municipio, empleo.departamento) if v)
+        if ubicacion:
+            lineas.append(html.escape(ubicacion))
+        if empleo.asignacion_salarial:
+            lineas.append(f"Salario: ${empleo.asignacion_salarial:,.0f}")
+        if empleo.codigo_empleo:
+            lineas.append(f"Código: {html.escape(empleo.codigo_empleo)}")
+    return "\n".join(lineas)
+
+
+def _espera_reintento(base: float, maximo: float, max_retry_after: float):
+    """Backoff exponencial con jitter que respeta el retry_after de un 429 (hasta ``max_retry_after``)"""
+    backoff = wait_exponential_jitter(multiplier=base, max=maximo)
+
+    def esperar(retry_state) -> float:
+        error = retry_state.outcome.exception()
+        if getattr(error, 'retry_after', None):
+            return min(error.retry_after, max_retry_after)
+        return backoff(retry_state)
+
+    return esperar
+
+
+class TelegramDeliveryQueue:
+    """Entrega los mensajes pendientes respetando los límites de la Bot API
+
+    - Límite global: token bucket con ``mensajes_por_segundo``.
+    - Límite por chat: al menos ``intervalo_por_chat`` segundos entre mensajes
+      al mismo chat; mientras un chat espera, los demás siguen saliendo.
+    - Reintentos con backoff para fallos transitorios; un 429 espera lo que
+      indique ``retry_after``, como mucho ``max_retry_after`` segundos. Si se
+      agotan, el mensaje queda en cola para la próxima corrida (hasta
+      ``settings.telegram_max_corridas``).
+    - Un error permanente descarta el mensaje; si el chat bloqueó el bot o no
+      existe, el usuario se desactiva.
+
+    Solo entrega con ``habilitado`` (por defecto ``settings.telegram_enabled``
+    y un token configurado). Los mensajes viven en la tabla mensajes_pendientes hasta tener un resultado
+    definitivo, así que un reinicio no los pierde. Los resultados se registran
+    en notificaciones_enviadas por lotes.
+    """
+
+    def __init__(self, db, token: str = None, base_url: str = None,
+                 mensajes_por_segundo: float = None, intervalo_por_chat: float = None,
+                 max_intentos: int = None, trabajadores: int = 8, tamano_lote_registro: int = 100,
+                 espera_base: float = 1.0, espera_maxima: float = 60.0, max_retry_after: float = None,
+                 habilitado: bool = None):
+        self.db = db
+        self.token = token or settings.telegram_bot_token
+        self.base_url = (base_url or settings.telegram_api_url).rstrip('/')
+        mensajes_por_segundo = mensajes_por_segundo if mensajes_por_segundo is not None else settings.telegram_mensajes_por_segundo
+        self.intervalo_por_chat = intervalo_por_chat if intervalo_por_chat is not None else settings.telegram_intervalo_por_chat
+        self.max_intentos = max_intentos or settings.telegram_max_intentos
+        self.trabajadores = trabajadores
+        self.tamano_lote_registro = tamano_lote_registro
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.max_retry_after = max_retry_after if max_retry_after is not None else settings.telegram_max_retry_after
+        self.habilitado = habilitado if habilitado is not None else settings.telegram_enabled and bool(self.token)
+
+        self.rate_limiter = TokenBucket(rate=mensajes_por_segundo)
+        self._ultimo_envio_por_chat: Dict[str, float] = {}
+        self._candados_por_chat: Dict[str, asyncio.Lock] = {}
+        self._chats_inaccesibles: Set[str] = set()
+
+    async def _esperar_turno(self, chat_id: str) -> None:
+        """Esperar el intervalo del chat y luego el token global"""
+        candado = self._candados_por_chat.setdefault(chat_id, asyncio.Lock())
+        async with candado:
+            espera = self._ultimo_envio_por_chat.get(chat_id, float('-inf')) + self.intervalo_por_chat - time.monotonic()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            await self.rate_limiter.acquire()
+            self._ultimo_envio_por_chat[chat_id] = time.monotonic()
+
+    async def enviar_mensaje(self, http: aiohttp.ClientSession, chat_id: str, texto: str) -> None:
+        """Llamar a sendMessage; lanza ErrorTransitorio o ErrorPermanente si falla"""
+        await self._esperar_turno(chat_id)
+
+        url = f"{self.base_url}/bot{self.token}/sendMessage"
+        payload = {
+            'chat_id': chat_id,
+            'text': texto,
+            'parse_mode': 'HTML',
+            'disable_web_page_preview': True,
+        }
+        try:
+            async with http.post(url, json=payload) as response:
+                try:
+                    data = await response.json(content_type=None)
+                except ValueError:
+                    data = {}
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ErrorTransitorio(f"Error de red: {e!r}")
+        if not isinstance(data, dict):
+            data = {}  # JSON válido que no es un objeto (p. ej. la respuesta de un proxy)
+
+        if status == 200 and data.get('ok'):
+            return
+
+        descripcion = data.get('description') or f"HTTP {status}"
+        if status == 429:
+            parametros = data.get('parameters')
+            try:
+                retry_after = float(parametros.get('retry_after')) if isinstance(parametros, dict) else None
+            except (TypeError, ValueError):
+                retry_after = None
+            raise ErrorTransitorio(descripcion, retry_after=retry_after)
+        if status >= 500:
+            raise ErrorTransitorio(descripcion)
+        # 403: bot bloqueado o usuario desactivado; 400 "chat not found": el chat no existe
+        chat_inaccesible = status == 403 or (status == 400 and "chat not found" in descripcion.lower())
+        raise ErrorPermanente(descripcion, chat_inaccesible=chat_inaccesible)
+
+    async def _entregar(self, http: aiohttp.ClientSession, mensaje) -> ResultadoEnvio:
+        """Entregar un mensaje con reintentos
+
+        Un error permanente descarta el mensaje; si el chat es inaccesible
+        además se desactiva al usuario, y el resto de sus mensajes no se envía.
+        """
+        if mensaje.chat_id in self._chats_inaccesibles:
+            return ResultadoEnvio(mensaje.id, False, "Chat inaccesible", reintentable=False)
+
+        reintentos = AsyncRetrying(
+            retry=retry_if_exception_type(ErrorTransitorio),
+            wait=_espera_reintento(self.espera_base, self.espera_maxima, self.max_retry_after),
+            stop=stop_after_attempt(self.max_intentos),
+            reraise=True,
+        )
+        try:
+            async for intento in reintentos:
+                with intento:
+                    await self.enviar_mensaje(http, mensaje.chat_id, mensaje.texto)
+            return ResultadoEnvio(mensaje.id, True)
+        except ErrorTransitorio as e:
+            logger.warning(f"No se pudo entregar el mensaje {mensaje.id} al chat {mensaje.chat_id}: {e}")
+            return ResultadoEnvio(mensaje.id, False, str(e))
+        except ErrorPermanente as e:
+            logger.warning(f"Mensaje {mensaje.id} descartado, el chat {mensaje.chat_id} lo rechazó: {e}")
+            if e.chat_inaccesible and mensaje.chat_id not in self._chats_inaccesibles:
+                self._chats_inaccesibles.add(mensaje.chat_id)
+                await asyncio.to_thread(self.db.desactivar_usuario_telegram, mensaje.chat_id)
+            return ResultadoEnvio(mensaje.id, False, str(e), reintentable=False)
+        except Exception as e:
+            # Un error inesperado en un mensaje no debe detener a los demás trabajadores
+            logger.exception(f"Error inesperado entregando el mensaje {mensaje.id} al chat {mensaje.chat_id}")
+            return ResultadoEnvio(mensaje.id, False, f"Error inesperado: {e!r}")
+
+    async def procesar_pendientes(self, limite: int = None) -> Dict[str, int]:
+        """Entregar los mensajes pendientes y registrar sus resultados"""
+        if not self.habilitado:
+            logger.info("Telegram deshabilitado (TELEGRAM_ENABLED o token), los mensajes quedan en cola")
+            return {'pendientes': 0, 'entregados': 0, 'fallidos': 0}
+
+        pendientes = await asyncio.to_thread(self.db.obtener_mensajes_pendientes, limite)
+        stats = {'pendientes': len(pendientes), 'entregados': 0, 'fallidos': 0}
+        if not pendientes:
+            return stats
+
+        cola: asyncio.Queue = asyncio.Queue()
+        for mensaje in pendientes:
+            cola.put_nowait(mensaje)
+
+        resultados: List[ResultadoEnvio] = []
+        registro = asyncio.Lock()
+
+        async def registrar(forzar: bool = False) -> None:
+            async with registro:
+                if resultados and (forzar or len(resultados) >= self.tamano_lote_registro):
+                    lote = resultados[:]
+                    del resultados[:]
+                    await asyncio.to_thread(self.db.registrar_resultados_envio, lote)
+
+        async def trabajador(http: aiohttp.ClientSession) -> None:
+            while True:
+                try:
+                    mensaje = cola.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                resultado = await self._entregar(http, mensaje)
+                resultados.append(resultado)
+                stats['entregados' if resultado.exitosa else 'fallidos'] += 1
+                await registrar()
+
+        timeout = aiohttp.ClientTimeout(total=settings.scraper_timeout_seconds)
+        async with aiohttp.ClientSession(timeout=timeout) as http:
+            try:
+                await asyncio.gather(*(trabajador(http) for _ in range(min(self.trabajadores, len(pendientes)))))
+            finally:
+                # Lo ya entregado se registra aunque la corrida se interrumpa
+                await registrar(forzar=True)
+
+        logger.info(f"Entrega de mensajes de Telegram: {stats}")
+        return stats
+
+    async def notificar_suscriptores(self) -> Dict[str, int]:
+        """Encolar los mensajes de los empleos que interesan a cada suscriptor y entregarlos"""
+        if not self.habilitado:
+            return {'encolados': 0, 'pendientes': 0, 'entregados': 0, 'fallidos': 0}
+
+        encolados = await asyncio.to_thread(self.db.encolar_notificaciones, formatear_mensaje)
+        return dict(await self.procesar_pendientes(), encolados=encolados)
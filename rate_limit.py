@@ -0,0 +1,36 @@
+"""
+Limitador de tasa compartido por el scraper de SIMO y la cola de Telegram.
+
+Módulo aparte para que la cola no importe el scraper (pandas, aiohttp, pool
+de procesos) solo por el token bucket.
+"""
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Limitador de tasa tipo token bucket para peticiones asíncronas"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate  # Tokens por segundo (<= 0 desactiva el límite)
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Esperar hasta que haya un token disponible y consumirlo"""
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
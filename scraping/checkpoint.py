@@ -0,0 +1,77 @@
+# Punto de control persistente para retomar crawls completos interrumpidos
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger("simo_checkpoint")
+
+
+class CrawlCheckpoint:
+    """Última página persistida de un crawl completo y su generación, en un archivo JSON
+
+    Se guarda después de cada escritura confirmada en la base de datos. Al
+    retomar se vuelve a pedir la última página guardada con la misma
+    generación: si SIMO retiró ofertas entretanto, las siguientes se corren
+    hacia páginas ya leídas, y sin ese solapamiento quedarían sin ver y la
+    desactivación de no vistos del final las daría de baja. El solapamiento
+    cubre hasta una página de retiros; por eso el checkpoint vence a las
+    pocas horas (``scraper_checkpoint_max_age_hours``). La escritura es
+    atómica (archivo temporal + rename) para no dejar un JSON a medias.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.scraper_checkpoint_path
+
+    def load(self, page_size: int, max_age_hours: float = None) -> Optional[Dict]:
+        """Checkpoint vigente para un crawl con ``page_size``, o None
+
+        Se descarta si el tamaño de página no coincide (las páginas no serían
+        las mismas) o si es más antiguo que ``max_age_hours`` (por defecto
+        ``settings.scraper_checkpoint_max_age_hours``).
+        """
+        if max_age_hours is None:
+            max_age_hours = settings.scraper_checkpoint_max_age_hours
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            updated_at = datetime.fromisoformat(data['updated_at'])
+            valid = (
+                data['page_size'] == page_size
+                and datetime.now() - updated_at < timedelta(hours=max_age_hours)
+            )
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Checkpoint inválido en {self.path}, se ignora: {e}")
+            return None
+
+        if not valid:
+            logger.info("Checkpoint obsoleto o de otro tamaño de página, se ignora")
+            return None
+        return data
+
+    def save(self, generacion: str, last_page: int, page_size: int) -> None:
+        data = {
+            'generacion': generacion,
+            'last_page': last_page,
+            'page_size': page_size,
+            'updated_at': datetime.now().isoformat(),
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,93 @@
+# Tabla columnar de empleos para filtrar el catálogo con máscaras vectorizadas
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Columnas de texto filtrables: (columna, filtro, comparación)
+_TEXT_FILTERS = (
+    ('denominacion', 'denominacion', 'contiene'),
+    ('nivel', 'nivel', 'igual'),
+    ('entidad_nombre', 'entidad', 'contiene'),
+    ('departamento', 'departamento', 'contiene'),
+)
+
+
+def _lowercase_categorical(values: Sequence) -> pd.Categorical:
+    """Categórica con las categorías ya en minúsculas (None cuenta como "")
+
+    ``.lower()`` se aplica una vez por valor distinto, no por empleo; las
+    categorías que solo difieren en mayúsculas quedan unificadas.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna(""), sort=False)
+    lowered_codes, lowered = pd.factorize(pd.Index(uniques, dtype=object).str.lower())
+    return pd.Categorical.from_codes(lowered_codes[codes], categories=lowered)
+
+
+class JobTable:
+    """Empleos procesados de un crawl en columnas NumPy/pandas
+
+    ``denominacion``, ``nivel``, ``entidad_nombre`` y ``departamento`` se
+    guardan como categóricas en minúsculas: un filtro de texto se evalúa sobre
+    las categorías distintas y se expande a los empleos indexando con los
+    códigos. ``filter_many`` evalúa varios conjuntos de filtros sobre la misma
+    tabla y reutiliza la máscara de cada (filtro, valor) repetido.
+
+    Mismos criterios que ``SimoApiScraper.job_matches_filters``.
+    """
+
+    def __init__(self, jobs: Sequence[Mapping]):
+        self.jobs = list(jobs)
+        self.columns: Dict[str, pd.Categorical] = {
+            column: _lowercase_categorical([job.get(column) for job in self.jobs])
+            for column, _, _ in _TEXT_FILTERS
+        }
+        # None y 0 (sin salario publicado) quedan como NaN: no los descarta salario_minimo
+        self.salaries = np.array([job.get('asignacion_salarial') or np.nan for job in self.jobs], dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def _text_mask(self, column: str, comparison: str, value: str) -> np.ndarray:
+        categorical = self.columns[column]
+        value = value.lower()
+        categories = categorical.categories
+        if comparison == 'igual':
+            matches = np.asarray(categories == value)
+        else:
+            matches = np.fromiter((value in category for category in categories), dtype=bool,
+                                  count=len(categories))
+        return matches[categorical.codes]
+
+    def _salary_mask(self, minimum: float) -> np.ndarray:
+        with np.errstate(invalid='ignore'):
+            return ~(self.salaries < minimum)
+
+    def mask(self, filters: Mapping, cache: Dict[Tuple, np.ndarray] = None) -> np.ndarray:
+        """Máscara booleana de los empleos que cumplen todos los filtros"""
+        cache = {} if cache is None else cache
+        result = np.ones(len(self.jobs), dtype=bool)
+        for column, key, comparison in _TEXT_FILTERS:
+            if key in filters:
+                cache_key = (key, filters[key].lower())
+                if cache_key not in cache:
+                    cache[cache_key] = self._text_mask(column, comparison, filters[key])
+                result &= cache[cache_key]
+        if 'salario_minimo' in filters:
+            cache_key = ('salario_minimo', filters['salario_minimo'])
+            if cache_key not in cache:
+                cache[cache_key] = self._salary_mask(filters['salario_minimo'])
+            result &= cache[cache_key]
+        return result
+
+    def take(self, mask: np.ndarray) -> List[Dict]:
+        """Empleos de la máscara, en el orden del crawl"""
+        return [self.jobs[i] for i in np.flatnonzero(mask)]
+
+    def filter(self, filters: Mapping) -> List[Dict]:
+        return self.take(self.mask(filters))
+
+    def filter_many(self, filter_sets: Sequence[Mapping]) -> List[List[Dict]]:
+        """Aplicar varios conjuntos de filtros en una pasada; un resultado por conjunto"""
+        cache: Dict[Tuple, np.ndarray] = {}
+        return [self.take(self.mask(filters, cache)) for filters in filter_sets]
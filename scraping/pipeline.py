@@ -0,0 +1,228 @@
+# Pipeline scraping -> base de datos con descarga y escritura superpuestas
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Dict, List, Optional
+
+from config import settings
+from metrics import diferencia_etapas, resumen_etapas
+from database.db_service import SimoDatabaseService
+from notifications.telegram import TelegramDeliveryQueue
+from scraping.checkpoint import CrawlCheckpoint
+from scraping.scraper import SimoApiScraper
+
+logger = logging.getLogger("simo_pipeline")
+
+# Marca de fin de la cola
+_FIN = None
+
+
+class ScrapePipeline:
+    """Conecta las páginas del scraper con el escritor de la base de datos
+
+    El scraper deja cada página procesada en una ``asyncio.Queue`` acotada y un
+    escritor la persiste con ``bulk_insert_empleos`` en un hilo dedicado, así las
+    páginas se guardan mientras las siguientes se descargan. Si la base de datos
+    va más lenta que la red, la cola se llena y la descarga espera
+    (contrapresión), de modo que la memoria queda acotada. El escritor agrupa
+    todas las páginas que encuentre en cola (hasta ``tamano_lote`` empleos) en
+    una sola escritura.
+
+    Decide entre crawl completo e incremental, marca la generación y ejecuta la
+    desactivación de no vistos tras un crawl completo, y registra tiempos por
+    etapa (ver metrics.resumen_etapas) y profundidad máxima de la cola en
+    ScrapingLog.
+
+    Un crawl completo guarda un CrawlCheckpoint tras cada escritura; si se
+    interrumpe, la siguiente ejecución lo retoma con la misma generación desde
+    la última página guardada (solapada, por los retiros de ofertas en SIMO).
+
+    Tras un crawl exitoso encola y entrega las notificaciones de los
+    suscriptores con ``notificaciones`` (por defecto una TelegramDeliveryQueue
+    si ``settings.telegram_enabled``).
+    """
+
+    def __init__(self, db: SimoDatabaseService, scraper: Optional[SimoApiScraper] = None,
+                 max_paginas_en_cola: int = None, tamano_lote: int = 500,
+                 checkpoint: Optional[CrawlCheckpoint] = None,
+                 notificaciones: Optional[TelegramDeliveryQueue] = None):
+        self.db = db
+        self.scraper = scraper
+        self.checkpoint = checkpoint or CrawlCheckpoint()
+        self.max_paginas_en_cola = max_paginas_en_cola or settings.pipeline_max_paginas_en_cola
+        self.tamano_lote = tamano_lote
+        if notificaciones is None and settings.telegram_enabled:
+            notificaciones = TelegramDeliveryQueue(db)
+        self.notificaciones = notificaciones
+
+    async def run(self, max_pages: Optional[int] = None, page_size: int = 50,
+                  concurrent: bool = True, incremental: Optional[bool] = None) -> Dict:
+        """Ejecutar un scraping completo o incremental y persistirlo
+
+        ``incremental=None`` decide según ``obtener_ids_para_crawl_incremental``;
+        True/False fuerzan el modo (True cae a completo si no hay ofertas
+        conocidas). Si hay un checkpoint vigente de un crawl completo
+        interrumpido, se retoma (salvo ``incremental=True``). Retorna las
+        estadísticas de la ejecución.
+        """
+        fecha_inicio = datetime.now()
+        inicio = time.monotonic()
+        etapas_inicio = resumen_etapas()
+
+        punto_control = None
+        if incremental is not True and not max_pages:
+            punto_control = self.checkpoint.load(page_size)
+
+        if punto_control or incremental is False:
+            known_ids = None
+        elif incremental:
+            known_ids = await asyncio.to_thread(self.db.obtener_ids_conocidos) or None
+        else:
+            known_ids = await asyncio.to_thread(self.db.obtener_ids_para_crawl_incremental)
+        # Un crawl limitado por max_pages no cuenta como completo para la política de crawls
+        modo = "incremental" if known_ids is not None else ("parcial" if max_pages else "completo")
+        generacion = self.db.nueva_generacion_crawl() if known_ids is None else None
+        start_page = 0
+        if punto_control:
+            generacion = punto_control['generacion']
+            # Se repite la última página guardada (ver CrawlCheckpoint)
+            start_page = punto_control['last_page']
+            logger.info(f"Retomando crawl completo {generacion} desde la página {start_page}")
+
+        stats = {
+            'modo': modo,
+            'pagina_inicial': start_page,
+            'paginas': 0,
+            'empleos_encontrados': 0,
+            'nuevos': 0,
+            'actualizados': 0,
+            'sin_cambios': 0,
+            'errores': 0,
+            'desactivados': 0,
+            'tiempo_descarga': 0.0,
+            'tiempo_escritura': 0.0,
+            'tiempo_espera_cola': 0.0,
+            'tiempo_espera_escritor': 0.0,
+            'max_profundidad_cola': 0,
+        }
+
+        cola: asyncio.Queue = asyncio.Queue(maxsize=self.max_paginas_en_cola)
+        # Un solo hilo: las escrituras se serializan y no compiten por el lock de SQLite
+        escritor_db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simo-db-writer")
+        loop = asyncio.get_running_loop()
+
+        async def producir(scraper: SimoApiScraper) -> None:
+            inicio_descarga = time.monotonic()
+            try:
+                async for pagina in scraper.iter_numbered_job_pages(
+                        max_pages=max_pages, page_size=page_size, concurrent=concurrent,
+                        known_ids=known_ids, start_page=start_page):
+                    stats['paginas'] += 1
+                    stats['empleos_encontrados'] += len(pagina[1])
+
+                    espera = time.monotonic()
+                    await cola.put(pagina)
+                    stats['tiempo_espera_cola'] += time.monotonic() - espera
+                    stats['max_profundidad_cola'] = max(stats['max_profundidad_cola'], cola.qsize())
+            finally:
+                stats['tiempo_descarga'] = time.monotonic() - inicio_descarga - stats['tiempo_espera_cola']
+            # Solo al terminar bien: si el escritor falló nadie consumiría la marca
+            await cola.put(_FIN)
+
+        def persistir(jobs: List[Dict], ultima_pagina: int) -> Dict[str, int]:
+            resultado = self.db.bulk_insert_empleos(jobs, self.tamano_lote, generacion)
+            if modo == "completo":
+                self.checkpoint.save(generacion, ultima_pagina, page_size)
+            return resultado
+
+        async def escribir() -> None:
+            terminado = False
+            while not terminado:
+                espera = time.monotonic()
+                paginas = [await cola.get()]
+                stats['tiempo_espera_escritor'] += time.monotonic() - espera
+
+                # Tomar también lo que ya esté en cola, hasta completar un lote
+                while not cola.empty() and sum(len(p[1]) for p in paginas if p) < self.tamano_lote:
+                    paginas.append(cola.get_nowait())
+                if paginas[-1] is _FIN:
+                    paginas.pop()
+                    terminado = True
+
+                jobs: List[Dict] = [job for _, pagina in paginas for job in pagina]
+                if not jobs:
+                    continue
+
+                escritura = time.monotonic()
+                resultado = await loop.run_in_executor(
+                    escritor_db, partial(persistir, jobs, paginas[-1][0])
+                )
+                stats['tiempo_escritura'] += time.monotonic() - escritura
+                for clave in ('nuevos', 'actualizados', 'sin_cambios', 'errores'):
+                    stats[clave] += resultado[clave]
+
+        error = None
+        try:
+            async with (self.scraper or SimoApiScraper()) as scraper:
+                tareas = [asyncio.create_task(producir(scraper)), asyncio.create_task(escribir())]
+                try:
+                    await asyncio.gather(*tareas)
+                except BaseException:
+                    for tarea in tareas:
+                        tarea.cancel()
+                    await asyncio.gather(*tareas, return_exceptions=True)
+                    raise
+                finally:
+                    stats['conexiones'] = scraper.connection_stats.as_dict()
+
+            # Solo un crawl completo recorre todo el catálogo. Al retomar un
+            # checkpoint se barre aunque no quedaran páginas: lo escrito antes de
+            # la interrupción ya tiene la generación
+            if modo == "completo":
+                if stats['empleos_encontrados'] or punto_control:
+                    stats['desactivados'] = await loop.run_in_executor(
+                        escritor_db, self.db.desactivar_no_vistos, generacion
+                    )
+                else:
+                    # Sin barrido de no vistos no cuenta como crawl completo
+                    modo = stats['modo'] = "parcial"
+                self.checkpoint.clear()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            escritor_db.shutdown(wait=True)
+            stats['tiempo_ejecucion'] = time.monotonic() - inicio
+            stats['etapas'] = diferencia_etapas(etapas_inicio)
+            logger.info(f"Pipeline de scraping {'fallido' if error else 'completado'}: {stats}")
+
+            await asyncio.to_thread(
+                self.db.crear_log_scraping,
+                fecha_inicio,
+                empleos_encontrados=stats['empleos_encontrados'],
+                empleos_nuevos=stats['nuevos'],
+                empleos_actualizados=stats['actualizados'],
+                empleos_sin_cambios=stats['sin_cambios'],
+                paginas_procesadas=stats['paginas'],
+                exitoso=error is None,
+                mensaje_error=str(error) if error else None,
+                tiempo_ejecucion=stats['tiempo_ejecucion'],
+                modo=modo,
+                tiempo_descarga=stats['tiempo_descarga'],
+                tiempo_escritura=stats['tiempo_escritura'],
+                tiempo_espera_cola=stats['tiempo_espera_cola'],
+                max_profundidad_cola=stats['max_profundidad_cola'],
+                desglose_etapas=stats['etapas']
+            )
+
+        if self.notificaciones is not None:
+            try:
+                stats['notificaciones'] = await self.notificaciones.notificar_suscriptores()
+            except Exception as e:
+                # El crawl ya quedó registrado; lo no entregado sigue en mensajes_pendientes
+                logger.error(f"Error notificando a los suscriptores: {e}")
+
+        return stats
@@ -0,0 +1,150 @@
+# Normalización de empleos de SIMO y decodificación rápida de páginas
+import hashlib
+import json
+import time
+from typing import Any, Dict, List
+
+try:
+    import orjson
+except ImportError:  # Opcional: sin orjson se usa json de la librería estándar
+    orjson = None
+
+
+def decode_json(raw: bytes) -> Any:
+    """Decodificar el cuerpo crudo de una respuesta (orjson si está instalado)
+
+    Ambos caminos lanzan ValueError si el JSON es inválido.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def build_job_dict(job_item: Dict, fecha_scraping: str) -> Dict:
+    """Normalizar un elemento crudo de SIMO en el dict que consume la base de datos
+
+    ``fecha_scraping`` se calcula una vez por página. Lanza ValueError si el
+    elemento no tiene la forma esperada (sin id entero o con secciones que no
+    son objetos); el llamador decide si lo omite.
+    """
+    if not isinstance(job_item, dict) or type(job_item.get('id')) is not int:
+        raise ValueError(f"Empleo sin id válido: {str(job_item)[:80]}")
+
+    try:
+        empleo = job_item.get('empleo') or {}
+        convocatoria = empleo.get('convocatoria') or {}
+        entidad = convocatoria.get('entidad') or {}
+        denominacion = empleo.get('denominacion') or {}
+        grado_nivel = empleo.get('gradoNivel') or {}
+
+        # Primera vacante y primer requisito (suele haber uno)
+        vacantes = empleo.get('vacantes') or ()
+        primera_vacante = vacantes[0] if vacantes else {}
+        municipio = primera_vacante.get('municipio') or {}
+        departamento = municipio.get('departamento') or {}
+        requisitos = empleo.get('requisitosMinimos') or ()
+        primer_requisito = requisitos[0] if requisitos else {}
+
+        return {
+            "id": job_item['id'],
+            "empleo_id": empleo.get('id'),
+            "codigo_empleo": (empleo.get('codigoEmpleo') or '').strip(),
+            "denominacion": (denominacion.get('nombre') or '').strip(),
+            "denominacion_id": denominacion.get('id'),
+            "nivel": (grado_nivel.get('nivelNombre') or '').strip(),
+            "grado": grado_nivel.get('grado', ''),
+            "descripcion": (empleo.get('descripcion') or '').strip(),
+            "asignacion_salarial": empleo.get('asignacionSalarial'),
+            "vigencia_salarial": empleo.get('vigenciaSalarial'),
+
+            # Entidad
+            "entidad_nombre": (entidad.get('nombre') or '').strip(),
+            "entidad_nit": entidad.get('nit', ''),
+            "tipo_entidad": (entidad.get('tipoEntidad') or {}).get('nombre', ''),
+
+            # Convocatoria
+            "convocatoria_nombre": convocatoria.get('nombre', ''),
+            "convocatoria_codigo": convocatoria.get('codigo', ''),
+            "convocatoria_agno": convocatoria.get('agno'),
+            "tipo_proceso": convocatoria.get('tipoProceso', ''),
+
+            # Ubicación
+            "departamento": departamento.get('nombre', ''),
+            "municipio": municipio.get('nombre', ''),
+            "dependencia": (primera_vacante.get('dependencia') or {}).get('nombre', ''),
+
+            # Vacantes
+            "cantidad_vacantes": primera_vacante.get('cantidad', 0),
+            "vacantes_disponibles": primera_vacante.get('disponible', 0),
+
+            # Requisitos
+            "estudio_requerido": (primer_requisito.get('estudio') or '').strip(),
+            "experiencia_requerida": (primer_requisito.get('experiencia') or '').strip(),
+            "otros_requisitos": primer_requisito.get('otros', ''),
+
+            # Funciones (texto concatenado)
+            "funciones": ' | '.join([f['descripcion'] for f in empleo.get('funciones') or ()]),
+
+            # Banderas
+            "concurso_ascenso": empleo.get('concursoAscenso', False),
+            "condicion_discapacidad": empleo.get('condicionDiscapacidad', False),
+            "favorito": job_item.get('favorito', False),
+            "fecha_inscripcion": job_item.get('fechaInscripcion'),
+
+            # Metadatos
+            "fecha_scraping": fecha_scraping,
+        }
+    except (AttributeError, TypeError, KeyError) as e:
+        raise ValueError(f"Empleo {job_item['id']} con formato inesperado: {e!r}") from e
+
+
+# Campos que cambian en cada crawl y no forman parte del contenido de la oferta
+_VOLATILE_FIELDS = ('fecha_scraping',)
+
+
+def job_content_hash(job: Dict) -> str:
+    """Hash estable del contenido de un empleo procesado por process_job_data"""
+    content = {key: value for key, value in job.items() if key not in _VOLATILE_FIELDS}
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class NormalizedPage:
+    """Página ya decodificada y normalizada por ``normalize_page``
+
+    Es lo que vuelve de un proceso de ``scraper_process_workers``: los empleos
+    ya normalizados, los errores de los elementos omitidos y los tiempos de
+    cada etapa medidos en el proceso. ``len`` es la cantidad de elementos
+    crudos, como la lista decodificada.
+    """
+    __slots__ = ('jobs', 'errors', 'items', 'decode_seconds', 'normalize_seconds')
+
+    def __init__(self, jobs: List[Dict], errors: List[str], items: int,
+                 decode_seconds: float, normalize_seconds: float):
+        self.jobs = jobs
+        self.errors = errors
+        self.items = items
+        self.decode_seconds = decode_seconds
+        self.normalize_seconds = normalize_seconds
+
+    def __len__(self) -> int:
+        return self.items
+
+
+def normalize_page(raw: bytes, fecha_scraping: str) -> NormalizedPage:
+    """Decodificar y normalizar una página completa de SIMO (apto para ProcessPoolExecutor)
+
+    Lanza ValueError si el cuerpo no es JSON válido; los elementos con formato
+    inesperado se omiten y se informan en ``errors``.
+    """
+    inicio = time.perf_counter()
+    items = decode_json(raw)
+    decodificado = time.perf_counter()
+
+    jobs, errors = [], []
+    for job_item in items:
+        try:
+            jobs.append(build_job_dict(job_item, fecha_scraping))
+        except Exception as e:
+            errors.append(str(e))
+    return NormalizedPage(jobs, errors, len(items), decodificado - inicio, time.perf_counter() - decodificado)
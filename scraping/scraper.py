@@ -1,34 +1,264 @@
 # Scraper mejorado que usa la API REST de SIMO
 import asyncio
-import json
 import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 import aiohttp
-from typing import List, Dict, Optional
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from typing import AsyncIterator, Collection, Iterable, List, Dict, Mapping, Optional, Sequence, Tuple
 import re
 
+from config import settings
+from rate_limit import TokenBucket
+from metrics import DESCARGA_PAGINA, EMPLEOS, ERRORES, ETAPA, PAGINAS, REINTENTOS
+from scraping.job_table import JobTable
+from scraping.records import NormalizedPage, build_job_dict, decode_json, job_content_hash, normalize_page
+
+
+# Respuestas de SIMO que vale la pena reintentar
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class PageFetchError(Exception):
+    """No se pudo obtener una página de SIMO (tras agotar los reintentos)"""
+    
+    def __init__(self, message: str, page: Optional[int] = None, status: Optional[int] = None):
+        super().__init__(message)
+        self.page = page
+        self.status = status
+
+
+class CircuitOpenError(PageFetchError):
+    """El circuito está abierto: SIMO viene fallando y no se hacen más peticiones por ahora"""
+
+
+class _RetryableFetchError(PageFetchError):
+    """Fallo transitorio de una petición (se reintenta)"""
+    
+    def __init__(self, message: str, page: Optional[int] = None, status: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message, page, status)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Corta las peticiones tras ``failure_threshold`` fallos seguidos
+    
+    Abierto, toda petición falla de inmediato durante ``reset_seconds``; luego
+    deja pasar una petición de prueba (semiabierto): si funciona se cierra, si
+    no vuelve a abrirse.
+    """
+    
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+    
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+    
+    def before_request(self) -> None:
+        """Lanzar CircuitOpenError si no se permite la petición"""
+        if self.opened_at is None:
+            return
+        if time.monotonic() - self.opened_at < self.reset_seconds or self._trial_in_flight:
+            raise CircuitOpenError(f"Circuito abierto tras {self.failures} fallos seguidos")
+        self._trial_in_flight = True
+    
+    def release_trial(self) -> None:
+        """Liberar la petición de prueba sin resultado (p. ej. cancelada)"""
+        self._trial_in_flight = False
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+def _retry_wait(base: float, maximum: float):
+    """Backoff exponencial con jitter que respeta el Retry-After del servidor"""
+    backoff = wait_exponential_jitter(multiplier=base, max=maximum, jitter=base)
+    
+    def wait(retry_state) -> float:
+        error = retry_state.outcome.exception()
+        if getattr(error, 'retry_after', None):
+            return min(float(error.retry_after), maximum)
+        return backoff(retry_state)
+    
+    return wait
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None  # Formato fecha HTTP: se usa el backoff
+
+
+def _accept_encoding() -> str:
+    """Codificaciones que aiohttp sabe descomprimir (brotli solo si está instalado)"""
+    for module in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module)
+            return "gzip, deflate, br"
+        except ImportError:
+            continue
+    return "gzip, deflate"
+
+
+class ConnectionStats:
+    """Contadores de conexiones HTTP alimentados por un ``aiohttp.TraceConfig``
+    
+    ``opened`` cuenta conexiones nuevas (DNS + TCP + TLS) y ``reused`` las
+    peticiones servidas por una conexión keep-alive del pool; con el connector
+    bien dimensionado ``opened`` se queda en ``max_concurrent``.
+    """
+    
+    def __init__(self):
+        self.opened = 0
+        self.reused = 0
+        self.requests = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+    
+    @property
+    def reuse_ratio(self) -> float:
+        total = self.opened + self.reused
+        return self.reused / total if total else 0.0
+    
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'connections_opened': self.opened,
+            'connections_reused': self.reused,
+            'requests': self.requests,
+            'dns_cache_hits': self.dns_cache_hits,
+            'dns_cache_misses': self.dns_cache_misses,
+            'reuse_ratio': round(self.reuse_ratio, 3),
+        }
+    
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        
+        async def on_connection_create_end(session, context, params):
+            self.opened += 1
+        
+        async def on_connection_reuseconn(session, context, params):
+            self.reused += 1
+        
+        async def on_request_end(session, context, params):
+            self.requests += 1
+        
+        async def on_dns_cache_hit(session, context, params):
+            self.dns_cache_hits += 1
+        
+        async def on_dns_cache_miss(session, context, params):
+            self.dns_cache_misses += 1
+        
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_request_end.append(on_request_end)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+
 class SimoApiScraper:
     """Scraper que extrae datos directamente de la API REST de SIMO"""
     
-    def __init__(self):
-        self.base_url = "https://simo.cnsc.gov.co/empleos/ofertaPublica/"
+    def __init__(self, max_concurrent: Optional[int] = None, delay_seconds: Optional[float] = None,
+                 base_url: Optional[str] = None, timeout_seconds: Optional[float] = None,
+                 retry_attempts: Optional[int] = None, retry_base_seconds: Optional[float] = None,
+                 process_workers: Optional[int] = None):
+        self.base_url = base_url or settings.simo_api_url
         self.session = None
         self.logger = self._setup_logger()
         
+        # Resiliencia: timeout por petición, reintentos con backoff y circuit breaker
+        self.timeout_seconds = timeout_seconds or settings.scraper_timeout_seconds
+        self.retry_attempts = max(1, retry_attempts or settings.scraper_retry_attempts)
+        self.retry_base_seconds = settings.scraper_retry_base_seconds if retry_base_seconds is None else retry_base_seconds
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.scraper_circuit_failure_threshold,
+            reset_seconds=settings.scraper_circuit_reset_seconds
+        )
+        
+        # Concurrencia: hasta N peticiones en vuelo, pero cada petición empieza al
+        # menos delay_seconds después de la anterior (la tasa no crece con N)
+        self.max_concurrent = max(1, max_concurrent or settings.scraper_max_concurrent)
+        self.delay_seconds = settings.scraper_delay_seconds if delay_seconds is None else delay_seconds
+        rate = 1 / self.delay_seconds if self.delay_seconds > 0 else 0
+        self.rate_limiter = TokenBucket(rate=rate, capacity=1)
+
+        # Conexiones abiertas vs reutilizadas durante la vida del scraper
+        self.connection_stats = ConnectionStats()
+        
+        # Normalización en otros procesos: el event loop queda libre para la red
+        self.process_workers = settings.scraper_process_workers if process_workers is None else process_workers
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+
     def _setup_logger(self):
         """Configurar logging"""
         logging.basicConfig(level=logging.INFO)
         return logging.getLogger("simo_api_scraper")
     
     async def __aenter__(self):
-        """Context manager para sesión HTTP"""
-        self.session = aiohttp.ClientSession()
+        """Context manager para sesión HTTP
+        
+        Una sola sesión con un connector dimensionado a ``max_concurrent``: las
+        páginas reutilizan conexiones keep-alive (sin DNS, TCP ni TLS por
+        página), el DNS se cachea ``scraper_dns_cache_seconds`` y las respuestas
+        se piden comprimidas.
+        
+        Con ``process_workers`` > 0 abre además un ProcessPoolExecutor que
+        decodifica y normaliza las páginas (ver normalize_page). Los procesos se
+        crean con "spawn": un fork copiaría un proceso con event loop e hilos
+        (to_thread, escritor de la base de datos) en un estado inconsistente.
+        """
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent,
+            limit_per_host=self.max_concurrent,
+            ttl_dns_cache=settings.scraper_dns_cache_seconds,
+            keepalive_timeout=settings.scraper_keepalive_seconds
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.timeout_seconds,
+            connect=settings.scraper_connect_timeout_seconds,
+            sock_read=self.timeout_seconds
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={'Accept-Encoding': _accept_encoding()},
+            trace_configs=[self.connection_stats.trace_config()]
+        )
+        if self.process_workers > 0:
+            self.process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Cerrar sesión HTTP"""
+        """Cerrar sesión HTTP y el pool de procesos"""
         if self.session:
             await self.session.close()
+            self.logger.info(f"Conexiones HTTP: {self.connection_stats.as_dict()}")
+        if self.process_pool:
+            self.process_pool.shutdown(wait=True, cancel_futures=True)
+            self.process_pool = None
     
     def parse_content_range(self, content_range: str) -> tuple[int, int, int]:
         """Parsear header Content-Range para obtener información de paginación"""
@@ -42,118 +272,221 @@ class SimoApiScraper:
                 return start, end, total
         return 0, 0, 0
     
-    async def get_page_data(self, page: int = 0, size: int = 20) -> tuple[List[Dict], int]:
-        """Obtener datos de una página específica y total de elementos"""
-        url = f"{self.base_url}?page={page}&size={size}"
-        
+    async def _request_page(self, url: str, page: int) -> tuple[List[Dict], int]:
+        """Una petición; clasifica los fallos en transitorios (se reintentan) o definitivos"""
+        self.circuit_breaker.before_request()
+        inicio = time.perf_counter()
         try:
-            self.logger.info(f"📡 Obteniendo página {page} (tamaño: {size})")
-            
             async with self.session.get(url) as response:
                 if response.status == 200:
                     # Obtener total de elementos del header Content-Range
                     content_range = response.headers.get('Content-Range', '')
                     start, end, total_elements = self.parse_content_range(content_range)
                     
-                    data = await response.json()
-                    self.logger.info(f"✅ Página {page}: {len(data)} empleos obtenidos (total: {total_elements})")
-                    
-                    return data, total_elements
+                    raw = await response.read()
+                    DESCARGA_PAGINA.observe(time.perf_counter() - inicio)
                 else:
-                    self.logger.error(f"❌ Error HTTP {response.status} en página {page}")
-                    return [], 0
-                    
-        except Exception as e:
-            self.logger.error(f"❌ Error obteniendo página {page}: {e}")
-            return [], 0
+                    message = f"Error HTTP {response.status} en página {page}"
+                    if response.status in RETRYABLE_STATUSES:
+                        raise _RetryableFetchError(message, page, response.status,
+                                                   _parse_retry_after(response.headers.get('Retry-After')))
+                    # El servidor responde: el error es de la petición, no una caída de SIMO
+                    self.circuit_breaker.record_success()
+                    raise PageFetchError(message, page, response.status)
+            
+            # La conexión ya volvió al pool mientras se decodifica
+            data = await self._decode_page(raw)
+            self.circuit_breaker.record_success()
+            return data, total_elements
+        
+        except asyncio.CancelledError:
+            self.circuit_breaker.release_trial()
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.circuit_breaker.record_failure()
+            raise _RetryableFetchError(f"Error de red en página {page}: {e!r}", page) from e
+        except _RetryableFetchError:
+            self.circuit_breaker.record_failure()
+            raise
+        except ValueError as e:
+            # JSON inválido: SIMO respondió algo que no es la página (p. ej. HTML de error)
+            self.circuit_breaker.record_failure()
+            raise _RetryableFetchError(f"Respuesta inválida en página {page}: {e}", page) from e
+        except BrokenProcessPool as e:
+            # Falla local, no de SIMO: no cuenta para el circuito ni se reintenta
+            self.circuit_breaker.release_trial()
+            raise PageFetchError(f"Pool de normalización caído en página {page}: {e!r}", page) from e
+        except PageFetchError:
+            raise  # El resultado ya quedó registrado en el circuito
+        except Exception:
+            # Cualquier otro fallo también libera la petición de prueba del circuito
+            self.circuit_breaker.record_failure()
+            raise
+    
+    async def _decode_page(self, raw: bytes):
+        """Decodificar el cuerpo de una página; con pool de procesos, además normalizarla"""
+        if self.process_pool is None:
+            with ETAPA.time(etapa="decodificacion_json"):
+                return decode_json(raw)
+        
+        loop = asyncio.get_running_loop()
+        normalized = await loop.run_in_executor(self.process_pool, normalize_page, raw, datetime.now().isoformat())
+        ETAPA.observe(normalized.decode_seconds, etapa="decodificacion_json")
+        return normalized
+    
+    async def get_page_data(self, page: int = 0, size: int = 20) -> tuple[List[Dict], int]:
+        """Obtener datos de una página específica y total de elementos
+        
+        Cada petición tiene timeout (``scraper_timeout_seconds``); los errores de
+        red y los estados transitorios (429, 5xx...) se reintentan con backoff
+        exponencial con jitter hasta ``scraper_retry_attempts`` intentos. Cada
+        intento, reintentos incluidos, consume un token del limitador de tasa:
+        con SIMO fallando los reintentos no se suman en ráfaga. Si la página no
+        se puede obtener lanza PageFetchError, nunca retorna una página vacía en
+        su lugar.
+        
+        Con pool de procesos ``data`` es una NormalizedPage en lugar de la lista
+        de elementos crudos.
+        """
+        url = f"{self.base_url}?page={page}&size={size}"
+        self.logger.info(f"📡 Obteniendo página {page} (tamaño: {size})")
+        
+        retrying = AsyncRetrying(
+            retry=retry_if_exception_type(_RetryableFetchError),
+            wait=_retry_wait(self.retry_base_seconds, self.timeout_seconds),
+            stop=stop_after_attempt(self.retry_attempts),
+            before_sleep=lambda retry_state: REINTENTOS.inc(),
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    if attempt.retry_state.attempt_number > 1:
+                        self.logger.warning(f"🔁 Reintentando página {page} (intento {attempt.retry_state.attempt_number})")
+                    await self.rate_limiter.acquire()
+                    data, total_elements = await self._request_page(url, page)
+        except _RetryableFetchError as e:
+            ERRORES.inc(etapa="descarga")
+            self.logger.error(f"❌ {e} (tras {self.retry_attempts} intentos)")
+            raise PageFetchError(str(e), page, e.status) from e
+        except PageFetchError as e:
+            ERRORES.inc(etapa="descarga")
+            self.logger.error(f"❌ {e}")
+            raise
+        
+        self.logger.info(f"✅ Página {page}: {len(data)} empleos obtenidos (total: {total_elements})")
+        return data, total_elements
     
     async def get_total_elements(self) -> int:
         """Obtener el total de elementos disponibles"""
         _, total = await self.get_page_data(page=0, size=1)
         return total
     
-    def process_job_data(self, job_item: Dict) -> Dict:
-        """Procesar y normalizar datos de un empleo"""
-        empleo = job_item.get('empleo', {})
-        convocatoria = empleo.get('convocatoria', {})
-        entidad = convocatoria.get('entidad', {})
-        denominacion = empleo.get('denominacion', {})
-        grado_nivel = empleo.get('gradoNivel', {})
+    async def fetch_pages(self, pages: Iterable[int], page_size: int = 50,
+                          concurrent: bool = True) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """Descargar páginas y entregarlas en orden como (página, datos)
         
-        # Obtener primera vacante (suele haber una)
-        vacantes = empleo.get('vacantes', [])
-        primera_vacante = vacantes[0] if vacantes else {}
-        municipio = primera_vacante.get('municipio', {})
-        departamento = municipio.get('departamento', {})
+        En modo concurrente mantiene hasta ``max_concurrent`` peticiones en vuelo
+        (ventana deslizante); el orden de salida es siempre el orden de las
+        páginas, igual que en modo secuencial. En ambos modos el token bucket
+        espacia el inicio de las peticiones ``delay_seconds``.
+        """
+        pages = iter(pages)
         
-        # Obtener requisitos
-        requisitos = empleo.get('requisitosMinimos', [])
-        primer_requisito = requisitos[0] if requisitos else {}
+        if not concurrent:
+            for page in pages:
+                page_data, _ = await self.get_page_data(page, page_size)
+                yield page, page_data
+            return
         
-        # Obtener funciones (concatenar todas)
-        funciones = empleo.get('funciones', [])
-        funciones_texto = ' | '.join([f['descripcion'] for f in funciones])
+        in_flight = deque()
         
-        return {
-            "id": job_item.get('id'),
-            "empleo_id": empleo.get('id'),
-            "codigo_empleo": empleo.get('codigoEmpleo', '').strip(),
-            "denominacion": denominacion.get('nombre', '').strip(),
-            "denominacion_id": denominacion.get('id'),
-            "nivel": grado_nivel.get('nivelNombre', '').strip(),
-            "grado": grado_nivel.get('grado', ''),
-            "descripcion": empleo.get('descripcion', '').strip(),
-            "asignacion_salarial": empleo.get('asignacionSalarial'),
-            "vigencia_salarial": empleo.get('vigenciaSalarial'),
-            
-            # Entidad
-            "entidad_nombre": entidad.get('nombre', '').strip(),
-            "entidad_nit": entidad.get('nit', ''),
-            "tipo_entidad": entidad.get('tipoEntidad', {}).get('nombre', ''),
-            
-            # Convocatoria
-            "convocatoria_nombre": convocatoria.get('nombre', ''),
-            "convocatoria_codigo": convocatoria.get('codigo', ''),
-            "convocatoria_agno": convocatoria.get('agno'),
-            "tipo_proceso": convocatoria.get('tipoProceso', ''),
-            
-            # Ubicación
-            "departamento": departamento.get('nombre', ''),
-            "municipio": municipio.get('nombre', ''),
-            "dependencia": primera_vacante.get('dependencia', {}).get('nombre', ''),
-            
-            # Vacantes
-            "cantidad_vacantes": primera_vacante.get('cantidad', 0),
-            "vacantes_disponibles": primera_vacante.get('disponible', 0),
-            
-            # Requisitos
-            "estudio_requerido": primer_requisito.get('estudio', '').strip(),
-            "experiencia_requerida": primer_requisito.get('experiencia', '').strip(),
-            "otros_requisitos": primer_requisito.get('otros', ''),
-            
-            # Funciones (texto concatenado)
-            "funciones": funciones_texto,
-            
-            # Banderas
-            "concurso_ascenso": empleo.get('concursoAscenso', False),
-            "condicion_discapacidad": empleo.get('condicionDiscapacidad', False),
-            "favorito": job_item.get('favorito', False),
-            "fecha_inscripcion": job_item.get('fechaInscripcion'),
+        def schedule_next() -> None:
+            page = next(pages, None)
+            if page is not None:
+                task = asyncio.ensure_future(self.get_page_data(page, page_size))
+                in_flight.append((page, task))
+        
+        try:
+            for _ in range(self.max_concurrent):
+                schedule_next()
             
-            # Metadatos
-            "fecha_scraping": datetime.now().isoformat()
-        }
+            while in_flight:
+                page, task = in_flight.popleft()
+                page_data, _ = await task
+                # Reponer la ventana antes de entregar la página al consumidor
+                schedule_next()
+                yield page, page_data
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+            # Esperar a que terminen de cancelarse (liberan conexión y circuito)
+            await asyncio.gather(*(task for _, task in in_flight), return_exceptions=True)
     
-    async def scrape_all_jobs(self, max_pages: Optional[int] = None, page_size: int = 50) -> List[Dict]:
-        """Scraper completo de todas las ofertas de empleo"""
-        self.logger.info("🚀 Iniciando scraping completo de SIMO API...")
+    def process_job_data(self, job_item: Dict, fecha_scraping: Optional[str] = None) -> Dict:
+        """Procesar y normalizar datos de un empleo (ver build_job_dict)
+        
+        ``fecha_scraping`` se pasa una vez por página; si falta se usa la hora actual.
+        """
+        return build_job_dict(job_item, fecha_scraping or datetime.now().isoformat())
+    
+    def _page_jobs(self, page: int, page_data) -> List[Dict]:
+        """Empleos procesados de una página descargada (cruda o ya normalizada en un proceso)"""
+        if isinstance(page_data, NormalizedPage):
+            ETAPA.observe(page_data.normalize_seconds, etapa="normalizacion")
+            errors = page_data.errors
+            jobs = page_data.jobs
+        else:
+            errors = []
+            jobs = []
+            fecha_scraping = datetime.now().isoformat()
+            with ETAPA.time(etapa="normalizacion"):
+                for job_item in page_data:
+                    try:
+                        jobs.append(self.process_job_data(job_item, fecha_scraping))
+                    except Exception as e:
+                        errors.append(str(e))
+        
+        for error in errors:
+            ERRORES.inc(etapa="procesamiento")
+            self.logger.warning(f"⚠️ Error procesando empleo en página {page}: {error}")
+        return jobs
+    
+    async def iter_numbered_job_pages(self, max_pages: Optional[int] = None, page_size: int = 50,
+                                      concurrent: bool = True, known_ids: Optional[Collection[int]] = None,
+                                      stop_after_known_pages: Optional[int] = None,
+                                      start_page: int = 0) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """Recorrer SIMO entregando (página, empleos procesados) de cada página, en orden
+        
+        Cada lote se entrega apenas se procesa su página, mientras las siguientes
+        siguen descargándose, así que la memoria no depende del tamaño del catálogo.
+        ``start_page`` permite retomar un crawl interrumpido (ver CrawlCheckpoint).
+        Si una página no se puede obtener tras los reintentos se lanza
+        PageFetchError en lugar de saltarla.
+        
+        Si se pasa ``known_ids`` el recorrido es incremental: se detiene después de
+        ``stop_after_known_pages`` páginas seguidas cuyas ofertas ya son conocidas.
+        Si ``known_ids`` es un mapeo id -> hash de contenido, una oferta solo cuenta
+        como conocida si además su hash no cambió.
+        
+        Detenerse solo es seguro si SIMO lista primero las ofertas más recientes.
+        La API no documenta su orden, así que se verifica con los ids (que SIMO
+        asigna de forma creciente): mientras lleguen en orden descendente el
+        corte anticipado está permitido; si una página rompe ese orden se
+        desactiva y el recorrido sigue hasta el final.
+        """
+        delta = known_ids is not None
+        if stop_after_known_pages is None:
+            stop_after_known_pages = settings.scraper_delta_stop_pages
+        
+        self.logger.info(f"🚀 Iniciando scraping {'incremental' if delta else 'completo'} de SIMO API...")
         
         # Obtener total de elementos
         total_elements = await self.get_total_elements()
         
         if total_elements == 0:
-            self.logger.error("❌ No se pudo obtener información de total de elementos")
-            return []
+            self.logger.warning("⚠️ SIMO no reporta ofertas")
+            return
         
         # Calcular número de páginas necesarias
         total_pages = (total_elements + page_size - 1) // page_size  # Ceiling division
@@ -163,72 +496,150 @@ class SimoApiScraper:
         
         self.logger.info(f"📊 Total elementos: {total_elements}")
         self.logger.info(f"📄 Páginas necesarias: {total_pages} (tamaño: {page_size})")
-        self.logger.info(f"📄 Procesando {pages_to_scrape} páginas")
-        
-        all_jobs = []
+        self.logger.info(f"📄 Procesando páginas {start_page} a {pages_to_scrape - 1}")
         
-        # Procesar todas las páginas
-        for page in range(pages_to_scrape):
-            page_data, _ = await self.get_page_data(page=page, size=page_size)
-            
-            if page_data:
-                for job_item in page_data:
-                    try:
-                        processed_job = self.process_job_data(job_item)
-                        all_jobs.append(processed_job)
-                    except Exception as e:
-                        self.logger.warning(f"⚠️ Error procesando empleo en página {page}: {e}")
-                        continue
+        # Procesar todas las páginas (en orden, aunque se descarguen en paralelo)
+        page_stream = self.fetch_pages(range(start_page, pages_to_scrape), page_size, concurrent)
+        known_pages = 0
+        newest_first = True
+        last_id = None
+        try:
+            async for page, page_data in page_stream:
+                if not page_data:
+                    self.logger.warning(f"⚠️ Página {page} vacía o con error")
+                    continue
+                
+                jobs = self._page_jobs(page, page_data)
+                PAGINAS.inc()
+                EMPLEOS.inc(len(jobs))
                 
                 self.logger.info(f"✅ Página {page + 1}/{pages_to_scrape} completada - {len(page_data)} empleos")
+                yield page, jobs
                 
-                # Pequeña pausa para no sobrecargar el servidor
-                await asyncio.sleep(0.3)
-            else:
-                self.logger.warning(f"⚠️ Página {page} vacía o con error")
+                if delta and newest_first:
+                    ids = [job['id'] for job in jobs]
+                    if not self._descending_ids(last_id, ids):
+                        newest_first = False
+                        self.logger.warning(
+                            f"⚠️ Página {page} no lista las ofertas más recientes primero; "
+                            "el crawl incremental recorrerá todas las páginas"
+                        )
+                        continue
+                    last_id = ids[-1] if ids else last_id
+                    
+                    if jobs and all(self._is_known_unchanged(job, known_ids) for job in jobs):
+                        known_pages += 1
+                    else:
+                        known_pages = 0
+                    
+                    if known_pages >= stop_after_known_pages:
+                        self.logger.info(f"⏹️ Página {page} solo contiene ofertas conocidas, deteniendo crawl incremental")
+                        break
+        finally:
+            # Cancelar las descargas que sigan en vuelo
+            await page_stream.aclose()
+    
+    async def iter_job_pages(self, max_pages: Optional[int] = None, page_size: int = 50,
+                             concurrent: bool = True, known_ids: Optional[Collection[int]] = None,
+                             stop_after_known_pages: Optional[int] = None,
+                             start_page: int = 0) -> AsyncIterator[List[Dict]]:
+        """Recorrer SIMO entregando los empleos procesados de cada página (ver iter_numbered_job_pages)"""
+        pages = self.iter_numbered_job_pages(max_pages=max_pages, page_size=page_size, concurrent=concurrent,
+                                             known_ids=known_ids, stop_after_known_pages=stop_after_known_pages,
+                                             start_page=start_page)
+        try:
+            async for _, jobs in pages:
+                yield jobs
+        finally:
+            await pages.aclose()
+    
+    @staticmethod
+    def _descending_ids(previous_id: Optional[int], ids: List[int]) -> bool:
+        """Verificar que los ids sigan en orden estrictamente descendente desde ``previous_id``"""
+        sequence = ([previous_id] if previous_id is not None else []) + ids
+        return all(a > b for a, b in zip(sequence, sequence[1:]))
+    
+    @staticmethod
+    def _is_known_unchanged(job: Dict, known_ids: Collection[int]) -> bool:
+        """Verificar si un empleo ya está almacenado y no cambió"""
+        if job['id'] not in known_ids:
+            return False
+        
+        if isinstance(known_ids, Mapping) and known_ids[job['id']] is not None:
+            return known_ids[job['id']] == job_content_hash(job)
+        
+        return True
+    
+    async def iter_jobs(self, max_pages: Optional[int] = None, page_size: int = 50,
+                        concurrent: bool = True, known_ids: Optional[Collection[int]] = None) -> AsyncIterator[Dict]:
+        """Recorrer SIMO entregando los empleos procesados uno a uno"""
+        async for jobs in self.iter_job_pages(max_pages=max_pages, page_size=page_size,
+                                              concurrent=concurrent, known_ids=known_ids):
+            for job in jobs:
+                yield job
+    
+    async def scrape_all_jobs(self, max_pages: Optional[int] = None, page_size: int = 50,
+                              concurrent: bool = True, known_ids: Optional[Collection[int]] = None) -> List[Dict]:
+        """Scraper completo de todas las ofertas de empleo (incremental si se pasan known_ids)"""
+        all_jobs = []
+        
+        async for jobs in self.iter_job_pages(max_pages=max_pages, page_size=page_size,
+                                              concurrent=concurrent, known_ids=known_ids):
+            all_jobs.extend(jobs)
         
         self.logger.info(f"🎉 Scraping completado! Total empleos obtenidos: {len(all_jobs)}")
         return all_jobs
     
-    async def search_jobs_by_criteria(self, filters: Dict = None, max_pages: int = None) -> List[Dict]:
-        """Buscar empleos con criterios específicos"""
-        all_jobs = await self.scrape_all_jobs(max_pages=max_pages)
+    @staticmethod
+    def job_matches_filters(job: Dict, filters: Dict) -> bool:
+        """Verificar si un empleo procesado cumple los filtros de búsqueda"""
+        # Filtro por denominación (ej: "técnico")
+        if 'denominacion' in filters:
+            if filters['denominacion'].lower() not in job['denominacion'].lower():
+                return False
+        
+        # Filtro por nivel
+        if 'nivel' in filters:
+            if filters['nivel'].lower() != job['nivel'].lower():
+                return False
+        
+        # Filtro por entidad
+        if 'entidad' in filters:
+            if filters['entidad'].lower() not in job['entidad_nombre'].lower():
+                return False
         
+        # Filtro por departamento
+        if 'departamento' in filters:
+            if filters['departamento'].lower() not in job['departamento'].lower():
+                return False
+        
+        # Filtro por salario mínimo
+        if 'salario_minimo' in filters:
+            if job['asignacion_salarial'] and job['asignacion_salarial'] < filters['salario_minimo']:
+                return False
+        
+        return True
+    
+    async def search_jobs_by_criteria(self, filters: Dict = None, max_pages: int = None,
+                                      concurrent: bool = True) -> List[Dict]:
+        """Buscar empleos con criterios específicos"""
         if not filters:
-            return all_jobs
+            return await self.scrape_all_jobs(max_pages=max_pages, concurrent=concurrent)
         
-        filtered_jobs = []
+        results = await self.search_jobs_by_filter_sets([filters], max_pages=max_pages, concurrent=concurrent)
+        return results[0]
+    
+    async def search_jobs_by_filter_sets(self, filter_sets: Sequence[Dict], max_pages: int = None,
+                                         concurrent: bool = True) -> List[List[Dict]]:
+        """Evaluar varios conjuntos de filtros sobre un mismo crawl; un resultado por conjunto
         
-        for job in all_jobs:
-            match = True
-            
-            # Filtro por denominación (ej: "técnico")
-            if 'denominacion' in filters:
-                if filters['denominacion'].lower() not in job['denominacion'].lower():
-                    match = False
-            
-            # Filtro por nivel
-            if 'nivel' in filters:
-                if filters['nivel'].lower() != job['nivel'].lower():
-                    match = False
-            
-            # Filtro por entidad
-            if 'entidad' in filters:
-                if filters['entidad'].lower() not in job['entidad_nombre'].lower():
-                    match = False
-            
-            # Filtro por departamento
-            if 'departamento' in filters:
-                if filters['departamento'].lower() not in job['departamento'].lower():
-                    match = False
-            
-            # Filtro por salario mínimo
-            if 'salario_minimo' in filters:
-                if job['asignacion_salarial'] and job['asignacion_salarial'] < filters['salario_minimo']:
-                    match = False
-            
-            if match:
-                filtered_jobs.append(job)
+        Los filtros se aplican como máscaras vectorizadas sobre una JobTable
+        (mismos criterios que job_matches_filters).
+        """
+        table = JobTable(await self.scrape_all_jobs(max_pages=max_pages, concurrent=concurrent))
+        with ETAPA.time(etapa="filtrado"):
+            results = table.filter_many(filter_sets)
         
-        self.logger.info(f"🔍 Filtros aplicados: {len(filtered_jobs)} empleos encontrados de {len(all_jobs)} totales")
-        return filtered_jobs
+        for filters, filtered_jobs in zip(filter_sets, results):
+            self.logger.info(f"🔍 Filtros {filters}: {len(filtered_jobs)} empleos encontrados de {len(table)} totales")
+        return results
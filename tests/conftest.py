@@ -0,0 +1,56 @@
+# Fixtures compartidas: base SQLite temporal y empleos sintéticos con la forma de SIMO
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from alembic import command
+from alembic.config import Config
+
+from benchmarks.simo_payload import simo_page
+from database.db_service import SimoDatabaseService
+from scraping.scraper import SimoApiScraper
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session")
+def base_migrada(tmp_path_factory) -> Path:
+    """Base vacía con ``alembic upgrade head``, creada una vez y copiada en cada test"""
+    directorio = tmp_path_factory.mktemp("migrada")
+    config = Config()
+    config.set_main_option("script_location", str(RAIZ / "alembic"))
+    anterior = os.getcwd()
+    os.chdir(directorio)
+    try:
+        command.upgrade(config, "head")
+    finally:
+        os.chdir(anterior)
+    return directorio / "simo_empleos.db"
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch, base_migrada):
+    """Servicio sobre una base nueva (SimoDatabaseService usa ./simo_empleos.db)"""
+    shutil.copy(base_migrada, tmp_path / "simo_empleos.db")
+    monkeypatch.chdir(tmp_path)
+    servicio = SimoDatabaseService()
+    yield servicio
+    servicio.engine.dispose()
+
+
+@pytest.fixture
+def crear_empleos():
+    """Empleos procesados como los entrega el scraper, con fecha_scraping distinta por empleo"""
+    scraper = SimoApiScraper()
+    base = datetime.now().replace(microsecond=0) - timedelta(days=1)
+
+    def crear(cantidad: int, inicio: int = 0) -> List[Dict]:
+        return [
+            scraper.process_job_data(item, (base + timedelta(seconds=i)).isoformat())
+            for i, item in enumerate(simo_page(inicio, cantidad, inicio + cantidad), start=inicio)
+        ]
+
+    return crear
@@ -0,0 +1,88 @@
+# Servidor local que imita ofertaPublica de SIMO con fallos y retiros programables, para los tests
+import asyncio
+import contextlib
+import json
+import time
+from typing import AsyncIterator, Dict, List, Tuple
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from benchmarks.simo_payload import simo_item
+
+
+class FakeSimo:
+    """SIMO falso con las ofertas ``0..total-1`` por id ascendente (descendente con ``recientes_primero``)
+
+    ``fallar(page, status, ...)`` encola estados de error para los siguientes
+    pedidos de esa página; ``retirar(i, ...)`` quita ofertas, y las siguientes
+    se corren hacia el inicio como en SIMO. Cada pedido queda en ``peticiones``
+    como (página, instante monotónico) y ``max_en_vuelo`` registra la mayor
+    cantidad de pedidos atendidos a la vez. Con ``comprimir`` las respuestas
+    van comprimidas según el Accept-Encoding del pedido.
+    """
+
+    def __init__(self, total: int, latencia: float = 0.0, recientes_primero: bool = False,
+                 comprimir: bool = False):
+        self.ofertas = list(range(total))
+        self.recientes_primero = recientes_primero
+        self.latencia = latencia
+        self.comprimir = comprimir
+        self.encodings: List[str] = []
+        self.peticiones: List[Tuple[int, float]] = []
+        self.en_vuelo = 0
+        self.max_en_vuelo = 0
+        self._fallos: Dict[int, List[int]] = {}
+
+    def fallar(self, page: int, *estados: int) -> None:
+        self._fallos.setdefault(page, []).extend(estados)
+
+    def publicar(self, cantidad: int) -> None:
+        """Agregar ``cantidad`` ofertas nuevas, con ids mayores que las existentes"""
+        siguiente = max(self.ofertas, default=-1) + 1
+        self.ofertas.extend(range(siguiente, siguiente + cantidad))
+
+    def retirar(self, *indices: int) -> None:
+        self.ofertas = [i for i in self.ofertas if i not in set(indices)]
+
+    def paginas(self) -> List[int]:
+        return [page for page, _ in self.peticiones]
+
+    async def _oferta_publica(self, request: web.Request) -> web.Response:
+        page = int(request.query.get('page', 0))
+        size = int(request.query.get('size', 20))
+        self.peticiones.append((page, time.monotonic()))
+        self.encodings.append(request.headers.get('Accept-Encoding', ''))
+        self.en_vuelo += 1
+        self.max_en_vuelo = max(self.max_en_vuelo, self.en_vuelo)
+        try:
+            if self.latencia > 0:
+                await asyncio.sleep(self.latencia)
+            fallos = self._fallos.get(page)
+            if fallos:
+                return web.Response(status=fallos.pop(0), text="error")
+
+            inicio = page * size
+            ofertas = self.ofertas[::-1] if self.recientes_primero else self.ofertas
+            items = [simo_item(i) for i in ofertas[inicio:inicio + size]]
+            fin = max(inicio, inicio + len(items) - 1)
+            headers = {'Content-Range': f"{inicio}-{fin}/{len(self.ofertas)}"}
+            response = web.Response(body=json.dumps(items, ensure_ascii=False).encode("utf-8"),
+                                    content_type="application/json", headers=headers)
+            if self.comprimir:
+                response.enable_compression()
+            return response
+        finally:
+            self.en_vuelo -= 1
+
+    @contextlib.asynccontextmanager
+    async def servir(self) -> AsyncIterator[str]:
+        """Levantar el servidor en el event loop actual y dar su URL"""
+        app = web.Application()
+        app.router.add_get("/", self._oferta_publica)
+        servidor = TestServer(app)
+        await servidor.start_server()
+        try:
+            yield str(servidor.make_url("/"))
+        finally:
+            await servidor.close()
@@ -0,0 +1,56 @@
+# Servidor local que imita sendMessage de la Bot API de Telegram, para los tests
+import contextlib
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+
+class FakeBotApi:
+    """Bot API falsa: responde ``ok`` salvo las respuestas programadas por chat
+
+    ``programar(chat_id, (status, cuerpo), ...)`` encola respuestas que se
+    devuelven en orden a los siguientes envíos a ese chat; ``cuerpo`` se
+    serializa como JSON tal cual (puede no ser un objeto). Los payloads
+    recibidos quedan en ``recibidos``.
+    """
+
+    def __init__(self, token: str = "TOKEN-PRUEBA"):
+        self.token = token
+        self.recibidos: List[Dict] = []
+        self._respuestas: Dict[str, List[Tuple[int, Any]]] = {}
+
+    def programar(self, chat_id: str, *respuestas: Tuple[int, Any]) -> None:
+        self._respuestas.setdefault(str(chat_id), []).extend(respuestas)
+
+    def chats(self) -> List[str]:
+        return [str(payload['chat_id']) for payload in self.recibidos]
+
+    async def _send_message(self, request: web.Request) -> web.Response:
+        if request.match_info['token'] != self.token:
+            status, cuerpo = 401, {'ok': False, 'error_code': 401, 'description': 'Unauthorized'}
+        else:
+            payload = await request.json()
+            self.recibidos.append(payload)
+            programadas = self._respuestas.get(str(payload['chat_id']))
+            if programadas:
+                status, cuerpo = programadas.pop(0)
+            else:
+                status, cuerpo = 200, {'ok': True, 'result': {'message_id': len(self.recibidos)}}
+        return web.Response(status=status, text=json.dumps(cuerpo), content_type="application/json")
+
+    def crear_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/sendMessage", self._send_message)
+        return app
+
+    @contextlib.asynccontextmanager
+    async def servir(self) -> AsyncIterator[str]:
+        """Levantar el servidor en el event loop actual y dar su URL base"""
+        servidor = TestServer(self.crear_app())
+        await servidor.start_server()
+        try:
+            yield str(servidor.make_url("")).rstrip("/")
+        finally:
+            await servidor.close()
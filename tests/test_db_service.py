@@ -0,0 +1,266 @@
+# Tests de escritura masiva, caché de dimensiones, barrido de no vistos y resumen de estadísticas
+import pytest
+from sqlalchemy import event
+
+from database.models import Departamento, Empleo, EmpleoArchivado
+from database.stats import calcular_resumen, leer_resumen
+
+
+def activos(db):
+    session = db.get_session()
+    try:
+        return {simo_id for (simo_id,) in session.query(Empleo.simo_id).filter(Empleo.activo == True)}
+    finally:
+        session.close()
+
+
+def assert_resumen_al_dia(db):
+    """El resumen materializado coincide con recalcularlo desde la tabla"""
+    session = db.get_session()
+    try:
+        resumen, esperado = leer_resumen(session), calcular_resumen(session)
+    finally:
+        session.close()
+    assert resumen is not None
+    assert resumen['salarios'].pop('suma') == pytest.approx(esperado['salarios'].pop('suma'))
+    assert resumen == esperado
+
+
+def test_bulk_insert_cuenta_nuevos_actualizados_y_sin_cambios(db, crear_empleos):
+    empleos = crear_empleos(30)
+    assert db.bulk_insert_empleos(empleos, tamano_lote=7) == {
+        'procesados': 30, 'nuevos': 30, 'actualizados': 0, 'sin_cambios': 0, 'errores': 0
+    }
+
+    cambiados = [dict(e, denominacion=e['denominacion'] + " II") for e in empleos[:10]]
+    # fecha_scraping cambia en cada crawl y no cuenta como cambio de contenido
+    iguales = [dict(e, fecha_scraping="2030-01-01T00:00:00") for e in empleos[10:]]
+    assert db.bulk_insert_empleos(cambiados + iguales, tamano_lote=7) == {
+        'procesados': 30, 'nuevos': 0, 'actualizados': 10, 'sin_cambios': 20, 'errores': 0
+    }
+    assert db.buscar_empleos(filtros={'denominacion': " II"})['total'] == 10
+
+
+def test_simo_id_repetido_en_un_lote_gana_la_ultima_aparicion(db, crear_empleos):
+    primero, segundo = crear_empleos(2)
+    stats = db.bulk_insert_empleos([primero, dict(primero, denominacion="Repetido"), segundo])
+
+    assert stats['nuevos'] == 2
+    assert db.buscar_empleos(filtros={'denominacion': "Repetido"})['total'] == 1
+
+
+def test_lote_fallido_se_reintenta_fila_por_fila(db, crear_empleos):
+    empleos = crear_empleos(10)
+    empleos[3] = dict(empleos[3], fecha_scraping="no-es-fecha")
+
+    assert db.bulk_insert_empleos(empleos) == {
+        'procesados': 9, 'nuevos': 9, 'actualizados': 0, 'sin_cambios': 0, 'errores': 1
+    }
+    assert activos(db) == {e['id'] for e in empleos} - {empleos[3]['id']}
+    assert_resumen_al_dia(db)
+
+
+def test_dialecto_sin_upsert_nativo_usa_insert_y_update(db, crear_empleos):
+    db.upsert_nativo = False
+    empleos = crear_empleos(12)
+    assert db.bulk_insert_empleos(empleos, tamano_lote=5)['nuevos'] == 12
+
+    cambiados = [dict(e, denominacion="Cambiado", fecha_scraping="2030-01-01T00:00:00") for e in empleos[:4]]
+    assert db.bulk_insert_empleos(cambiados + crear_empleos(3, inicio=50)) == {
+        'procesados': 7, 'nuevos': 3, 'actualizados': 4, 'sin_cambios': 0, 'errores': 0
+    }
+
+    session = db.get_session()
+    try:
+        empleo = session.query(Empleo).filter(Empleo.simo_id == empleos[0]['id']).one()
+        # Como en el upsert nativo, fecha_scraping conserva la primera vez que se vio
+        assert empleo.denominacion == "Cambiado"
+        assert empleo.fecha_scraping.isoformat() == empleos[0]['fecha_scraping']
+        assert session.query(Empleo).count() == 15
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def sentencias(db):
+    """SQL ejecutado por el engine del servicio durante el test"""
+    ejecutadas = []
+
+    def registrar(conn, cursor, statement, *args):
+        ejecutadas.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", registrar)
+    yield ejecutadas
+    event.remove(db.engine, "before_cursor_execute", registrar)
+
+
+def test_dimensiones_en_cache_no_consultan_la_base(db, sentencias):
+    session = db.get_session()
+    try:
+        departamento = db.get_or_create_departamento(session, "Nariño")
+        ids = (departamento.id, db.get_or_create_municipio(session, "Pasto", departamento).id)
+        db.get_or_create_entidad(session, "890000001", "Alcaldía de Pasto")
+        session.commit()
+    finally:
+        session.close()
+
+    sentencias.clear()
+    session = db.get_session()
+    try:
+        # Aciertos de caché en una sesión nueva: ni un SELECT, ni al leer la clave natural
+        entidad = db.get_or_create_entidad(session, "890000001", "Otro nombre")
+        departamento = db.get_or_create_departamento(session, "Nariño")
+        municipio = db.get_or_create_municipio(session, "Pasto", departamento)
+        assert (departamento.id, municipio.id) == ids
+        assert (departamento.nombre, entidad.nit) == ("Nariño", "890000001")
+        assert sentencias == []
+
+        # El resto de columnas se cargan al leerlas
+        assert entidad.nombre == "Alcaldía de Pasto"
+        assert len(sentencias) == 1
+    finally:
+        session.close()
+
+
+def test_rollback_descarta_las_dimensiones_creadas(db):
+    session = db.get_session()
+    try:
+        db.get_or_create_departamento(session, "Caldas")
+        session.rollback()
+        db.get_or_create_departamento(session, "Boyacá")
+        session.commit()
+    finally:
+        session.close()
+
+    session = db.get_session()
+    try:
+        assert db.dimensiones.obtener(session, 'departamentos', "Caldas") is None
+        assert db.dimensiones.obtener(session, 'departamentos', "Boyacá") is not None
+        assert session.query(Departamento).filter(Departamento.nombre == "Caldas").count() == 0
+    finally:
+        session.close()
+
+
+def test_empleos_sin_cambios_no_se_reescriben(db, crear_empleos):
+    empleos = crear_empleos(5)
+    db.bulk_insert_empleos(empleos)
+    session = db.get_session()
+    try:
+        antes = dict(session.query(Empleo.simo_id, Empleo.fecha_actualizacion))
+    finally:
+        session.close()
+
+    assert db.bulk_insert_empleos(empleos)['sin_cambios'] == 5
+
+    session = db.get_session()
+    try:
+        assert dict(session.query(Empleo.simo_id, Empleo.fecha_actualizacion)) == antes
+        assert all(h for (h,) in session.query(Empleo.hash_contenido))
+    finally:
+        session.close()
+
+
+def test_desactivar_no_vistos(db, crear_empleos):
+    empleos = crear_empleos(20)
+    db.bulk_insert_empleos(empleos, generacion=db.nueva_generacion_crawl())
+
+    generacion = db.nueva_generacion_crawl()
+    stats = db.bulk_insert_empleos(empleos[:15], tamano_lote=4, generacion=generacion)
+    assert stats['sin_cambios'] == 15  # Marcados como vistos aunque no se reescriban
+
+    assert db.desactivar_no_vistos(generacion) == 5
+    assert activos(db) == {e['id'] for e in empleos[:15]}
+    assert_resumen_al_dia(db)
+
+    # Un empleo que reaparece se reactiva
+    assert db.bulk_insert_empleos(empleos[15:16])['actualizados'] == 1
+    assert empleos[15]['id'] in activos(db)
+    assert_resumen_al_dia(db)
+
+
+def test_desactivar_no_vistos_sin_empleos_en_la_generacion_no_hace_nada(db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(5))
+
+    assert db.desactivar_no_vistos(db.nueva_generacion_crawl()) == 0
+    assert len(activos(db)) == 5
+
+
+def test_filas_fallidas_cuentan_como_vistas(db, crear_empleos, monkeypatch):
+    empleos = crear_empleos(10)
+    db.bulk_insert_empleos(empleos, generacion=db.nueva_generacion_crawl())
+
+    def lote_roto(*args, **kwargs):
+        raise RuntimeError("lote roto")
+
+    escribir = db.create_or_update_empleo
+
+    def fila_rota(session, empleo_data, generacion=None):
+        if empleo_data['id'] == empleos[2]['id']:
+            raise RuntimeError("fila rota")
+        return escribir(session, empleo_data, generacion)
+
+    monkeypatch.setattr(db, "_upsert_lote", lote_roto)
+    monkeypatch.setattr(db, "create_or_update_empleo", fila_rota)
+
+    generacion = db.nueva_generacion_crawl()
+    cambiados = [dict(e, denominacion=e['denominacion'] + " II") for e in empleos]
+    assert db.bulk_insert_empleos(cambiados, generacion=generacion)['errores'] == 1
+
+    # Sigue publicado en SIMO: no se da de baja aunque no se haya podido escribir
+    assert db.desactivar_no_vistos(generacion) == 0
+    assert len(activos(db)) == 10
+
+
+def test_archivar_inactivos(db, crear_empleos):
+    empleos = crear_empleos(6)
+    db.bulk_insert_empleos(empleos, generacion=db.nueva_generacion_crawl())
+    generacion = db.nueva_generacion_crawl()
+    db.bulk_insert_empleos(empleos[:4], generacion=generacion)
+    db.desactivar_no_vistos(generacion)
+
+    assert db.archivar_inactivos(dias=1) == 0  # Recién desactivados
+    assert db.archivar_inactivos(dias=0) == 2
+
+    session = db.get_session()
+    try:
+        archivados = {a.simo_id for a in session.query(EmpleoArchivado)}
+        assert archivados == {e['id'] for e in empleos[4:]}
+        assert session.query(Empleo).count() == 4
+    finally:
+        session.close()
+
+
+def test_resumen_de_estadisticas_con_deltas(db, crear_empleos):
+    empleos = crear_empleos(120)
+    db.bulk_insert_empleos(empleos, tamano_lote=25)
+    assert_resumen_al_dia(db)
+
+    # Cambios de nivel, departamento y salario, incluido el salario máximo vigente
+    maximo = max(e['asignacion_salarial'] for e in empleos)
+    cambiados = [
+        dict(e, nivel="Asesor", departamento="Caldas", asignacion_salarial=e['asignacion_salarial'] / 2)
+        for e in empleos
+        if e['asignacion_salarial'] == maximo or e['id'] % 4 == 0
+    ]
+    db.bulk_insert_empleos(cambiados + crear_empleos(10, inicio=500), tamano_lote=25)
+    assert_resumen_al_dia(db)
+
+    assert db.obtener_estadisticas()['total_empleos'] == 130
+
+
+def test_resumen_que_falla_se_descarta_sin_perder_el_lote(db, crear_empleos, monkeypatch):
+    db.bulk_insert_empleos(crear_empleos(10))
+
+    def aplicar_delta_roto(*args):
+        raise RuntimeError("resumen roto")
+
+    monkeypatch.setattr("database.db_service.aplicar_delta", aplicar_delta_roto)
+    assert db.bulk_insert_empleos(crear_empleos(5, inicio=100))['nuevos'] == 5
+
+    session = db.get_session()
+    try:
+        assert leer_resumen(session) is None  # Se recalcula en la próxima lectura
+    finally:
+        session.close()
+    assert db.obtener_estadisticas()['total_empleos'] == 15
+    assert_resumen_al_dia(db)
@@ -0,0 +1,61 @@
+# Tests de la exportación a Parquet y los snapshots incrementales
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from database.export import ExportacionParquet, ExportadorSnapshots
+
+
+def snapshots(directorio):
+    return sorted(nombre for nombre in os.listdir(directorio) if nombre.endswith(".parquet"))
+
+
+def test_exportacion_por_bloques(db, crear_empleos, tmp_path):
+    db.bulk_insert_empleos(crear_empleos(5))
+    exportacion = ExportacionParquet(db.engine, tamano_chunk=2)
+    ruta = str(tmp_path / "empleos.parquet")
+
+    assert exportacion.escribir(ruta) == 5
+    tabla = pq.read_table(ruta)
+    assert tabla.num_rows == 5
+    assert sorted(tabla.column('simo_id').to_pylist()) == [1_000_000 + i for i in range(5)]
+    assert pa.types.is_dictionary(tabla.schema.field('departamento').type)
+    assert 'hash_contenido' not in tabla.schema.names
+    # Tres bloques de hasta 2 filas
+    assert pq.ParquetFile(ruta).metadata.num_row_groups == 3
+    assert not os.path.exists(f"{ruta}.tmp")
+
+
+def test_snapshots_incrementales(db, crear_empleos, tmp_path):
+    exportador = ExportadorSnapshots(str(tmp_path / "exports"))
+    empleos = crear_empleos(5)
+    db.bulk_insert_empleos(empleos, generacion=db.nueva_generacion_crawl())
+
+    completo = exportador.exportar(db.engine)
+    assert completo['filas'] == 5 and completo['archivo'].endswith("_completo.parquet")
+
+    # Sin cambios: no se crea un archivo vacío
+    sin_cambios = exportador.exportar(db.engine)
+    assert sin_cambios['archivo'] is None and sin_cambios['filas'] == 0
+    assert len(snapshots(exportador.directorio)) == 1
+
+    # Altas y bajas entran en el siguiente incremental
+    generacion = db.nueva_generacion_crawl()
+    db.bulk_insert_empleos(empleos[1:] + crear_empleos(2, inicio=100), generacion=generacion)
+    db.desactivar_no_vistos(generacion)
+    incremental = exportador.exportar(db.engine)
+    tabla = pq.read_table(incremental['archivo'])
+    assert set(tabla.column('simo_id').to_pylist()) >= {1_000_000, 1_000_100, 1_000_101}
+    assert tabla.filter(pc.equal(tabla['simo_id'], 1_000_000))['activo'].to_pylist() == [False]
+    assert incremental['desde'] == completo['hasta']
+
+
+def test_snapshots_seguidos_no_se_pisan(db, crear_empleos, tmp_path):
+    exportador = ExportadorSnapshots(str(tmp_path / "exports"))
+    db.bulk_insert_empleos(crear_empleos(2))
+
+    archivos = {exportador.exportar(db.engine, completo=True)['archivo'] for _ in range(3)}
+    assert len(archivos) == 3
+    assert len(snapshots(exportador.directorio)) == 3
@@ -0,0 +1,40 @@
+# Tests del filtrado vectorizado de JobTable frente a job_matches_filters
+import pytest
+
+from benchmarks.bench_job_table import conjuntos_de_filtros
+from benchmarks.simo_payload import simo_page
+from scraping.job_table import JobTable
+from scraping.scraper import SimoApiScraper
+
+
+@pytest.fixture(scope="module")
+def empleos():
+    scraper = SimoApiScraper()
+    jobs = [scraper.process_job_data(item, "2024-06-01T08:00:00") for item in simo_page(0, 400, 400)]
+    # Casos borde: mayúsculas distintas, sin salario y salario en cero
+    jobs[0] = dict(jobs[0], nivel=jobs[0]['nivel'].upper(), departamento=jobs[0]['departamento'].upper())
+    jobs[1] = dict(jobs[1], asignacion_salarial=None)
+    jobs[2] = dict(jobs[2], asignacion_salarial=0)
+    return jobs
+
+
+def esperado(empleos, filtros):
+    return [job for job in empleos if SimoApiScraper.job_matches_filters(job, filtros)]
+
+
+def test_filter_many_coincide_con_job_matches_filters(empleos):
+    conjuntos = conjuntos_de_filtros(empleos, 60, semilla=3) + [{}]
+    tabla = JobTable(empleos)
+
+    assert tabla.filter_many(conjuntos) == [esperado(empleos, filtros) for filtros in conjuntos]
+
+
+@pytest.mark.parametrize("filtros", [
+    {'nivel': "profesional"},
+    {'nivel': "PROFES"},  # nivel exige igualdad, no subcadena
+    {'departamento': "ANTIOQ"},
+    {'denominacion': "técnico administrativo 1", 'salario_minimo': 10**12},
+    {'entidad': "no existe"},
+])
+def test_filter_coincide_en_casos_borde(empleos, filtros):
+    assert JobTable(empleos).filter(filtros) == esperado(empleos, filtros)
@@ -1,3 +1,127 @@
 # Pytest tests for FastAPI endpoints and scraping
+import pytest
+from fastapi.testclient import TestClient
 
-# ...test cases will be implemented here...
+from api.cache import ResponseCache, etag_coincide, normalizar_parametros
+
+
+def test_normalizar_parametros():
+    assert normalizar_parametros({'nivel': "Técnico ", 'b': None, 'a': ""}) == \
+        normalizar_parametros({'nivel': "Técnico"})
+    # Las mayúsculas no se pliegan: ILIKE en SQLite solo ignora las de ASCII
+    assert normalizar_parametros({'nivel': "TÉCNICO"}) != normalizar_parametros({'nivel': "técnico"})
+    assert normalizar_parametros({'cursor': " abc"}, exactos=('cursor',)) != \
+        normalizar_parametros({'cursor': "abc"}, exactos=('cursor',))
+
+
+@pytest.mark.parametrize("encabezado, coincide", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", "abc"', True),
+    ('*', True),
+    ('"abcd"', False),
+])
+def test_etag_coincide(encabezado, coincide):
+    assert etag_coincide(encabezado, '"abc"') is coincide
+
+
+def test_response_cache_expira_y_desaloja_la_menos_usada(monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr("api.cache.time.monotonic", lambda: reloj[0])
+    cache = ResponseCache(max_entradas=2, ttl_segundos=30)
+
+    primera = cache.guardar("a", b"1")
+    cache.guardar("b", b"2")
+    assert cache.obtener("a") == primera
+    cache.guardar("c", b"3")
+
+    assert cache.obtener("b") is None
+    assert cache.obtener("a").cuerpo == b"1"
+    assert (cache.aciertos, cache.fallos) == (2, 1)
+
+    reloj[0] += 30
+    assert cache.obtener("a") is None
+    assert len(cache) == 1
+
+
+def test_response_cache_no_guarda_lo_leido_antes_de_invalidar():
+    cache = ResponseCache()
+    generacion = cache.generacion
+    cache.guardar("a", b"viejo")
+    cache.invalidar()
+
+    entrada = cache.guardar("b", b"viejo", generacion)
+    assert entrada.etag and cache.obtener("b") is None
+    assert cache.obtener("a") is None
+
+
+@pytest.fixture
+def cliente(db, monkeypatch):
+    import main
+    from database.async_db_service import AsyncSimoDatabaseService
+
+    # El engine de SQLite fija la ruta absoluta al crearse: uno por test, sobre la base de ``db``
+    monkeypatch.setattr(main, "servicio_async", AsyncSimoDatabaseService())
+    main.cache_respuestas.invalidar()
+    with TestClient(main.app) as cliente:
+        yield cliente
+    main.cache_respuestas.invalidar()
+
+
+def test_jobs_responde_304_con_el_mismo_etag(cliente, db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(5))
+
+    respuesta = cliente.get("/jobs", params={'por_pagina': 2})
+    assert respuesta.status_code == 200
+    assert respuesta.json()['total'] == 5
+    etag = respuesta.headers['ETag']
+
+    no_modificado = cliente.get("/jobs", params={'por_pagina': 2}, headers={'If-None-Match': etag})
+    assert no_modificado.status_code == 304
+    assert no_modificado.headers['ETag'] == etag
+    assert no_modificado.content == b""
+
+    # Otros filtros son otra entrada con otro ETag
+    otra = cliente.get("/jobs", params={'por_pagina': 3}, headers={'If-None-Match': etag})
+    assert otra.status_code == 200 and otra.headers['ETag'] != etag
+
+
+def test_escrituras_de_otro_proceso_invalidan_la_cache(cliente, db, crear_empleos):
+    # ``db`` es otro servicio, como el del proceso de scraping: no avisa a la API
+    empleos = crear_empleos(5)
+    db.bulk_insert_empleos(empleos, generacion=db.nueva_generacion_crawl())
+    respuesta = cliente.get("/jobs")
+    etag = respuesta.headers['ETag']
+    assert cliente.get("/stats").json()['total_empleos'] == 5
+
+    db.bulk_insert_empleos(crear_empleos(3, inicio=100))
+    actualizada = cliente.get("/jobs", headers={'If-None-Match': etag})
+    assert actualizada.status_code == 200
+    assert actualizada.json()['total'] == 8
+    assert cliente.get("/stats").json()['total_empleos'] == 8
+
+    generacion = db.nueva_generacion_crawl()
+    db.bulk_insert_empleos(empleos, generacion=generacion)
+    db.desactivar_no_vistos(generacion)
+    assert cliente.get("/jobs").json()['total'] == 5
+
+
+def test_metrics_expone_la_cache_y_las_consultas(cliente, db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(3))
+    antes = cliente.get("/metrics").text
+    cliente.get("/jobs")
+    cliente.get("/jobs")
+
+    respuesta = cliente.get("/metrics")
+    assert respuesta.status_code == 200
+    assert respuesta.headers['content-type'].startswith("text/plain; version=0.0.4")
+
+    def valor(texto, serie):
+        return float(next(linea for linea in texto.splitlines() if linea.startswith(serie + " ")).split()[-1])
+
+    assert valor(respuesta.text, "simo_api_cache_aciertos_total") == valor(antes, "simo_api_cache_aciertos_total") + 1
+    assert valor(respuesta.text, "simo_api_cache_fallos_total") == valor(antes, "simo_api_cache_fallos_total") + 1
+    assert '# TYPE simo_db_consulta_segundos histogram' in respuesta.text
+    assert valor(respuesta.text, 'simo_db_consulta_segundos_count{operacion="select"}') > \
+        valor(antes, 'simo_db_consulta_segundos_count{operacion="select"}')
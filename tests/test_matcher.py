@@ -0,0 +1,84 @@
+# Tests del motor de coincidencias frente a la consulta SQL por usuario
+import json
+
+import pytest
+
+from database.models import Empleo, UsuarioTelegram
+from notifications.matcher import KeywordAutomaton, SubscriberMatcher
+
+PREFERENCIAS = {
+    "tecnicos": {'niveles_interes': ["Técnico"]},
+    "regiones": {'departamentos_interes': ["Antioquia", "Nariño"], 'salario_minimo': 3_000_000},
+    "palabra": {'palabras_clave': ["administrativo 1"]},
+    "mayusculas": {'palabras_clave': ["DOCUMENTAL"], 'niveles_interes': ["Asesor", "Directivo"]},
+    "todo": {},
+    "nada": {'salario_minimo': 99_000_000},
+}
+
+
+@pytest.fixture
+def suscriptores(db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(45))  # Menos que el límite de 50 de la consulta SQL
+    for chat_id, preferencias in PREFERENCIAS.items():
+        db.registrar_usuario_telegram(chat_id)
+        db.actualizar_preferencias_usuario(chat_id, preferencias)
+
+    session = db.get_session()
+    try:
+        usuarios = session.query(UsuarioTelegram).all()
+        empleos = session.query(Empleo).all()
+    finally:
+        session.close()
+    return usuarios, empleos
+
+
+def test_coincide_con_la_consulta_sql(db, suscriptores):
+    usuarios, empleos = suscriptores
+    coincidencias = db.emparejar_empleos(empleos, SubscriberMatcher(usuarios))
+
+    for usuario in usuarios:
+        esperado = {e.id for e in db.obtener_empleos_para_notificar(usuario)}
+        assert {e.id for e in coincidencias.get(usuario.id, [])} == esperado, usuario.chat_id
+
+    por_chat = {u.chat_id: u.id for u in usuarios}
+    assert len(coincidencias[por_chat["todo"]]) == 45
+    assert por_chat["nada"] not in coincidencias
+    assert all(0 < len(coincidencias[por_chat[chat]]) < 45
+               for chat in ("tecnicos", "regiones", "palabra", "mayusculas"))
+
+
+def test_empleos_como_dict_del_scraper(suscriptores, crear_empleos):
+    usuarios, _ = suscriptores
+    motor = SubscriberMatcher(usuarios)
+    empleo = crear_empleos(1, inicio=7)[0]  # Nivel Profesional
+
+    chats = {usuario.chat_id for usuario in motor.usuarios_para(empleo)}
+    assert "todo" in chats and "tecnicos" not in chats
+    assert motor.ids_usuarios(empleo) == {u.id for u in motor.usuarios_para(empleo)}
+
+
+def test_usuarios_inactivos_no_participan():
+    activo = UsuarioTelegram(id=1, chat_id="1", activo=True)
+    inactivo = UsuarioTelegram(id=2, chat_id="2", activo=False)
+    motor = SubscriberMatcher([activo, inactivo])
+
+    assert len(motor) == 1
+    assert motor.ids_usuarios({'nivel': "Técnico"}) == {1}
+
+
+def test_palabra_clave_vacia_coincide_con_todo():
+    usuario = UsuarioTelegram(id=1, chat_id="1", palabras_clave=json.dumps(["", "inexistente"]))
+    motor = SubscriberMatcher([usuario])
+
+    assert motor.ids_usuarios({'denominacion': "Profesional", 'descripcion': ""}) == {1}
+
+
+def test_automata_encuentra_palabras_solapadas():
+    automata = KeywordAutomaton()
+    automata.agregar("he", 0b001)
+    automata.agregar("she", 0b010)
+    automata.agregar("hers", 0b100)
+    automata.compilar()
+
+    assert automata.buscar("ushers") == 0b111
+    assert automata.buscar("shx") == 0
@@ -0,0 +1,36 @@
+# Tests de las migraciones de Alembic frente a los modelos
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+from database.models import Base
+from database.search import incluir_en_autogenerate
+from tests.conftest import RAIZ
+
+
+def test_head_coincide_con_los_modelos(base_migrada):
+    engine = create_engine(f"sqlite:///{base_migrada}")
+    try:
+        with engine.connect() as conn:
+            contexto = MigrationContext.configure(conn, opts={'include_object': incluir_en_autogenerate})
+            assert compare_metadata(contexto, Base.metadata) == []
+    finally:
+        engine.dispose()
+
+
+def test_downgrade_hasta_la_base_y_vuelta(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = Config()
+    config.set_main_option("script_location", str(RAIZ / "alembic"))
+    command.upgrade(config, "head")
+    command.downgrade(config, "base")
+
+    engine = create_engine("sqlite:///simo_empleos.db")
+    try:
+        assert inspect(engine).get_table_names() == ['alembic_version']
+    finally:
+        engine.dispose()
+
+    command.upgrade(config, "head")
@@ -0,0 +1,84 @@
+# Tests del despacho de notificaciones: duplicados, resúmenes por lotes y ventana de envío
+from database.models import NotificacionEnviada, UsuarioTelegram
+from notifications.dispatcher import ResultadoEnvio
+
+
+def suscribir(db, chat_id, **preferencias):
+    db.registrar_usuario_telegram(chat_id)
+    db.actualizar_preferencias_usuario(chat_id, preferencias)
+
+
+def usuario(db, chat_id):
+    session = db.get_session()
+    try:
+        return session.query(UsuarioTelegram).filter(UsuarioTelegram.chat_id == chat_id).one()
+    finally:
+        session.close()
+
+
+def enviadas(db, exitosa=True):
+    session = db.get_session()
+    try:
+        return session.query(NotificacionEnviada).filter(NotificacionEnviada.exitosa == exitosa).count()
+    finally:
+        session.close()
+
+
+def test_inmediato_no_repite_empleos_ya_enviados(db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(12))
+    suscribir(db, "1")
+    mensajes = []
+
+    stats = db.despachar_notificaciones(lambda u, empleos: mensajes.append(len(empleos)) or True, tamano_lote=5)
+    assert stats == {'mensajes': 12, 'empleos_notificados': 12, 'fallidos': 0, 'duplicados': 0}
+    assert mensajes == [1] * 12
+    assert enviadas(db) == 12
+
+    repetido = db.despachar_notificaciones(lambda u, empleos: True)
+    assert (repetido['mensajes'], repetido['duplicados']) == (0, 12)
+
+
+def test_resumen_diario_agrupa_y_espera_el_periodo(db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(45))
+    suscribir(db, "1", frecuencia_notificaciones="diario")
+    mensajes = []
+
+    stats = db.despachar_notificaciones(lambda u, empleos: mensajes.append(len(empleos)) or True)
+    assert stats['mensajes'] == 3
+    assert mensajes == [20, 20, 5]
+    assert usuario(db, "1").ultima_notificacion is not None
+
+    # Empleos nuevos antes de cumplirse el día quedan para el próximo resumen
+    db.bulk_insert_empleos(crear_empleos(5, inicio=100))
+    assert db.despachar_notificaciones(lambda u, empleos: True)['mensajes'] == 0
+
+
+def test_envio_fallido_se_reintenta_y_no_cuenta_como_notificacion(db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(3))
+    suscribir(db, "1", frecuencia_notificaciones="diario")
+
+    assert db.despachar_notificaciones(lambda u, empleos: False)['fallidos'] == 1
+    assert usuario(db, "1").ultima_notificacion is None
+    assert enviadas(db, exitosa=False) == 3
+
+    assert db.despachar_notificaciones(lambda u, empleos: True)['empleos_notificados'] == 3
+
+
+def test_ultima_notificacion_se_actualiza_al_entregar_la_cola(db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(4))
+    suscribir(db, "1", frecuencia_notificaciones="diario")
+    suscribir(db, "2", frecuencia_notificaciones="diario")
+
+    assert db.encolar_notificaciones(lambda empleos: "resumen") == 2
+    assert usuario(db, "1").ultima_notificacion is None
+
+    por_chat = {m.chat_id: m.id for m in db.obtener_mensajes_pendientes()}
+    db.registrar_resultados_envio([
+        ResultadoEnvio(por_chat["1"], True), ResultadoEnvio(por_chat["2"], False, "Bad Gateway"),
+    ])
+
+    assert usuario(db, "1").ultima_notificacion is not None
+    assert usuario(db, "2").ultima_notificacion is None
+    # El fallido sigue en cola y no se encola de nuevo
+    assert [(m.chat_id, m.intentos) for m in db.obtener_mensajes_pendientes()] == [("2", 1)]
+    assert db.encolar_notificaciones(lambda empleos: "resumen") == 0
@@ -0,0 +1,153 @@
+# Tests del pipeline scraping -> base de datos contra un SIMO local
+import time
+
+import pytest
+
+from benchmarks.simo_payload import simo_item
+from database.models import Empleo, ScrapingLog
+from scraping.checkpoint import CrawlCheckpoint
+from scraping.pipeline import ScrapePipeline
+from scraping.scraper import PageFetchError, SimoApiScraper
+from tests.fake_simo import FakeSimo
+
+
+def crear_pipeline(db, url, tmp_path, **opciones):
+    scraper = SimoApiScraper(base_url=url, delay_seconds=0, retry_base_seconds=0, retry_attempts=1, timeout_seconds=5)
+    checkpoint = CrawlCheckpoint(str(tmp_path / "checkpoint.json"))
+    return ScrapePipeline(db, scraper, checkpoint=checkpoint, **opciones)
+
+
+def activos(db):
+    session = db.get_session()
+    try:
+        return {simo_id for (simo_id,) in session.query(Empleo.simo_id).filter(Empleo.activo == True)}
+    finally:
+        session.close()
+
+
+def empleos(indices):
+    scraper = SimoApiScraper()
+    return [scraper.process_job_data(simo_item(i)) for i in indices]
+
+
+def interrumpir(db, tmp_path, escritas, ultima_pagina, page_size=50):
+    """Estado de un crawl completo cortado tras guardar ``ultima_pagina``"""
+    db.bulk_insert_empleos(empleos(escritas), generacion="retomada")
+    CrawlCheckpoint(str(tmp_path / "checkpoint.json")).save("retomada", ultima_pagina, page_size)
+
+
+def ultimo_log(db):
+    session = db.get_session()
+    try:
+        return session.query(ScrapingLog).order_by(ScrapingLog.id.desc()).first()
+    finally:
+        session.close()
+
+
+async def test_persiste_todas_las_paginas_y_registra_tiempos(db, tmp_path):
+    simo = FakeSimo(230)
+    async with simo.servir() as url:
+        stats = await crear_pipeline(db, url, tmp_path).run(page_size=50, incremental=False)
+
+    assert (stats['modo'], stats['paginas'], stats['empleos_encontrados'], stats['nuevos']) == \
+        ("completo", 5, 230, 230)
+    assert len(activos(db)) == 230
+
+    log = ultimo_log(db)
+    assert log.exitoso and log.modo == "completo" and log.paginas_procesadas == 5
+    assert log.tiempo_descarga > 0 and log.tiempo_escritura > 0
+    assert log.tiempo_espera_cola is not None and log.max_profundidad_cola is not None
+
+
+async def test_cola_llena_detiene_la_descarga(db, tmp_path, monkeypatch):
+    escribir = db.bulk_insert_empleos
+
+    def escritura_lenta(*args, **kwargs):
+        time.sleep(0.05)
+        return escribir(*args, **kwargs)
+
+    monkeypatch.setattr(db, "bulk_insert_empleos", escritura_lenta)
+    simo = FakeSimo(200)
+    async with simo.servir() as url:
+        pipeline = crear_pipeline(db, url, tmp_path, max_paginas_en_cola=1, tamano_lote=20)
+        stats = await pipeline.run(page_size=20, concurrent=False, incremental=False)
+
+    assert stats['nuevos'] == 200
+    assert stats['max_profundidad_cola'] == 1
+    # La descarga esperó a que el escritor liberara la cola
+    assert stats['tiempo_espera_cola'] > 0.1
+
+
+async def test_crawl_completo_desactiva_las_ofertas_retiradas(db, tmp_path):
+    simo = FakeSimo(120)
+    async with simo.servir() as url:
+        await crear_pipeline(db, url, tmp_path).run(page_size=50, incremental=False)
+        simo.retirar(3, 60, 119)
+        stats = await crear_pipeline(db, url, tmp_path).run(page_size=50, incremental=False)
+
+    assert (stats['sin_cambios'], stats['desactivados']) == (117, 3)
+    assert len(activos(db)) == 117
+
+
+async def test_fallo_queda_registrado_y_conserva_el_checkpoint(db, tmp_path):
+    simo = FakeSimo(200)
+    simo.fallar(2, 404)
+    async with simo.servir() as url:
+        pipeline = crear_pipeline(db, url, tmp_path)
+        with pytest.raises(PageFetchError):
+            await pipeline.run(page_size=50, concurrent=False, incremental=False)
+
+    log = ultimo_log(db)
+    assert not log.exitoso and "404" in log.mensaje_error
+    assert log.paginas_procesadas == 2 and log.tiempo_descarga is not None
+    # Lo escrito no se barre y el checkpoint apunta a la última página persistida
+    ultima_pagina = pipeline.checkpoint.load(50)['last_page']
+    assert ultima_pagina < 2
+    assert len(activos(db)) == (ultima_pagina + 1) * 50
+
+
+@pytest.mark.parametrize("ultima_pagina, paginas", [(0, 2), (1, 1), (2, 0)])
+async def test_retomar_crawl_completo(db, tmp_path, ultima_pagina, paginas):
+    # 20 ofertas ya retiradas de SIMO, vistas en un crawl anterior
+    db.bulk_insert_empleos(empleos(range(100, 120)), generacion="anterior")
+    interrumpir(db, tmp_path, range(min(100, (ultima_pagina + 1) * 50)), ultima_pagina)
+
+    simo = FakeSimo(100)
+    async with simo.servir() as url:
+        pipeline = crear_pipeline(db, url, tmp_path)
+        stats = await pipeline.run(page_size=50, concurrent=False)
+
+    # Se repite la última página guardada; el barrido corre aunque no quede ninguna
+    assert (stats['modo'], stats['pagina_inicial'], stats['paginas']) == ("completo", ultima_pagina, paginas)
+    assert stats['desactivados'] == 20
+    assert activos(db) == {1_000_000 + i for i in range(100)}
+    assert pipeline.checkpoint.load(50) is None
+
+
+async def test_retiros_entre_la_interrupcion_y_la_reanudacion(db, tmp_path):
+    db.bulk_insert_empleos(empleos(range(150, 160)), generacion="anterior")
+    interrumpir(db, tmp_path, range(100), ultima_pagina=1)
+
+    # Tres retiros en la primera página corren 100, 101 y 102 a la página 1, ya guardada
+    simo = FakeSimo(150)
+    simo.retirar(5, 15, 25)
+    async with simo.servir() as url:
+        stats = await crear_pipeline(db, url, tmp_path).run(page_size=50, concurrent=False)
+
+    assert stats['pagina_inicial'] == 1
+    assert stats['desactivados'] == 10
+    # Ninguna oferta publicada queda dada de baja; las retiradas se vieron antes del
+    # corte y se barren en el próximo crawl completo
+    assert activos(db) == {1_000_000 + i for i in range(150)}
+
+
+async def test_desglose_de_etapas_en_el_log(db, tmp_path):
+    simo = FakeSimo(120)
+    async with simo.servir() as url:
+        await crear_pipeline(db, url, tmp_path).run(page_size=50, incremental=False)
+
+    log = ultimo_log(db)
+    assert log.exitoso and log.reintentos == 0
+    assert log.tiempo_http > 0 and log.tiempo_normalizacion > 0
+    assert log.tiempo_commit > 0 and log.tiempo_consultas_db > 0
+    assert log.tiempo_dimensiones is not None and log.tiempo_decodificacion is not None
@@ -0,0 +1,41 @@
+# Tests del registro de empleos y el hash de contenido
+import pickle
+
+import pytest
+
+from benchmarks.bench_job_records import legacy_process_job_data
+from benchmarks.simo_payload import simo_item, simo_page_bytes
+from scraping.records import build_job_dict, job_content_hash, normalize_page
+from scraping.scraper import SimoApiScraper
+
+
+def test_hash_de_contenido_ignora_la_fecha_de_scraping():
+    scraper = SimoApiScraper()
+    empleo = scraper.process_job_data(simo_item(7), "2024-06-01T08:00:00")
+    otra_fecha = scraper.process_job_data(simo_item(7), "2024-06-02T09:30:00")
+
+    assert job_content_hash(empleo) == job_content_hash(otra_fecha)
+    assert len(job_content_hash(empleo)) == 32  # Cabe en Empleo.hash_contenido
+    assert job_content_hash(dict(empleo, asignacion_salarial=1)) != job_content_hash(empleo)
+    # No depende del orden de las claves
+    assert job_content_hash(dict(reversed(list(empleo.items())))) == job_content_hash(empleo)
+
+
+@pytest.mark.parametrize("i", [0, 7, 151])
+def test_build_job_dict_coincide_con_el_dict_anterior(i):
+    anterior = legacy_process_job_data(simo_item(i))
+    empleo = build_job_dict(simo_item(i), anterior['fecha_scraping'])
+
+    assert list(empleo) == list(anterior)  # Mismas claves y en el mismo orden
+    assert empleo == anterior
+
+
+def test_normalize_page_omite_los_elementos_con_formato_inesperado():
+    pagina = normalize_page(simo_page_bytes(0, 3, 3)[:-1] + b', {"id": "x"}, {"id": 9, "empleo": "x"}]',
+                            "2024-06-01T08:00:00")
+
+    assert len(pagina) == 5
+    assert [empleo['id'] for empleo in pagina.jobs] == [1_000_000, 1_000_001, 1_000_002]
+    assert len(pagina.errors) == 2
+    # Es lo que vuelve de un proceso: se pickea sin perder nada
+    assert pickle.loads(pickle.dumps(pagina)).jobs == pagina.jobs
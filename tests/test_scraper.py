@@ -0,0 +1,275 @@
+# Tests de la capa de descarga de SimoApiScraper contra un SIMO local, circuit breaker y checkpoint
+import json
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.simo_payload import simo_item
+from config import settings
+from scraping.checkpoint import CrawlCheckpoint
+from scraping.records import job_content_hash
+from scraping.scraper import CircuitBreaker, CircuitOpenError, PageFetchError, SimoApiScraper, TokenBucket
+from tests.fake_simo import FakeSimo
+
+
+def crear_scraper(url, **opciones):
+    opciones = dict(dict(base_url=url, delay_seconds=0, retry_base_seconds=0, timeout_seconds=5), **opciones)
+    return SimoApiScraper(**opciones)
+
+
+def separaciones(simo):
+    instantes = sorted(instante for _, instante in simo.peticiones)
+    return [b - a for a, b in zip(instantes, instantes[1:])]
+
+
+async def test_token_bucket_espacia_las_peticiones():
+    bucket = TokenBucket(rate=20)
+    inicio = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+
+    # El primer token está disponible; los otros cuatro esperan 1/20 s cada uno
+    assert time.monotonic() - inicio >= 0.18
+
+
+async def test_token_bucket_sin_limite():
+    bucket = TokenBucket(rate=0)
+    inicio = time.monotonic()
+    for _ in range(1000):
+        await bucket.acquire()
+    assert time.monotonic() - inicio < 0.5
+
+
+async def test_ventana_concurrente_acotada_y_en_orden():
+    simo = FakeSimo(200, latencia=0.05)
+    async with simo.servir() as url:
+        async with crear_scraper(url, max_concurrent=3) as scraper:
+            paginas = [page async for page, _ in scraper.fetch_pages(range(8), page_size=25)]
+
+    assert paginas == list(range(8))
+    assert simo.max_en_vuelo == 3
+
+
+async def test_delay_espacia_el_inicio_de_las_peticiones():
+    simo = FakeSimo(100)
+    async with simo.servir() as url:
+        async with crear_scraper(url, max_concurrent=4, delay_seconds=0.05) as scraper:
+            async for _ in scraper.fetch_pages(range(4), page_size=25):
+                pass
+
+    assert min(separaciones(simo)) >= 0.04
+
+
+async def test_reintentos_consumen_tokens():
+    simo = FakeSimo(50)
+    simo.fallar(0, 503, 503)
+    async with simo.servir() as url:
+        async with crear_scraper(url, delay_seconds=0.05, retry_attempts=3) as scraper:
+            data, total = await scraper.get_page_data(0, 50)
+
+    assert (len(data), total) == (50, 50)
+    assert simo.paginas() == [0, 0, 0]
+    # Sin esperas de backoff, solo el limitador separa los reintentos
+    assert min(separaciones(simo)) >= 0.04
+
+
+async def test_iter_jobs_entrega_todo_en_orden():
+    simo = FakeSimo(120)
+    async with simo.servir() as url:
+        async with crear_scraper(url, max_concurrent=3) as scraper:
+            ids = [job['id'] async for job in scraper.iter_jobs(page_size=25)]
+            todos = await scraper.scrape_all_jobs(page_size=25, max_pages=2)
+
+    assert ids == [1_000_000 + i for i in range(120)]
+    assert [job['id'] for job in todos] == ids[:50]
+
+
+async def test_iter_jobs_cortado_cancela_las_descargas_pendientes():
+    simo = FakeSimo(1000, latencia=0.02)
+    async with simo.servir() as url:
+        async with crear_scraper(url, max_concurrent=2) as scraper:
+            async for _ in scraper.iter_jobs(page_size=10):
+                break
+
+    # Conteo total + la ventana abierta al cortar; no el catálogo entero
+    assert len(simo.peticiones) <= 4
+
+
+async def test_pagina_fallida_no_se_salta():
+    simo = FakeSimo(100)
+    simo.fallar(2, 404)
+    async with simo.servir() as url:
+        async with crear_scraper(url) as scraper:
+            paginas = []
+            with pytest.raises(PageFetchError) as error:
+                async for jobs in scraper.iter_job_pages(page_size=25):
+                    paginas.append(jobs)
+
+    assert (error.value.page, error.value.status) == (2, 404)
+    assert len(paginas) == 2
+
+
+async def recorrer_incremental(simo, known_ids, **opciones):
+    async with simo.servir() as url:
+        async with crear_scraper(url) as scraper:
+            return [job async for jobs in scraper.iter_job_pages(page_size=10, concurrent=False,
+                                                                 known_ids=known_ids, **opciones)
+                    for job in jobs]
+
+
+async def test_incremental_se_detiene_en_paginas_conocidas():
+    simo = FakeSimo(100, recientes_primero=True)
+    conocidos = {1_000_000 + i for i in range(100)}
+    simo.publicar(20)
+
+    jobs = await recorrer_incremental(simo, conocidos, stop_after_known_pages=2)
+
+    # Dos páginas nuevas y dos conocidas
+    assert [job['id'] for job in jobs] == [1_000_000 + i for i in range(119, 79, -1)]
+    assert simo.paginas() == [0, 0, 1, 2, 3]  # La primera petición pide el total
+
+
+async def test_incremental_recorre_todo_si_no_vienen_las_recientes_primero():
+    simo = FakeSimo(100)
+    conocidos = {1_000_000 + i for i in range(100)}
+    simo.publicar(20)
+
+    jobs = await recorrer_incremental(simo, conocidos)
+
+    assert len(jobs) == 120
+
+
+async def test_incremental_con_hashes_detecta_ofertas_modificadas():
+    simo = FakeSimo(60, recientes_primero=True)
+    scraper = SimoApiScraper()
+    actuales = {job['id']: job_content_hash(job)
+                for job in (scraper.process_job_data(simo_item(i)) for i in range(60))}
+    # Las ofertas 50..59 y 30 cambiaron desde el último crawl
+    conocidos = {**actuales, **{1_000_000 + i: "otro-hash" for i in (*range(50, 60), 30)}}
+
+    jobs = await recorrer_incremental(simo, conocidos, stop_after_known_pages=1)
+
+    # Página 0 cambiada, página 1 (40..49) conocida: se detiene sin llegar a la 30
+    assert [job['id'] for job in jobs] == [1_000_000 + i for i in range(59, 39, -1)]
+
+
+def test_circuit_breaker(monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr("scraping.scraper.time.monotonic", lambda: reloj[0])
+    circuito = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+
+    for _ in range(2):
+        circuito.record_failure()
+    circuito.before_request()
+    assert not circuito.is_open
+
+    circuito.record_failure()
+    assert circuito.is_open
+    with pytest.raises(CircuitOpenError):
+        circuito.before_request()
+
+    # Semiabierto: una sola petición de prueba a la vez
+    reloj[0] += 30
+    circuito.before_request()
+    with pytest.raises(CircuitOpenError):
+        circuito.before_request()
+
+    # Una prueba cancelada libera el turno; una fallida vuelve a abrir
+    circuito.release_trial()
+    circuito.before_request()
+    circuito.record_failure()
+    with pytest.raises(CircuitOpenError):
+        circuito.before_request()
+
+    reloj[0] += 30
+    circuito.before_request()
+    circuito.record_success()
+    assert not circuito.is_open and circuito.failures == 0
+    circuito.before_request()
+
+
+def test_checkpoint_guarda_y_descarta(tmp_path, monkeypatch):
+    ruta = tmp_path / "checkpoint.json"
+    checkpoint = CrawlCheckpoint(str(ruta))
+    assert checkpoint.load(50) is None
+
+    checkpoint.save("g1", 3, 50)
+    assert checkpoint.load(50)['generacion'] == "g1"
+    assert checkpoint.load(50)['last_page'] == 3
+    assert checkpoint.load(20) is None  # Otro tamaño de página
+
+    datos = json.loads(ruta.read_text())
+    datos['updated_at'] = (datetime.now() - timedelta(hours=2)).isoformat()
+    ruta.write_text(json.dumps(datos))
+    assert checkpoint.load(50, max_age_hours=1) is None
+    assert checkpoint.load(50, max_age_hours=3) is not None
+    # Por defecto vence a las pocas horas, no con el intervalo entre crawls completos
+    monkeypatch.setattr(settings, "scraper_checkpoint_max_age_hours", 1)
+    assert checkpoint.load(50) is None
+
+    ruta.write_text("{no es json")
+    assert checkpoint.load(50) is None
+
+    checkpoint.clear()
+    checkpoint.clear()
+    assert not ruta.exists()
+
+
+async def test_conexiones_keep_alive_acotadas_por_la_concurrencia():
+    simo = FakeSimo(400)
+    async with simo.servir() as url:
+        async with crear_scraper(url, max_concurrent=3) as scraper:
+            async for _ in scraper.fetch_pages(range(16), page_size=25):
+                pass
+            stats = scraper.connection_stats
+
+    assert stats.requests == 16
+    assert stats.opened <= 3
+    assert stats.opened + stats.reused == 16
+
+
+async def test_respuestas_comprimidas():
+    simo = FakeSimo(60, comprimir=True)
+    async with simo.servir() as url:
+        async with crear_scraper(url) as scraper:
+            data, total = await scraper.get_page_data(0, 50)
+
+    assert (len(data), total) == (50, 60)
+    assert "gzip" in simo.encodings[0]
+
+
+def sin_fecha(jobs):
+    return [{clave: valor for clave, valor in job.items() if clave != 'fecha_scraping'} for job in jobs]
+
+
+async def test_pool_de_procesos_entrega_los_mismos_empleos():
+    simo = FakeSimo(130)
+    async with simo.servir() as url:
+        async with crear_scraper(url) as scraper:
+            en_linea = await scraper.scrape_all_jobs(page_size=50)
+        async with crear_scraper(url, process_workers=1) as scraper:
+            en_proceso = await scraper.scrape_all_jobs(page_size=50)
+            assert scraper.process_pool is not None
+
+    assert len(en_proceso) == 130
+    assert sin_fecha(en_proceso) == sin_fecha(en_linea)
+
+
+async def test_pool_de_procesos_caido_no_se_reintenta():
+    simo = FakeSimo(100)
+    async with simo.servir() as url:
+        async with crear_scraper(url, process_workers=1, retry_attempts=3) as scraper:
+            await scraper.get_page_data(0, 50)
+            # Un proceso que muere deja el pool inutilizable
+            with pytest.raises(BrokenProcessPool):
+                scraper.process_pool.submit(os._exit, 1).result()
+
+            with pytest.raises(PageFetchError) as error:
+                await scraper.get_page_data(1, 50)
+
+    assert error.value.page == 1
+    assert simo.paginas() == [0, 1]
+    assert scraper.circuit_breaker.failures == 0  # Falla local: no cuenta para el circuito
@@ -0,0 +1,131 @@
+# Tests de búsqueda por texto completo, paginación por cursor y caché de totales
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect
+
+from database.db_service import SimoDatabaseService
+from database.search import CacheTotales, codificar_cursor, decodificar_cursor
+
+
+def buscar(db, texto, **opciones):
+    return [e.simo_id for e in db.buscar_empleos(filtros={'texto': texto}, **opciones)['empleos']]
+
+
+def test_texto_completo_ordena_por_relevancia_e_ignora_tildes(db, crear_empleos):
+    empleos = crear_empleos(6)
+    empleos[0] = dict(empleos[0], descripcion="Apoyo a la ingeniería de sistemas de información")
+    empleos[1] = dict(empleos[1], denominacion="Ingeniero de Sistemas")
+    empleos[2] = dict(empleos[2], denominacion="Enfermera Jefe")
+    db.bulk_insert_empleos(empleos)
+
+    # La denominación pesa más que la descripción; "ingenier" es prefijo de ambas
+    assert buscar(db, "ingenier sistemas") == [empleos[1]['id'], empleos[0]['id']]
+    assert buscar(db, "INGENIERÍA") == [empleos[0]['id']]
+    assert buscar(db, "enfermera jefe") == buscar(db, "enférmera") == [empleos[2]['id']]
+    assert buscar(db, "enfermera ingeniero") == []
+
+
+def test_el_indice_sigue_las_actualizaciones(db, crear_empleos):
+    empleos = crear_empleos(3)
+    db.bulk_insert_empleos(empleos)
+    db.bulk_insert_empleos([dict(empleos[0], denominacion="Profesional Universitario")])
+
+    assert buscar(db, "universitario") == [empleos[0]['id']]
+    assert empleos[0]['id'] not in buscar(db, "tecnico administrativo")
+
+
+def test_sin_indice_se_busca_con_ilike(tmp_path, monkeypatch, crear_empleos):
+    # Base creada por create_tables, sin migraciones: al iniciar no se instala el índice
+    monkeypatch.chdir(tmp_path)
+    db = SimoDatabaseService()
+    try:
+        assert db.busqueda_texto is False
+        assert 'empleos_fts' not in inspect(db.engine).get_table_names()
+
+        empleos = crear_empleos(3)
+        empleos[1] = dict(empleos[1], denominacion="Ingeniero de Sistemas")
+        db.bulk_insert_empleos(empleos)
+        assert buscar(db, "Sistemas") == [empleos[1]['id']]
+    finally:
+        db.engine.dispose()
+
+
+def test_cursor_ida_y_vuelta():
+    empleo = SimpleNamespace(fecha_scraping=datetime(2024, 6, 1, 8, 30, 15, 123456), id=42)
+    cursor = codificar_cursor(empleo)
+
+    assert "=" not in cursor
+    assert decodificar_cursor(cursor) == (empleo.fecha_scraping, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "no-es-base64!", "W10", "WyJheWVyIiwgMV0"])
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError):
+        decodificar_cursor(cursor)
+
+
+def test_paginacion_por_cursor_recorre_todo_sin_repetir(db, crear_empleos):
+    empleos = crear_empleos(47)
+    # Varios empleos con la misma fecha: el id desempata
+    for empleo in empleos[10:20]:
+        empleo['fecha_scraping'] = empleos[10]['fecha_scraping']
+    db.bulk_insert_empleos(empleos)
+
+    vistos, cursor, paginas = [], None, 0
+    while True:
+        pagina = db.buscar_empleos(por_pagina=10, cursor=cursor, modo_cursor=True, incluir_total=False)
+        vistos.extend(e.simo_id for e in pagina['empleos'])
+        paginas += 1
+        cursor = pagina['next_cursor']
+        if cursor is None:
+            break
+
+    assert paginas == 5
+    # Orden (fecha_scraping, id) descendente; los ids se asignan en el orden de inserción
+    esperado = sorted(empleos, key=lambda e: (e['fecha_scraping'], e['id']), reverse=True)
+    assert vistos == [e['id'] for e in esperado]
+
+
+def test_paginacion_por_offset_y_total(db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(25))
+
+    primera = db.buscar_empleos(pagina=1, por_pagina=10)
+    ultima = db.buscar_empleos(pagina=3, por_pagina=10)
+
+    assert (primera['total'], primera['total_paginas']) == (25, 3)
+    assert len(ultima['empleos']) == 5
+    assert not {e.id for e in primera['empleos']} & {e.id for e in ultima['empleos']}
+
+
+def test_total_cacheado_se_invalida_al_escribir(db, crear_empleos):
+    db.bulk_insert_empleos(crear_empleos(5))
+    assert db.buscar_empleos()['total'] == 5
+
+    db.bulk_insert_empleos(crear_empleos(3, inicio=100))
+    assert db.buscar_empleos()['total'] == 8
+
+
+def test_cache_totales_expira_y_desaloja_la_menos_usada(monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr("database.search.time.monotonic", lambda: reloj[0])
+    cache = CacheTotales(max_entradas=2, ttl_segundos=60)
+
+    cache.guardar({'nivel': "Técnico"}, 10)
+    cache.guardar({'nivel': "Asesor"}, 20)
+    assert cache.obtener({'nivel': "Técnico"}) == 10  # Pasa a ser la más reciente
+    cache.guardar({'departamento': "Nariño"}, 30)
+
+    assert len(cache) == 2
+    assert cache.obtener({'nivel': "Asesor"}) is None
+    assert cache.obtener({'nivel': "Técnico"}) == 10
+
+    reloj[0] += 60
+    assert cache.obtener({'nivel': "Técnico"}) is None
+    assert len(cache) == 1
+
+
+def test_cache_totales_clave_independiente_del_orden():
+    assert CacheTotales.clave({'a': 1, 'b': 2}) == CacheTotales.clave({'b': 2, 'a': 1})
+    assert CacheTotales.clave(None) == CacheTotales.clave({})
@@ -0,0 +1,157 @@
+# Tests de la cola de entrega de Telegram contra una Bot API local
+import time
+
+import pytest
+
+from database.models import MensajePendiente, NotificacionEnviada, UsuarioTelegram
+from notifications.telegram import TelegramDeliveryQueue
+from tests.fake_telegram import FakeBotApi
+
+
+def encolar(db, *chat_ids):
+    session = db.get_session()
+    try:
+        for chat_id in chat_ids:
+            session.add(MensajePendiente(chat_id=chat_id, texto=f"hola {chat_id}", empleo_ids="[]"))
+        session.commit()
+    finally:
+        session.close()
+
+
+def pendientes(db):
+    return sorted(m.chat_id for m in db.obtener_mensajes_pendientes())
+
+
+def crear_cola(db, api, url, **opciones):
+    opciones = dict(dict(habilitado=True, token=api.token, base_url=url, mensajes_por_segundo=0,
+                         intervalo_por_chat=0, max_intentos=3, espera_base=0.01, espera_maxima=0.05,
+                         max_retry_after=0.05), **opciones)
+    return TelegramDeliveryQueue(db, **opciones)
+
+
+async def test_entrega_y_registra_resultados(db):
+    api = FakeBotApi()
+    api.programar("429", (429, {'ok': False, 'description': 'Too Many Requests',
+                                'parameters': {'retry_after': 3600}}))
+    api.programar("500", (500, {'ok': False}), (502, "Bad Gateway"))
+    api.programar("lista", (200, [1, 2, 3]))
+    api.programar("bloqueado", (403, {'ok': False, 'description': 'Forbidden: bot was blocked by the user'}))
+    encolar(db, "ok", "429", "500", "lista", "bloqueado")
+
+    async with api.servir() as url:
+        inicio = time.monotonic()
+        stats = await crear_cola(db, api, url).procesar_pendientes()
+
+    # El retry_after de una hora queda acotado por max_retry_after
+    assert time.monotonic() - inicio < 5
+    assert stats == {'pendientes': 5, 'entregados': 3, 'fallidos': 2}
+    assert sorted(api.chats()) == sorted(["ok", "429", "429", "500", "500", "500", "lista", "bloqueado"])
+    assert pendientes(db) == []
+
+
+async def test_error_inesperado_no_detiene_la_cola(db, monkeypatch):
+    api = FakeBotApi()
+    encolar(db, "a", "roto", "b")
+
+    async with api.servir() as url:
+        cola = crear_cola(db, api, url)
+        enviar = cola.enviar_mensaje
+
+        async def enviar_mensaje(http, chat_id, texto):
+            if chat_id == "roto":
+                raise RuntimeError("fallo inesperado")
+            await enviar(http, chat_id, texto)
+
+        monkeypatch.setattr(cola, "enviar_mensaje", enviar_mensaje)
+        stats = await cola.procesar_pendientes()
+
+    assert stats == {'pendientes': 3, 'entregados': 2, 'fallidos': 1}
+    assert sorted(api.chats()) == ["a", "b"]
+    assert pendientes(db) == ["roto"]  # Reintentable: queda para la próxima corrida
+
+
+async def test_deshabilitado_no_envia(db):
+    api = FakeBotApi()
+    encolar(db, "a")
+
+    async with api.servir() as url:
+        stats = await crear_cola(db, api, url, habilitado=False).procesar_pendientes()
+
+    assert stats['entregados'] == 0
+    assert api.recibidos == []
+    assert pendientes(db) == ["a"]
+
+
+async def test_notificar_suscriptores(db, crear_empleos):
+    jobs = crear_empleos(50)
+    db.bulk_insert_empleos(jobs)
+    nivel = jobs[0]['nivel']
+    db.registrar_usuario_telegram("100")
+    db.actualizar_preferencias_usuario("100", {'niveles_interes': [nivel]})
+
+    api = FakeBotApi()
+    async with api.servir() as url:
+        cola = crear_cola(db, api, url)
+        stats = await cola.notificar_suscriptores()
+        # Ya notificados: una segunda corrida no repite mensajes
+        repetido = await cola.notificar_suscriptores()
+
+    assert stats['encolados'] == stats['entregados'] > 0
+    assert repetido['encolados'] == 0
+    assert set(api.chats()) == {"100"}
+
+    session = db.get_session()
+    try:
+        enviados = session.query(NotificacionEnviada).filter(NotificacionEnviada.exitosa == True).count()
+    finally:
+        session.close()
+    assert enviados == sum(1 for job in jobs if job['nivel'] == nivel)
+
+
+async def test_fallo_transitorio_se_descarta_tras_max_corridas(db):
+    api = FakeBotApi()
+    api.programar("caido", *[(502, "Bad Gateway")] * 3)
+    encolar(db, "caido")
+
+    async with api.servir() as url:
+        cola = crear_cola(db, api, url, max_intentos=1)
+        for corrida in range(1, 4):
+            stats = await cola.procesar_pendientes()
+            assert stats['fallidos'] == 1
+            # Las dos primeras corridas lo dejan en cola; la tercera lo descarta
+            assert pendientes(db) == (["caido"] if corrida < 3 else [])
+
+    assert len(api.recibidos) == 3
+
+
+@pytest.mark.parametrize("status, descripcion", [
+    (403, "Forbidden: bot was blocked by the user"),
+    (400, "Bad Request: chat not found"),
+])
+async def test_chat_inaccesible_desactiva_al_usuario(db, crear_empleos, status, descripcion):
+    jobs = crear_empleos(5)
+    db.bulk_insert_empleos(jobs)
+    for chat_id in ("100", "200"):
+        db.registrar_usuario_telegram(chat_id)
+
+    api = FakeBotApi()
+    api.programar("100", (status, {'ok': False, 'description': descripcion}))
+    async with api.servir() as url:
+        cola = crear_cola(db, api, url, trabajadores=1)
+        stats = await cola.notificar_suscriptores()
+
+        # Un mensaje por empleo a cada usuario; al primer rechazo se dejan de enviar los de "100"
+        assert stats['encolados'] == 10
+        assert api.chats().count("100") == 1
+        assert pendientes(db) == []
+
+        db.bulk_insert_empleos(crear_empleos(2, inicio=50))
+        assert (await cola.notificar_suscriptores())['encolados'] == 2
+        assert api.chats().count("100") == 1
+
+    session = db.get_session()
+    try:
+        activos = dict(session.query(UsuarioTelegram.chat_id, UsuarioTelegram.activo))
+    finally:
+        session.close()
+    assert activos == {"100": False, "200": True}